@@ -17,6 +17,10 @@ from src.infrastructure.models.credit import Credit
 from src.infrastructure.models.transaction import Transaction
 from src.infrastructure.models.notification import Notification
 from src.infrastructure.models.payment import Payment
+from src.infrastructure.models.job_lease import JobLease
+from src.infrastructure.models.idempotency_key import IdempotencyKey
+from src.infrastructure.models.ledger_posting import LedgerPosting
+from src.infrastructure.models.balance_snapshot import BalanceSnapshot
 
 config = context.config
 
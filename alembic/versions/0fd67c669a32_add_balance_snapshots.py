@@ -0,0 +1,36 @@
+"""add balance snapshots
+
+Revision ID: 0fd67c669a32
+Revises: 1d530d11116c
+Create Date: 2026-10-17 22:08:21.936048
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '0fd67c669a32'
+down_revision: Union[str, None] = '1d530d11116c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'balance_snapshots',
+        sa.Column('account_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('balance', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+        sa.PrimaryKeyConstraint('account_id', 'day')
+    )
+    op.create_index('ix_ledger_postings_posted_at', 'ledger_postings', ['posted_at'], unique=False)
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ledger_postings_posted_at', table_name='ledger_postings')
+    op.drop_table('balance_snapshots')
@@ -0,0 +1,81 @@
+"""add ledger postings
+
+Backfills two postings per completed transaction, then one opening balance per account whose
+balance the transactions do not explain (accounts seeded or edited outside the API), so every
+account starts out matching its postings.
+
+Revision ID: 1d530d11116c
+Revises: 3d3d9865569c
+Create Date: 2026-10-17 22:05:54.058409
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '1d530d11116c'
+down_revision: Union[str, None] = '3d3d9865569c'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# (transaction types, account column, sign) of each side of a completed movement; a NULL
+# account (a deposit's source, a withdrawal's destination) is outside the bank
+MOVEMENT_SIDES = (
+    (("WITHDRAWAL", "TRANSFER"), "account_id", -1),
+    (("WITHDRAWAL",), "NULL", 1),
+    (("DEPOSIT",), "NULL", -1),
+    (("DEPOSIT",), "account_id", 1),
+    (("TRANSFER",), "destination_account_id", 1),
+)
+
+
+def upgrade() -> None:
+    op.create_table(
+        'ledger_postings',
+        sa.Column('id', sa.Integer(), nullable=False),
+        sa.Column('transaction_id', sa.Integer(), nullable=True),
+        sa.Column('account_id', sa.Integer(), nullable=True),
+        sa.Column('amount', sa.Numeric(precision=15, scale=2), nullable=False),
+        sa.Column('posted_at', sa.DateTime(), nullable=False),
+        sa.ForeignKeyConstraint(['account_id'], ['accounts.id']),
+        sa.ForeignKeyConstraint(['transaction_id'], ['transactions.id']),
+        sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index(
+        'ix_ledger_postings_account_posted', 'ledger_postings', ['account_id', 'posted_at', 'id'], unique=False
+    )
+
+    for types, account_column, sign in MOVEMENT_SIDES:
+        op.execute(sa.text(f"""
+            INSERT INTO ledger_postings (transaction_id, account_id, amount, posted_at)
+            SELECT id, {account_column}, {sign} * amount, COALESCE(created_at, CURRENT_TIMESTAMP)
+            FROM transactions
+            WHERE status = 'COMPLETED' AND transaction_type IN ({", ".join(f"'{name}'" for name in types)})
+            ORDER BY id
+        """))
+
+    # Opening balances: the outside side first, as the account side changes the difference
+    unexplained = """
+        SELECT accounts.id, accounts.balance - COALESCE(SUM(ledger_postings.amount), 0) AS amount,
+               COALESCE(accounts.created_at, CURRENT_TIMESTAMP) AS posted_at
+        FROM accounts LEFT JOIN ledger_postings ON ledger_postings.account_id = accounts.id
+        GROUP BY accounts.id, accounts.balance, accounts.created_at
+        HAVING accounts.balance <> COALESCE(SUM(ledger_postings.amount), 0)
+    """
+    op.execute(sa.text(f"""
+        INSERT INTO ledger_postings (transaction_id, account_id, amount, posted_at)
+        SELECT NULL, NULL, -amount, posted_at FROM ({unexplained}) AS opening ORDER BY id
+    """))
+    op.execute(sa.text(f"""
+        INSERT INTO ledger_postings (transaction_id, account_id, amount, posted_at)
+        SELECT NULL, id, amount, posted_at FROM ({unexplained}) AS opening ORDER BY id
+    """))
+
+
+def downgrade() -> None:
+    op.drop_index('ix_ledger_postings_account_posted', table_name='ledger_postings')
+    op.drop_table('ledger_postings')
@@ -0,0 +1,34 @@
+"""add notification email delivery
+
+Revision ID: b4ae51f91e39
+Revises: f7a3bc60332e
+Create Date: 2026-10-17 21:15:14.243544
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b4ae51f91e39'
+down_revision: Union[str, None] = 'f7a3bc60332e'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('notifications', sa.Column('email_to', sa.String(), nullable=True))
+    op.add_column('notifications', sa.Column('email_attempts', sa.Integer(), server_default='0', nullable=False))
+    op.create_index(
+        'ix_notifications_email_pending', 'notifications', ['id'],
+        postgresql_where=sa.text('email_sent = false AND email_to IS NOT NULL'),
+        sqlite_where=sa.text('email_sent = 0 AND email_to IS NOT NULL')
+    )
+
+
+def downgrade() -> None:
+    op.drop_index('ix_notifications_email_pending', table_name='notifications')
+    op.drop_column('notifications', 'email_attempts')
+    op.drop_column('notifications', 'email_to')
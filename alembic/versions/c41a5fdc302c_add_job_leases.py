@@ -0,0 +1,35 @@
+"""add job leases
+
+Revision ID: c41a5fdc302c
+Revises: b4ae51f91e39
+Create Date: 2026-10-17 21:33:34.460296
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c41a5fdc302c'
+down_revision: Union[str, None] = 'b4ae51f91e39'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_table(
+        'job_leases',
+        sa.Column('name', sa.String(length=100), nullable=False),
+        sa.Column('owner', sa.String(length=255), nullable=True),
+        sa.Column('expires_at', sa.DateTime(), nullable=True),
+        sa.Column('last_run_at', sa.DateTime(), nullable=True),
+        sa.Column('last_duration_seconds', sa.Float(), nullable=True),
+        sa.Column('last_rows', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('job_leases')
@@ -0,0 +1,26 @@
+"""add account version
+
+Revision ID: d89290c51b05
+Revises: 086d53b27f35
+Create Date: 2026-10-17 20:11:12.694663
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd89290c51b05'
+down_revision: Union[str, None] = '086d53b27f35'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('accounts', sa.Column('version', sa.Integer(), server_default='1', nullable=False))
+
+
+def downgrade() -> None:
+    op.drop_column('accounts', 'version')
@@ -0,0 +1,50 @@
+"""add hot path indexes
+
+Revision ID: f7a3bc60332e
+Revises: d89290c51b05
+Create Date: 2026-10-17 21:12:14.040087
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'f7a3bc60332e'
+down_revision: Union[str, None] = 'd89290c51b05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.create_index('ix_transactions_account_created', 'transactions', ['account_id', 'created_at', 'id'])
+    op.create_index(
+        'ix_transactions_destination_created', 'transactions', ['destination_account_id', 'created_at', 'id'],
+        postgresql_where=sa.text('destination_account_id IS NOT NULL'),
+        sqlite_where=sa.text('destination_account_id IS NOT NULL')
+    )
+    op.create_index('ix_notifications_user_created', 'notifications', ['user_id', 'created_at'])
+    op.create_index('ix_notifications_user_type_created', 'notifications', ['user_id', 'type', 'created_at'])
+    op.create_index(
+        'ix_notifications_user_unread', 'notifications', ['user_id', 'created_at'],
+        postgresql_where=sa.text('read = false'),
+        sqlite_where=sa.text('read = 0')
+    )
+    op.create_index('ix_payments_status_payment_date', 'payments', ['status', 'payment_date'])
+    op.create_index(op.f('ix_payments_credit_id'), 'payments', ['credit_id'])
+    op.create_index(op.f('ix_credits_user_id'), 'credits', ['user_id'])
+    op.create_index(op.f('ix_accounts_user_id'), 'accounts', ['user_id'])
+
+
+def downgrade() -> None:
+    op.drop_index(op.f('ix_accounts_user_id'), table_name='accounts')
+    op.drop_index(op.f('ix_credits_user_id'), table_name='credits')
+    op.drop_index(op.f('ix_payments_credit_id'), table_name='payments')
+    op.drop_index('ix_payments_status_payment_date', table_name='payments')
+    op.drop_index('ix_notifications_user_unread', table_name='notifications')
+    op.drop_index('ix_notifications_user_type_created', table_name='notifications')
+    op.drop_index('ix_notifications_user_created', table_name='notifications')
+    op.drop_index('ix_transactions_destination_created', table_name='transactions')
+    op.drop_index('ix_transactions_account_created', table_name='transactions')
@@ -0,0 +1,123 @@
+"""p50/p99 latency at high concurrency: sync stack vs async stack vs blocking-in-async.
+
+Three routes run the same account lookup:
+  sync      def route + Session (FastAPI threadpool)
+  async     async def route + AsyncSession (asyncpg / aiosqlite)
+  blocking  async def route + Session, the pattern the async routes used to have
+
+SQLite answers in microseconds, so every query also calls sleep(--db-ms) to stand in for a
+network round trip (pg_sleep on Postgres).
+
+Usage: python benchmarks/bench_async_db.py [--requests 2000] [--concurrency 200] [--db-ms 5] [--url ...]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import make_session_factory, seed_accounts
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlalchemy import create_engine, event, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.config.database import get_async_database_url
+from src.infrastructure.repositories.account_repository import AccountRepository, AsyncAccountRepository
+
+
+def build_app(url: str, db_ms: float, pool_size: int) -> FastAPI:
+    # Pools are sized to the concurrency so neither stack queues on connection checkout.
+    # The sync pool may overflow: a blocking route that waits for a connection on the event
+    # loop would stop the very teardowns that return connections, and deadlock until timeout.
+    engine = create_engine(url, pool_size=pool_size, max_overflow=-1)
+    session_factory = sessionmaker(bind=engine, autoflush=False)
+    async_engine = create_async_engine(get_async_database_url(url), pool_size=pool_size, max_overflow=0)
+    async_session_factory = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+    is_sqlite = url.startswith("sqlite")
+    delay = text("SELECT sleep(:ms)" if is_sqlite else "SELECT pg_sleep(:ms / 1000.0)")
+
+    if is_sqlite:
+        def register_sleep(dbapi_connection, _):
+            dbapi_connection.create_function("sleep", 1, lambda ms: time.sleep(ms / 1000))
+
+        event.listen(engine, "connect", register_sleep)
+        event.listen(async_engine.sync_engine, "connect", register_sleep)
+
+    def get_db():
+        with session_factory() as db:
+            yield db
+
+    async def get_async_db():
+        async with async_session_factory() as db:
+            yield db
+
+    app = FastAPI()
+
+    @app.get("/sync/{account_id}")
+    def sync_route(account_id: int, db=Depends(get_db)):
+        db.execute(delay, {"ms": db_ms})
+        return {"balance": str(AccountRepository(db).get_by_id(account_id).balance)}
+
+    @app.get("/async/{account_id}")
+    async def async_route(account_id: int, db: AsyncSession = Depends(get_async_db)):
+        await db.execute(delay, {"ms": db_ms})
+        account = await AsyncAccountRepository(db).get_by_id(account_id)
+        return {"balance": str(account.balance)}
+
+    @app.get("/blocking/{account_id}")
+    async def blocking_route(account_id: int, db=Depends(get_db)):
+        db.execute(delay, {"ms": db_ms})
+        return {"balance": str(AccountRepository(db).get_by_id(account_id).balance)}
+
+    return app
+
+
+async def load(app: FastAPI, path: str, requests: int, concurrency: int) -> list:
+    latencies = []
+    semaphore = asyncio.Semaphore(concurrency)
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def one():
+            async with semaphore:
+                start = time.perf_counter()
+                response = await client.get(path)
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one() for _ in range(requests)))
+        elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=200)
+    parser.add_argument("--db-ms", type=float, default=5.0)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        account_id = seed_accounts(session, 1)[0]
+    app = build_app(engine.url.render_as_string(hide_password=False), args.db_ms, args.concurrency)
+
+    async def measure(path):
+        # warm-up round opens the pooled connections so they are not counted in the tail
+        await load(app, path, args.concurrency, args.concurrency)
+        return await load(app, path, args.requests, args.concurrency)
+
+    for stack in ("sync", "async", "blocking"):
+        latencies, elapsed = asyncio.run(measure(f"/{stack}/{account_id}"))
+        quantiles = statistics.quantiles(latencies, n=100)
+        print(
+            f"{stack:<9} {args.requests / elapsed:9.1f} req/s "
+            f"p50={quantiles[49] * 1000:8.1f}ms p99={quantiles[98] * 1000:8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,65 @@
+"""Point-in-time balance of one busy account: replaying every posting vs nearest snapshot + delta.
+
+  replay    sum of all the account's postings before T, what a statement had to do before snapshots
+  snapshot  LedgerService.balance_at: latest snapshot of an earlier day plus the postings since
+
+Both are asked for the same random instants across the history; the snapshot job runs once first.
+
+Usage: python benchmarks/bench_balance_at.py [--days 365] [--per-day 1000] [--queries 200] [--url ...]
+"""
+import argparse
+import random
+from datetime import datetime, timedelta
+
+from common import Timer, make_session_factory, report, seed_accounts
+
+from sqlalchemy import insert
+
+from src.application.services.ledger_service import LedgerService
+from src.infrastructure.models.ledger_posting import LedgerPosting
+
+START = datetime(2020, 1, 1)
+
+
+def seed_postings(session, account_id: int, days: int, per_day: int) -> None:
+    step = timedelta(days=1) / per_day
+    for day in range(days):
+        midnight = START + timedelta(days=day)
+        session.execute(insert(LedgerPosting), [
+            {"transaction_id": None, "account_id": account_id, "amount": 1, "posted_at": midnight + step * index}
+            for index in range(per_day)
+        ])
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--days", type=int, default=365)
+    parser.add_argument("--per-day", type=int, default=1000)
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        account_id, = seed_accounts(session, 1)
+        seed_postings(session, account_id, args.days, args.per_day)
+        with Timer() as timer:
+            taken = LedgerService(session).take_snapshots(now=START + timedelta(days=args.days + 1))
+        report("snapshot job", taken, timer.elapsed)
+
+        end = START + timedelta(days=args.days)
+        moments = [START + (end - START) * random.random() for _ in range(args.queries)]
+        service = LedgerService(session)
+        with Timer() as timer:
+            replayed = [service.repository.sum_account_postings(account_id, None, moment) for moment in moments]
+        report("replay", args.queries, timer.elapsed, postings=args.days * args.per_day)
+        with Timer() as timer:
+            snapshotted = [service.balance_at(account_id, moment) for moment in moments]
+        report("snapshot + delta", args.queries, timer.elapsed)
+        assert snapshotted == replayed
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
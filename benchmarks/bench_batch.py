@@ -0,0 +1,78 @@
+"""Payroll items/sec: one transfer call per item versus POST /transactions/{account_id}/batch.
+
+Both sides run what their route runs after authentication: the ownership check, then
+process_transfer per item or process_batch per batch.
+
+Usage: python benchmarks/bench_batch.py [--items 5000] [--batch-size 1000] [--accounts 500] [--url sqlite:///...]
+"""
+import argparse
+from decimal import Decimal
+
+from common import Timer, count_statements, make_session_factory, report, seed_accounts
+
+from src.application.services.account_service import AccountService
+from src.application.services.transaction_service import TransactionService
+from src.infrastructure.models.account import Account
+from src.infrastructure.models.transaction import TransactionType
+from src.presentation.schemas.transaction_schemas import BatchCreate, BatchItem, TransferCreate
+
+
+def payroll(numbers: list, items: int) -> list:
+    return [
+        BatchItem(
+            transaction_type=TransactionType.TRANSFER,
+            amount=Decimal("1.00"),
+            destination_account_number=numbers[index % len(numbers)],
+            description="payroll",
+        )
+        for index in range(items)
+    ]
+
+
+def individual(session, source_id: int, user_id: int, items: list, batch_size: int) -> None:
+    for item in items:
+        AccountService(session).get_account(source_id, user_id)
+        TransactionService(session).process_transfer(
+            source_id,
+            TransferCreate(amount=item.amount, destination_account_number=item.destination_account_number,
+                           description=item.description),
+        )
+        session.expunge_all()
+
+
+def batched(session, source_id: int, user_id: int, items: list, batch_size: int) -> None:
+    for start in range(0, len(items), batch_size):
+        AccountService(session).get_account(source_id, user_id)
+        result = TransactionService(session).process_batch(source_id, BatchCreate(items=items[start:start + batch_size]))
+        assert result.failed == 0
+        session.expunge_all()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--items", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    for label, run in (("individual transfers", individual), (f"batches of {args.batch_size}", batched)):
+        engine, session_factory = make_session_factory(args.url)
+        with session_factory() as session:
+            source_id, *employee_ids = seed_accounts(session, args.accounts + 1)
+            source = session.get(Account, source_id)
+            user_id = source.user_id
+            numbers = [session.get(Account, account_id).account_number for account_id in employee_ids]
+        items = payroll(numbers, args.items)
+        with session_factory() as session, count_statements(engine) as counter, Timer() as timer:
+            run(session, source_id, user_id, items, args.batch_size)
+        report(
+            label, args.items, timer.elapsed,
+            statements_per_item=round(counter["statements"] / args.items, 2),
+            commits=counter["commits"],
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,35 @@
+"""CPU time per login at each bcrypt cost, to pick BCRYPT_ROUNDS for the hardware at hand.
+
+Each login is one verify_password call. The table also shows how many logins per second one
+core sustains, i.e. the PASSWORD_HASH_WORKERS needed for a target login rate.
+
+Usage: python benchmarks/bench_bcrypt_cost.py [--rounds 10 11 12 13 14] [--logins 20]
+"""
+import argparse
+import time
+
+import common  # noqa: F401  (environment defaults for settings)
+
+from src.infrastructure.security import build_password_context
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rounds", type=int, nargs="+", default=[10, 11, 12, 13, 14])
+    parser.add_argument("--logins", type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'rounds':>6} {'cpu ms/login':>13} {'wall ms/login':>14} {'logins/s/core':>14}")
+    for rounds in args.rounds:
+        context = build_password_context(["bcrypt"], rounds)
+        hashed = context.hash("bench-password")
+        cpu_start, wall_start = time.process_time(), time.perf_counter()
+        for _ in range(args.logins):
+            assert context.verify("bench-password", hashed)
+        cpu = (time.process_time() - cpu_start) / args.logins
+        wall = (time.perf_counter() - wall_start) / args.logins
+        print(f"{rounds:>6} {cpu * 1000:13.1f} {wall * 1000:14.1f} {1 / cpu:14.1f}")
+
+
+if __name__ == "__main__":
+    main()
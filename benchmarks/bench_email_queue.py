@@ -0,0 +1,102 @@
+"""Withdrawal latency with the notification email sent inline vs handed to the delivery worker.
+
+  inline  the request awaits the SMTP conversation, as create_and_send_notification used to
+  queued  the request only stores the notification; EmailDeliveryWorker mails it afterwards
+
+Mail goes to an in-process FakeSMTPServer that takes --smtp-ms per message, standing in for
+a slow relay. Withdrawals are sent --concurrency at a time through the ASGI app, each lane on
+its own account so the optimistic balance check never conflicts. On SQLite, much past four
+lanes the single writer lock (requests plus the worker's UPDATEs) dominates the queued tail.
+
+Usage: python benchmarks/bench_email_queue.py [--requests 200] [--concurrency 4] [--smtp-ms 200]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+
+from common import make_session_factory, seed_accounts
+
+import httpx
+from fastapi_mail import ConnectionConfig
+
+from main import app
+from src.application.services.email_delivery_service import email_worker
+from src.application.services.notification_service import NotificationService
+from src.infrastructure.config.email import PooledMailer
+from src.infrastructure.fake_smtp import FakeSMTPServer
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.security import create_tokens
+
+queued_create_and_send = NotificationService.create_and_send_notification
+
+
+async def inline_create_and_send(self, *args, **kwargs):
+    # The worker is stopped, so enqueue() is a no-op and the request pays for delivery itself
+    notification = await queued_create_and_send(self, *args, **kwargs)
+    if notification.email_to:
+        await email_worker.deliver(notification.id)
+    return notification
+
+
+async def withdrawals(client: httpx.AsyncClient, account_ids: list, headers: dict, requests: int):
+    latencies = []
+
+    async def lane(account_id: int, count: int):
+        for _ in range(count):
+            started = time.perf_counter()
+            response = await client.post(
+                f"/api/v1/transactions/{account_id}/withdrawal", json={"amount": "1.00"}, headers=headers
+            )
+            latencies.append(time.perf_counter() - started)
+            assert response.status_code == 201, response.text
+
+    started = time.perf_counter()
+    await asyncio.gather(*(lane(account_id, requests // len(account_ids)) for account_id in account_ids))
+    return latencies, time.perf_counter() - started
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--smtp-ms", type=float, default=200.0)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory()
+    with session_factory() as session:
+        account_ids = seed_accounts(session, args.concurrency)
+        user = session.query(User).one()
+        token = create_tokens(user.id, UserRole.USER, user.email)["access_token"]
+    headers = {"Authorization": f"Bearer {token}"}
+
+    async def run_all():
+        async with FakeSMTPServer(delay=args.smtp_ms / 1000) as sink:
+            email_worker.mailer = PooledMailer(ConnectionConfig(
+                MAIL_USERNAME="bench", MAIL_PASSWORD="bench", MAIL_FROM="bench@example.com", MAIL_PORT=sink.port,
+                MAIL_SERVER=sink.host, MAIL_FROM_NAME="Bench", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+                USE_CREDENTIALS=False
+            ))
+            transport = httpx.ASGITransport(app=app)
+            async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+                for label, create_and_send in (("inline", inline_create_and_send), ("queued", queued_create_and_send)):
+                    NotificationService.create_and_send_notification = create_and_send
+                    if label == "queued":
+                        email_worker.start()
+                    delivered = len(sink.messages)
+                    latencies, elapsed = await withdrawals(client, account_ids, headers, args.requests)
+                    if email_worker.running:
+                        await email_worker.drain()
+                        await email_worker.stop()
+                    quantiles = statistics.quantiles(latencies, n=100)
+                    print(
+                        f"{label:<7} {len(latencies) / elapsed:8.1f} req/s "
+                        f"p50={quantiles[49] * 1000:8.1f}ms p99={quantiles[98] * 1000:8.1f}ms "
+                        f"emails={len(sink.messages) - delivered}"
+                    )
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""Notification email rendering throughput.
+
+  format       the layout as one format string filled per send, like the old f-string
+               template (no escaping)
+  jinja        layout and body rendered through Jinja2 on every send
+  prerendered  EmailTemplates.render: static layout chunks joined around the rendered body
+
+Usage: python benchmarks/bench_email_templates.py [--renders 100000]
+"""
+import argparse
+import os
+
+from common import Timer, report
+
+from src.infrastructure.email_templates import TEMPLATE_DIR, EmailTemplates
+from src.infrastructure.models.notification import NotificationType
+
+TITLE = "Nueva transacción"
+CONTENT = "Se ha realizado un retiro de $1,250.00 desde su cuenta."
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--renders", type=int, default=100_000)
+    args = parser.parse_args()
+
+    templates = EmailTemplates()
+    with open(os.path.join(TEMPLATE_DIR, "layout.html"), encoding="utf-8") as source:
+        layout_format = (
+            source.read().replace("{", "{{").replace("}", "}}")
+            .replace("{{{{ title }}}}", "{title}").replace("{{{{ body }}}}", "        <p>{content}</p>")
+        )
+    layout = templates.environment.get_template("layout.html")
+
+    def render_format():
+        return layout_format.format(title=TITLE, content=CONTENT)
+
+    def render_jinja():
+        body = templates.render_body(NotificationType.TRANSACTION, TITLE, CONTENT)
+        return layout.render(title=TITLE, body=body)
+
+    def render_prerendered():
+        return templates.render(NotificationType.TRANSACTION, TITLE, CONTENT)
+
+    for label, render in (("format", render_format), ("jinja", render_jinja), ("prerendered", render_prerendered)):
+        size = len(render())
+        with Timer() as timer:
+            for _ in range(args.renders):
+                render()
+        report(label, args.renders, timer.elapsed, bytes=size)
+
+
+if __name__ == "__main__":
+    main()
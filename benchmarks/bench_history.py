@@ -0,0 +1,101 @@
+"""Transaction history for one busy account: full list vs keyset pages vs streaming export.
+
+  list    get_account_transactions + response models, what /history used to return
+  page    one keyset page, first and deep into the history (cursor at the middle row)
+  export  stream_transaction_export consumed to the end (NDJSON)
+
+With --memory each phase runs a second time under tracemalloc to report peak Python memory.
+
+Usage: python benchmarks/bench_history.py [--rows 1000000] [--limit 50] [--memory] [--url ...]
+"""
+import argparse
+import tracemalloc
+from datetime import datetime, timedelta
+
+from common import Timer, make_session_factory, report, seed_accounts
+
+from sqlalchemy import insert, select
+
+from src.application.services.transaction_service import (
+    TransactionService,
+    encode_cursor,
+    stream_transaction_export,
+)
+from src.infrastructure.models.transaction import Transaction, TransactionStatus, TransactionType
+from src.infrastructure.repositories.transaction_repository import TransactionRepository
+from src.presentation.schemas.transaction_schemas import TransactionResponse
+
+
+def seed_transactions(session, account_id: int, rows: int, batch: int = 50000) -> None:
+    start = datetime(2020, 1, 1)
+    for offset in range(0, rows, batch):
+        session.execute(insert(Transaction), [
+            {
+                "account_id": account_id,
+                "transaction_type": TransactionType.DEPOSIT,
+                "status": TransactionStatus.COMPLETED,
+                "amount": 10,
+                "reference_number": f"TRX-{index:010d}",
+                "created_at": start + timedelta(seconds=index),
+                "updated_at": start + timedelta(seconds=index),
+            }
+            for index in range(offset, min(offset + batch, rows))
+        ])
+    session.commit()
+
+
+def measured(label: str, rows: int, function, memory: bool) -> None:
+    with Timer() as timer:
+        function()
+    extra = {}
+    if memory:
+        # Separate pass: tracemalloc slows allocation-heavy code down several times over
+        tracemalloc.start()
+        function()
+        extra["peak_mb"] = f"{tracemalloc.get_traced_memory()[1] / 2 ** 20:.1f}"
+        tracemalloc.stop()
+    report(label, rows, timer.elapsed, **extra)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--limit", type=int, default=50)
+    parser.add_argument("--memory", action="store_true")
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        account_id = seed_accounts(session, 1)[0]
+        with Timer() as timer:
+            seed_transactions(session, account_id, args.rows)
+        report("seed", args.rows, timer.elapsed)
+        middle = session.execute(
+            select(Transaction).where(Transaction.reference_number == f"TRX-{args.rows // 2:010d}")
+        ).scalar_one()
+        middle_cursor = encode_cursor(middle)
+
+    def full_list():
+        with session_factory() as session:
+            items = TransactionRepository(session).get_account_transactions(account_id)
+            [TransactionResponse.model_validate(item) for item in items]
+
+    def page(cursor):
+        def run():
+            with session_factory() as session:
+                TransactionService(session).get_transaction_page(account_id, args.limit, before=cursor)
+        return run
+
+    def export():
+        for _ in stream_transaction_export(account_id, "ndjson", session_factory):
+            pass
+
+    measured("page (first)", args.limit, page(None), args.memory)
+    measured("page (middle)", args.limit, page(middle_cursor), args.memory)
+    measured("export ndjson", args.rows, export, args.memory)
+    measured("list", args.rows, full_list, args.memory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,70 @@
+"""Throughput of concurrent transfers hammering a few hot accounts, per locking mode.
+
+Usage: python benchmarks/bench_hot_accounts.py [--threads 8] [--ops 200] [--accounts 3] [--url ...]
+Against Postgres, pass --url postgresql://... to exercise real SELECT ... FOR UPDATE locks.
+"""
+import argparse
+import random
+import threading
+from decimal import Decimal
+
+from common import Timer, make_session_factory, report, seed_accounts
+
+from fastapi import HTTPException
+from sqlalchemy import func
+
+from src.application.services.transaction_service import TransactionService
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.account import Account
+from src.presentation.schemas.transaction_schemas import TransferCreate
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--ops", type=int, default=200, help="transfers per thread")
+    parser.add_argument("--accounts", type=int, default=3)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+    settings.ACCOUNT_LOCK_MAX_RETRIES = 50
+
+    for mode in ("pessimistic", "optimistic"):
+        settings.ACCOUNT_LOCKING_MODE = mode
+        engine, session_factory = make_session_factory(args.url)
+        with session_factory() as session:
+            account_ids = seed_accounts(session, args.accounts)
+            numbers = dict(session.query(Account.id, Account.account_number).all())
+            expected_total = session.query(func.sum(Account.balance)).scalar()
+        conflicts = []
+
+        def worker(seed):
+            rng = random.Random(seed)
+            with session_factory() as session:
+                service = TransactionService(session)
+                for _ in range(args.ops):
+                    source, destination = rng.sample(account_ids, 2)
+                    try:
+                        service.process_transfer(source, TransferCreate(
+                            amount=Decimal("1.00"), destination_account_number=numbers[destination]))
+                    except HTTPException as exc:
+                        conflicts.append(exc.status_code)
+                        session.rollback()
+
+        threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(args.threads)]
+        with Timer() as timer:
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        with session_factory() as session:
+            total = session.query(func.sum(Account.balance)).scalar()
+        report(
+            f"{mode} x{args.threads} threads", args.threads * args.ops, timer.elapsed,
+            rejected=len(conflicts), balance_conserved=total == expected_total,
+        )
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""Latency of an unrelated endpoint while a burst of logins hits bcrypt.
+
+  inline  verify_password called on the event loop, as login used to do
+  pooled  verify_password_async on the bounded password-hash pool
+
+A probe requests GET / every --probe-ms during the storm. Its latency is measured from when
+the request was due, so time the event loop spends stalled in bcrypt counts against it. Logins beyond PASSWORD_HASH_WORKERS + PASSWORD_HASH_QUEUE_SIZE get 429.
+
+Usage: python benchmarks/bench_login_storm.py [--logins 100] [--probe-ms 10]
+"""
+import argparse
+import asyncio
+import statistics
+import time
+from collections import Counter
+
+from common import make_session_factory
+
+import httpx
+
+from main import app
+from src.application.services import auth_service
+from src.infrastructure.models.user import User
+from src.infrastructure.security import get_password_hash, verify_password, verify_password_async
+
+PASSWORD = "bench-password"
+
+
+async def verify_inline(plain_password: str, hashed_password: str) -> bool:
+    return verify_password(plain_password, hashed_password)
+
+
+async def storm(logins: int, probe_ms: float):
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=None) as client:
+        await client.get("/")
+        done = asyncio.Event()
+        probe_latencies = []
+
+        async def probe():
+            while not done.is_set():
+                due = time.perf_counter() + probe_ms / 1000
+                await asyncio.sleep(probe_ms / 1000)
+                (await client.get("/")).raise_for_status()
+                probe_latencies.append(time.perf_counter() - due)
+
+        async def login():
+            response = await client.post("/api/v1/auth/login", json={"email": "storm@example.com", "password": PASSWORD})
+            return response.status_code
+
+        probe_task = asyncio.create_task(probe())
+        await asyncio.sleep(0.05)
+        started = time.perf_counter()
+        statuses = await asyncio.gather(*(login() for _ in range(logins)))
+        elapsed = time.perf_counter() - started
+        done.set()
+        await probe_task
+    return probe_latencies, Counter(statuses), elapsed
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--logins", type=int, default=100)
+    parser.add_argument("--probe-ms", type=float, default=10.0)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory()
+    with session_factory() as session:
+        session.add(User(email="storm@example.com", hashed_password=get_password_hash(PASSWORD), first_name="Storm"))
+        session.commit()
+
+    # One event loop for both runs: the app's async engine pool is bound to the loop that opened it
+    async def run_all():
+        for label, verify in (("inline", verify_inline), ("pooled", verify_password_async)):
+            auth_service.verify_password_async = verify
+            latencies, statuses, elapsed = await storm(args.logins, args.probe_ms)
+            quantiles = statistics.quantiles(latencies, n=100) if len(latencies) > 1 else latencies * 99
+            print(
+                f"{label:<7} logins={dict(statuses)} {elapsed:6.2f}s probes={len(latencies):<5} "
+                f"p50={quantiles[49] * 1000:8.1f}ms p99={quantiles[98] * 1000:8.1f}ms max={max(latencies) * 1000:8.1f}ms"
+            )
+
+    asyncio.run(run_all())
+
+
+if __name__ == "__main__":
+    main()
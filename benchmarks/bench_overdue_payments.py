@@ -0,0 +1,93 @@
+"""Overdue-payment job: per-object ORM loop vs chunked UPDATE ... RETURNING + executemany.
+
+  orm      the previous mark_payments_as_overdue: load every past-due payment, walk
+           payment.credit per row and add one Notification object at a time
+           (run on --orm-rows, it holds the whole set in the session)
+  chunked  PaymentService.mark_payments_as_overdue with --chunk-size
+
+Usage: python benchmarks/bench_overdue_payments.py [--rows 1000000] [--orm-rows 100000] [--credits 10000] [--chunk-size 5000] [--url ...]
+"""
+import argparse
+from datetime import datetime, timedelta
+
+from common import Timer, count_statements, make_session_factory, report
+
+from sqlalchemy import delete, insert, select
+
+from src.application.services.pyament_service import PaymentService
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.notification import Notification, NotificationPriority, NotificationType
+from src.infrastructure.models.payment import Payment, PaymentStatus
+from src.infrastructure.models.user import User
+
+
+def seed(session, rows: int, credits: int, batch: int = 50000) -> None:
+    session.execute(insert(User), [
+        {"email": f"owner{index}@example.com", "hashed_password": "x"} for index in range(credits)
+    ])
+    user_ids = session.scalars(select(User.id).order_by(User.id)).all()
+    session.execute(insert(Credit), [
+        {"user_id": user_id, "amount": 10000, "interest_rate": 10, "term_months": 12, "monthly_payment": 900,
+         "status": CreditStatus.ACTIVE, "purpose": "bench"}
+        for user_id in user_ids
+    ])
+    credit_ids = session.scalars(select(Credit.id).order_by(Credit.id)).all()
+    past = datetime.utcnow() - timedelta(days=1)
+    for offset in range(0, rows, batch):
+        session.execute(insert(Payment), [
+            {"credit_id": credit_ids[index % len(credit_ids)], "amount": 900, "payment_date": past,
+             "status": PaymentStatus.PENDING}
+            for index in range(offset, min(offset + batch, rows))
+        ])
+    session.commit()
+
+
+def orm_loop(session) -> int:
+    overdue = session.query(Payment)\
+        .filter(Payment.status == PaymentStatus.PENDING)\
+        .filter(Payment.payment_date < datetime.utcnow())\
+        .all()
+    for payment in overdue:
+        payment.status = PaymentStatus.OVERDUE
+        session.add(Notification(
+            user_id=payment.credit.user_id,
+            type=NotificationType.CREDIT_PAYMENT,
+            priority=NotificationPriority.HIGH,
+            title="Payment Overdue",
+            content=f"Your credit payment of ${payment.amount} is overdue."
+        ))
+    session.commit()
+    return len(overdue)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--orm-rows", type=int, default=100_000)
+    parser.add_argument("--credits", type=int, default=10_000)
+    parser.add_argument("--chunk-size", type=int, default=5000)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    for label, rows, job in (
+        ("orm", args.orm_rows, orm_loop),
+        ("chunked", args.rows, lambda session: PaymentService(session).mark_payments_as_overdue(args.chunk_size)),
+    ):
+        with session_factory() as session:
+            session.execute(delete(Notification))
+            session.execute(delete(Payment))
+            session.execute(delete(Credit))
+            session.execute(delete(User))
+            session.commit()
+            with Timer() as timer:
+                seed(session, rows, args.credits)
+            report(f"seed ({label})", rows, timer.elapsed)
+        with session_factory() as session, count_statements(engine) as counter, Timer() as timer:
+            marked = job(session)
+        assert marked == rows, marked
+        report(label, rows, timer.elapsed, statements=counter["statements"], commits=counter["commits"])
+
+
+if __name__ == "__main__":
+    main()
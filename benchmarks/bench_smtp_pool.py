@@ -0,0 +1,83 @@
+"""SMTP throughput: a connection per message vs pooled connections vs pooled batches.
+
+  fresh    FastMail.send_message, which connects (and would TLS + AUTH) for every message
+  pooled   PooledMailer.send_message, one message per call over reused connections
+  batched  PooledMailer.send_batch with --batch messages per call
+
+Mail goes to an in-process FakeSMTPServer; --connect-ms stands in for the TCP + TLS + AUTH
+handshake a real relay costs. --concurrency senders run at once, as the delivery worker does.
+
+Usage: python benchmarks/bench_smtp_pool.py [--messages 2000] [--concurrency 4] [--batch 50] [--connect-ms 30]
+"""
+import argparse
+import asyncio
+
+from common import Timer, report
+
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema, MessageType
+
+from src.infrastructure.config.email import PooledMailer
+from src.infrastructure.fake_smtp import FakeSMTPServer
+
+
+async def run(label: str, send, messages: list, concurrency: int, chunk: int, sink: FakeSMTPServer) -> None:
+    chunks = [messages[offset:offset + chunk] for offset in range(0, len(messages), chunk)]
+    lanes = [chunks[lane::concurrency] for lane in range(concurrency)]
+    connections = sink.connections
+
+    async def lane(assigned: list):
+        for batch in assigned:
+            await send(batch)
+
+    with Timer() as timer:
+        await asyncio.gather(*(lane(assigned) for assigned in lanes))
+    report(label, len(messages), timer.elapsed, connections=sink.connections - connections)
+
+
+async def main_async(args) -> None:
+    messages = [
+        MessageSchema(subject=f"Aviso {index}", recipients=["bench@example.com"], body="<p>Hola</p>",
+                      subtype=MessageType.html)
+        for index in range(args.messages)
+    ]
+    async with FakeSMTPServer(connect_delay=args.connect_ms / 1000) as sink:
+        config = ConnectionConfig(
+            MAIL_USERNAME="bench", MAIL_PASSWORD="bench", MAIL_FROM="bench@example.com", MAIL_PORT=sink.port,
+            MAIL_SERVER=sink.host, MAIL_FROM_NAME="Bench", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+            USE_CREDENTIALS=False
+        )
+        fresh = FastMail(config)
+        pooled = PooledMailer(config, pool_size=args.concurrency)
+
+        async def send_fresh(batch):
+            for message in batch:
+                await fresh.send_message(message)
+
+        async def send_pooled(batch):
+            for message in batch:
+                await pooled.send_message(message)
+
+        async def send_batched(batch):
+            errors = await pooled.send_batch(batch)
+            assert not any(errors), errors
+
+        await run("fresh", send_fresh, messages, args.concurrency, 1, sink)
+        await run("pooled", send_pooled, messages, args.concurrency, 1, sink)
+        await pooled.close()
+        await run(f"batched ({args.batch})", send_batched, messages, args.concurrency, args.batch, sink)
+        await pooled.close()
+        assert len(sink.messages) == 3 * args.messages
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--messages", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=4)
+    parser.add_argument("--batch", type=int, default=50)
+    parser.add_argument("--connect-ms", type=float, default=30.0)
+    args = parser.parse_args()
+    asyncio.run(main_async(args))
+
+
+if __name__ == "__main__":
+    main()
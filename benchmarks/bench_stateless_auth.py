@@ -0,0 +1,80 @@
+"""Balance lookups with the principal read from the token vs a user lookup per request.
+
+  claims  AUTH_VERIFY_USER_STATE=false: the token carries id, role, email and active
+  cached  AUTH_VERIFY_USER_STATE=true: user state re-checked through principal_cache
+  lookup  the previous behaviour, one SELECT on users per request
+
+Usage: python benchmarks/bench_stateless_auth.py [--requests 5000] [--url ...]
+"""
+import argparse
+
+from common import Timer, count_statements, make_session_factory, report, seed_accounts
+
+from fastapi import Depends, HTTPException
+from fastapi.testclient import TestClient
+
+from main import app
+from src.infrastructure.config.database import get_db
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.security import (
+    Principal,
+    TokenType,
+    create_tokens,
+    get_current_principal,
+    oauth2_scheme,
+    principal_cache,
+    verify_token,
+)
+
+
+def run(client: TestClient, engine, path: str, headers: dict, requests: int, label: str) -> None:
+    for _ in range(50):
+        client.get(path, headers=headers)
+    with count_statements(engine) as counter, Timer() as timer:
+        for _ in range(requests):
+            response = client.get(path, headers=headers)
+            assert response.status_code == 200, response.text
+    report(label, requests, timer.elapsed, statements_per_request=f"{counter['statements'] / requests:.1f}")
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--requests", type=int, default=5000)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        account_id = seed_accounts(session, 1)[0]
+        user = session.query(User).one()
+        token = create_tokens(user.id, UserRole.USER, user.email)["access_token"]
+
+    def get_bench_db():
+        with session_factory() as db:
+            yield db
+
+    def get_principal_by_lookup(token: str = Depends(oauth2_scheme), db=Depends(get_bench_db)) -> Principal:
+        payload = verify_token(token, TokenType.ACCESS)
+        user = db.query(User).filter(User.id == payload.get("sub")).first()
+        if user is None:
+            raise HTTPException(status_code=401, detail="User not found")
+        return Principal(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+
+    app.dependency_overrides[get_db] = get_bench_db
+    client = TestClient(app)
+    path = f"/api/v1/accounts/{account_id}/balance"
+    headers = {"Authorization": f"Bearer {token}"}
+
+    settings.AUTH_VERIFY_USER_STATE = False
+    run(client, engine, path, headers, args.requests, "claims")
+    settings.AUTH_VERIFY_USER_STATE = True
+    run(client, engine, path, headers, args.requests, "cached")
+    print(f"principal cache: {principal_cache.stats()}")
+    app.dependency_overrides[get_current_principal] = get_principal_by_lookup
+    run(client, engine, path, headers, args.requests, "lookup")
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    main()
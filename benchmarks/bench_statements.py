@@ -0,0 +1,62 @@
+"""Monthly statements/sec from the batch job, in this process and across a process pool.
+
+Every account gets --postings postings in the month and as many before it, so the opening
+balance has history to skip; the snapshot job runs first, as it would in production.
+
+Usage: python benchmarks/bench_statements.py [--accounts 200] [--postings 500] [--workers 4] [--url sqlite:///...]
+"""
+import argparse
+import tempfile
+from datetime import datetime, timedelta
+from decimal import Decimal
+
+from common import Timer, make_session_factory, report, seed_accounts
+
+from src.application.jobs import monthly_statements
+from src.application.services.ledger_service import LedgerService
+from src.infrastructure.models.account import Account
+from src.infrastructure.repositories.ledger_repository import LedgerRepository
+from src.infrastructure.statement_store import StatementStore
+
+MONTH = "2024-03"
+
+
+def seed_postings(session, account_ids: list, postings: int) -> None:
+    # Half in February, half in March
+    start = datetime(2024, 2, 1)
+    step = timedelta(days=60) / (2 * postings)
+    repository = LedgerRepository(session)
+    for account_id in account_ids:
+        repository.add_many([
+            {"transaction_id": None, "account_id": side, "amount": signed, "posted_at": start + step * index}
+            for index in range(2 * postings)
+            for side, signed in ((None, Decimal("-1.00")), (account_id, Decimal("1.00")))
+        ])
+    session.query(Account).update({Account.created_at: start})
+    session.commit()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--accounts", type=int, default=200)
+    parser.add_argument("--postings", type=int, default=500)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        seed_postings(session, seed_accounts(session, args.accounts), args.postings)
+        LedgerService(session).take_snapshots(now=datetime(2024, 5, 1))
+
+    for statement_format in ("csv", "pdf"):
+        for workers in (1, args.workers):
+            store = StatementStore(tempfile.mkdtemp())
+            with Timer() as timer:
+                written = monthly_statements.run(MONTH, [statement_format], workers, 10, session_factory, store)
+            report(f"{statement_format} workers={workers}", written, timer.elapsed, postings_per_statement=args.postings)
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""Transfers/sec for the multi-commit legacy path versus the single-commit unit of work.
+
+Usage: python benchmarks/bench_transfers.py [--transfers 2000] [--accounts 100] [--url sqlite:///...]
+"""
+import argparse
+import random
+from decimal import Decimal
+
+from common import Timer, count_statements, make_session_factory, report, seed_accounts
+
+from src.application.services.transaction_service import TransactionService
+from src.infrastructure.models.account import Account
+from src.infrastructure.models.transaction import TransactionStatus, TransactionType
+from src.presentation.schemas.transaction_schemas import TransferCreate
+
+
+def legacy_transfer(service: TransactionService, source_id: int, data: TransferCreate) -> None:
+    """The pre-unit-of-work flow: one commit + refresh per repository call"""
+    source = service.account_repository.get_by_id(source_id)
+    destination = service.account_repository.get_by_account_number(data.destination_account_number)
+    service.validate_accounts(source, destination)
+    service.validate_sufficient_funds(source, data.amount)
+    transaction = service.transaction_repository.create(
+        account_id=source_id,
+        transaction_type=TransactionType.TRANSFER,
+        amount=data.amount,
+        reference_number=service.generate_reference_number(),
+        destination_account_id=destination.id,
+        description=data.description,
+    )
+    service.account_repository.update_balance(source_id, -data.amount)
+    service.account_repository.update_balance(destination.id, data.amount)
+    service.transaction_repository.update_status(transaction.id, TransactionStatus.COMPLETED)
+
+
+def run(label, transfer, session_factory, engine, account_ids, transfers):
+    session = session_factory()
+    service = TransactionService(session)
+    numbers = {account.id: account.account_number for account in session.query(Account).all()}
+    rng = random.Random(42)
+    with count_statements(engine) as counter, Timer() as timer:
+        for _ in range(transfers):
+            source, destination = rng.sample(account_ids, 2)
+            data = TransferCreate(amount=Decimal("1.00"), destination_account_number=numbers[destination])
+            transfer(service, source, data)
+            session.expunge_all()
+    session.close()
+    report(
+        label, transfers, timer.elapsed,
+        statements_per_transfer=round(counter["statements"] / transfers, 1),
+        commits_per_transfer=round(counter["commits"] / transfers, 1),
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--transfers", type=int, default=2000)
+    parser.add_argument("--accounts", type=int, default=100)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    for label, transfer in (
+        ("legacy (5 commits)", legacy_transfer),
+        ("unit of work (1 commit)", lambda service, source, data: service.process_transfer(source, data)),
+    ):
+        engine, session_factory = make_session_factory(args.url)
+        with session_factory() as session:
+            account_ids = seed_accounts(session, args.accounts)
+        run(label, transfer, session_factory, engine, account_ids, args.transfers)
+        engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
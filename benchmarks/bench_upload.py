@@ -0,0 +1,72 @@
+"""Rows/sec and peak Python memory of a streamed CSV/NDJSON batch upload, by file size.
+
+The peak of the streamed upload should not grow with the file; for contrast, the peak of
+merely parsing the same rows as one JSON array body (what POST /batch would need) is shown.
+Throughput is measured on its own run, as tracemalloc slows allocation-heavy code down.
+
+Usage: python benchmarks/bench_upload.py [--rows 10000 100000] [--format csv|ndjson] [--accounts 500] [--url sqlite:///...]
+"""
+import argparse
+import json
+import os
+import tempfile
+import tracemalloc
+
+from common import Timer, count_statements, make_session_factory, report, seed_accounts
+from generate_payroll_file import rows, write
+
+from src.application.services.transaction_service import stream_batch_upload
+from src.presentation.schemas.transaction_schemas import BatchCreate
+
+
+def upload(args, path: str, count: int) -> dict:
+    engine, session_factory = make_session_factory(args.url)
+    with session_factory() as session:
+        source_id = seed_accounts(session, args.accounts + 1)[0]
+    with open(path, "rb") as file, count_statements(engine) as counter:
+        for chunk in stream_batch_upload(source_id, file, args.format, session_factory):
+            pass
+        summary = json.loads(chunk)
+    engine.dispose()
+    assert summary == {"completed": count, "failed": 0}, summary
+    return counter
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, nargs="+", default=[10_000, 100_000])
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--url", default=None)
+    args = parser.parse_args()
+
+    for count in args.rows:
+        handle, path = tempfile.mkstemp(suffix=f".{args.format}")
+        with os.fdopen(handle, "w", newline="", encoding="utf-8") as output:
+            write(output, count, args.format, args.accounts)
+        file_mb = round(os.path.getsize(path) / 2**20, 1)
+        try:
+            with Timer() as timer:
+                counter = upload(args, path, count)
+            tracemalloc.start()
+            upload(args, path, count)
+            streamed_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.reset_peak()
+            # The same rows as a JSON array body: the whole body, its parse and the validated items at once
+            body = json.dumps(list(rows(count, args.accounts, 0)))
+            BatchCreate.model_validate({"items": json.loads(body)})
+            array_peak = tracemalloc.get_traced_memory()[1]
+            tracemalloc.stop()
+        finally:
+            os.remove(path)
+        report(
+            f"upload {count} rows", count, timer.elapsed,
+            commits=counter["commits"],
+            file_mb=file_mb,
+            streamed_peak_mb=round(streamed_peak / 2**20, 1),
+            json_array_peak_mb=round(array_peak / 2**20, 1),
+        )
+
+
+if __name__ == "__main__":
+    main()
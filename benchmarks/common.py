@@ -0,0 +1,100 @@
+import os
+import sys
+import tempfile
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Benchmarks never talk to a mail server; make settings importable without a .env
+for name, value in (
+    ("MAIL_USERNAME", "bench@example.com"),
+    ("MAIL_PASSWORD", "bench"),
+    ("MAIL_FROM", "bench@example.com"),
+    ("MAIL_PORT", "587"),
+    ("MAIL_SERVER", "localhost"),
+    ("MAIL_FROM_NAME", "Bench"),
+):
+    os.environ.setdefault(name, value)
+os.environ.setdefault("DATABASE_URL", "sqlite:///" + os.path.join(tempfile.gettempdir(), "banking_bench.db"))
+
+from sqlalchemy import create_engine, event
+from sqlalchemy.orm import sessionmaker
+
+from src.infrastructure.models.base import Base
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountStatus, AccountType
+from src.infrastructure.models.credit import Credit
+from src.infrastructure.models.transaction import Transaction
+from src.infrastructure.models.notification import Notification
+from src.infrastructure.models.payment import Payment
+
+
+def make_session_factory(url: str = None, fresh: bool = True):
+    """Create an engine with an empty schema; defaults to a SQLite file in the temp dir"""
+    url = url or os.environ["DATABASE_URL"]
+    if fresh and url.startswith("sqlite:///"):
+        path = url[len("sqlite:///"):]
+        if os.path.exists(path):
+            os.remove(path)
+    connect_args = {"check_same_thread": False} if url.startswith("sqlite") else {}
+    engine = create_engine(url, connect_args=connect_args)
+    if fresh:
+        Base.metadata.drop_all(bind=engine)
+        Base.metadata.create_all(bind=engine)
+    return engine, sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+def seed_accounts(session, count: int, balance: Decimal = Decimal("1000000.00")) -> list:
+    user = User(email="bench@example.com", hashed_password="x", first_name="Bench", last_name="User")
+    session.add(user)
+    session.flush()
+    accounts = [
+        Account(
+            user_id=user.id,
+            account_number=f"{index:012d}",
+            account_type=AccountType.DEBIT,
+            status=AccountStatus.ACTIVE,
+            balance=balance,
+            currency="MXN",
+        )
+        for index in range(1, count + 1)
+    ]
+    session.add_all(accounts)
+    session.commit()
+    return [account.id for account in accounts]
+
+
+@contextmanager
+def count_statements(engine):
+    """Count the SQL statements (including COMMIT) sent to the engine"""
+    counter = {"statements": 0, "commits": 0}
+
+    def before_cursor_execute(*args):
+        counter["statements"] += 1
+
+    def commit(*args):
+        counter["commits"] += 1
+
+    event.listen(engine, "before_cursor_execute", before_cursor_execute)
+    event.listen(engine, "commit", commit)
+    try:
+        yield counter
+    finally:
+        event.remove(engine, "before_cursor_execute", before_cursor_execute)
+        event.remove(engine, "commit", commit)
+
+
+def report(label: str, operations: int, elapsed: float, **extra) -> None:
+    details = " ".join(f"{key}={value}" for key, value in extra.items())
+    print(f"{label:<28} {operations:>9} ops {elapsed:8.3f}s {operations / elapsed:10.1f} ops/s {details}")
+
+
+class Timer:
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.elapsed = time.perf_counter() - self.start
@@ -0,0 +1,57 @@
+"""Write a synthetic payroll upload for POST /transactions/{account_id}/batch/upload.
+
+Rows are transfers of 0.01-1.00 to accounts 000000000002 .. --accounts + 1 (the numbers
+seed_accounts gives), with every --deposit-every'th row a deposit instead. Written as it is
+generated, so a 1M-row file takes no more memory than a small one.
+
+Usage: python benchmarks/generate_payroll_file.py payroll.csv [--rows 1000000] [--format csv|ndjson] [--accounts 500]
+"""
+import argparse
+import csv
+import json
+import random
+import sys
+
+FIELDS = ("transaction_type", "amount", "destination_account_number", "description")
+
+
+def rows(count: int, accounts: int, deposit_every: int, seed: int = 42):
+    rng = random.Random(seed)
+    for index in range(count):
+        amount = f"{rng.randint(1, 100) / 100:.2f}"
+        if deposit_every and index % deposit_every == deposit_every - 1:
+            yield {"transaction_type": "DEPOSIT", "amount": amount, "description": f"refund {index}"}
+        else:
+            destination = f"{index % accounts + 2:012d}"
+            yield {"transaction_type": "TRANSFER", "amount": amount, "destination_account_number": destination,
+                   "description": f"payroll {index}"}
+
+
+def write(output, count: int, upload_format: str, accounts: int = 500, deposit_every: int = 0) -> None:
+    if upload_format == "csv":
+        writer = csv.DictWriter(output, fieldnames=FIELDS)
+        writer.writeheader()
+        writer.writerows(rows(count, accounts, deposit_every))
+    else:
+        for row in rows(count, accounts, deposit_every):
+            output.write(json.dumps(row) + "\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("output", help="file to write, - for stdout")
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--format", choices=("csv", "ndjson"), default="csv")
+    parser.add_argument("--accounts", type=int, default=500)
+    parser.add_argument("--deposit-every", type=int, default=0)
+    args = parser.parse_args()
+
+    if args.output == "-":
+        write(sys.stdout, args.rows, args.format, args.accounts, args.deposit_every)
+        return
+    with open(args.output, "w", newline="", encoding="utf-8") as output:
+        write(output, args.rows, args.format, args.accounts, args.deposit_every)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,12 @@
+import logging
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from src.application.jobs.scheduler import scheduler
+from src.application.services.email_delivery_service import email_worker
 from src.infrastructure.config.settings import settings
+from src.infrastructure.monitoring.metrics import mark_worker_stopped
+from src.infrastructure.monitoring.request_metrics import RequestMetricsMiddleware
 from src.presentation.api.routes import (
     user_routes,
     auth_routes,
@@ -8,12 +14,32 @@ from src.presentation.api.routes import (
     credit_routes,
     transaction_routes,
     notification_routes,
-    payment_routes
+    payment_routes,
+    monitoring_routes,
+    metrics_routes
 )
 
+logger = logging.getLogger(__name__)
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    email_worker.start()
+    try:
+        await email_worker.recover()
+    except Exception:
+        # Unsent rows stay in the table; the next start picks them up
+        logger.exception("Could not scan for unsent notification emails")
+    if settings.SCHEDULER_ENABLED:
+        scheduler.start()
+    yield
+    await scheduler.stop()
+    await email_worker.stop()
+    mark_worker_stopped()
+
 app = FastAPI(
     title=settings.PROJECT_NAME,
-    openapi_url=f"{settings.API_V1_STR}/openapi.json"
+    openapi_url=f"{settings.API_V1_STR}/openapi.json",
+    lifespan=lifespan
 )
 
 app.swagger_ui_parameters = {
@@ -31,6 +57,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+if settings.REQUEST_METRICS_ENABLED or settings.QUERY_COUNT_DEBUG:
+    app.add_middleware(
+        RequestMetricsMiddleware,
+        max_selects=settings.QUERY_COUNT_MAX_SELECTS if settings.QUERY_COUNT_DEBUG else None
+    )
+
 app.include_router(auth_routes.router, prefix=f"{settings.API_V1_STR}/auth", tags=["authentication"])
 app.include_router(user_routes.router, prefix=f"{settings.API_V1_STR}/users", tags=["users"])
 app.include_router(account_routes.router, prefix=f"{settings.API_V1_STR}/accounts", tags=["accounts"])
@@ -38,6 +70,10 @@ app.include_router(credit_routes.router, prefix=f"{settings.API_V1_STR}/credits"
 app.include_router(transaction_routes.router, prefix=f"{settings.API_V1_STR}/transactions", tags=["transactions"])
 app.include_router(notification_routes.router, prefix=f"{settings.API_V1_STR}/notifications", tags=["notifications"])
 app.include_router(payment_routes.router, prefix=f"{settings.API_V1_STR}/payments", tags=["payments"])
+app.include_router(monitoring_routes.router, prefix=f"{settings.API_V1_STR}/monitoring", tags=["monitoring"])
+if settings.REQUEST_METRICS_ENABLED:
+    # Unversioned, where scrapers look for it; guarded by METRICS_SCRAPE_TOKEN
+    app.include_router(metrics_routes.router)
 
 @app.get("/")
 async def root():
@@ -0,0 +1,34 @@
+"""Snapshot end-of-day balances of every account with postings on each closed day not done yet.
+
+    python -m src.application.jobs.balance_snapshots [--chunk-size 1000]
+
+Incremental and safe to re-run: each run starts from the last snapshotted day, and every chunk
+of accounts is its own transaction.
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.ledger_service import LedgerService
+from src.infrastructure.config.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, chunk_size: Optional[int] = None) -> int:
+    with session_factory() as db:
+        return LedgerService(db).take_snapshots(chunk_size=chunk_size)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    taken = run(chunk_size=args.chunk_size)
+    logger.info("Took %s balance snapshots in %.1fs", taken, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
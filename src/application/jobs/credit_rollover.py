@@ -0,0 +1,32 @@
+"""Create the pending installment of every active credit falling due within CREDIT_INSTALLMENT_LEAD_DAYS
+and move next_payment_date on by a month, until the credit's term is covered.
+
+    python -m src.application.jobs.credit_rollover [--chunk-size 1000]
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.credit_service import CreditService
+from src.infrastructure.config.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, chunk_size: Optional[int] = None) -> int:
+    with session_factory() as db:
+        return CreditService(db).roll_over_payment_dates(chunk_size=chunk_size)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    rolled = run(chunk_size=args.chunk_size)
+    logger.info("Rolled over %s credits in %.1fs", rolled, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
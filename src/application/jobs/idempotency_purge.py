@@ -0,0 +1,14 @@
+"""Delete Idempotency-Key records whose TTL has passed.
+
+Expired keys are already ignored (and reused) by new requests; this keeps the table small.
+"""
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.idempotency_service import IdempotencyService
+from src.infrastructure.config.database import SessionLocal
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, chunk_size: Optional[int] = None) -> int:
+    with session_factory() as db:
+        return IdempotencyService(db).purge_expired(chunk_size=chunk_size)
@@ -0,0 +1,37 @@
+"""Check every account's cached balance against the sum of its ledger postings.
+
+    python -m src.application.jobs.ledger_verification [--chunk-size 1000]
+
+Read-only: mismatches are logged and exported as ledger_balance_mismatches, not corrected.
+Exits with status 1 when any account disagrees, so it can gate a deploy or a cron alert.
+"""
+import argparse
+import logging
+import sys
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.ledger_service import LedgerService
+from src.infrastructure.config.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, chunk_size: Optional[int] = None) -> int:
+    """Number of accounts whose balance differs from their postings"""
+    with session_factory() as db:
+        return len(LedgerService(db).verify_balances(chunk_size=chunk_size))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    mismatched = run(chunk_size=args.chunk_size)
+    logger.info("Verified balances in %.1fs: %s accounts mismatched", time.perf_counter() - started, mismatched)
+    sys.exit(1 if mismatched else 0)
+
+if __name__ == "__main__":
+    main()
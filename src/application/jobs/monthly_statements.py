@@ -0,0 +1,88 @@
+"""Generate the statements of a closed month for every account, in parallel worker processes.
+
+    python -m src.application.jobs.monthly_statements --month 2024-03 [--format pdf --format csv]
+        [--workers 8] [--chunk-size 100]
+
+Rendering is CPU-bound, so the accounts are split into chunks across a process pool, each worker
+with its own database connection. Statements already in STATEMENT_CACHE_DIR are skipped, so an
+interrupted run can simply be started again.
+"""
+import argparse
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+from fastapi import HTTPException
+from sqlalchemy import create_engine
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.statement_service import (
+    STATEMENT_MEDIA_TYPES,
+    generate_statements,
+    month_is_closed,
+    month_range
+)
+from src.infrastructure.config.database import SessionLocal
+from src.infrastructure.repositories.account_repository import AccountRepository
+from src.infrastructure.statement_store import StatementStore, statement_store
+
+logger = logging.getLogger(__name__)
+
+# Set in each pool worker; its engine is created there, so no connection is shared with the parent
+_worker_session_factory: Optional[sessionmaker] = None
+_worker_store: Optional[StatementStore] = None
+
+def _init_worker(database_url: str, directory: str) -> None:
+    global _worker_session_factory, _worker_store
+    _worker_session_factory = sessionmaker(autocommit=False, autoflush=False, bind=create_engine(database_url))
+    _worker_store = StatementStore(directory)
+
+def _generate_chunk(account_ids: List[int], month: str, statement_formats: List[str]) -> int:
+    return generate_statements(account_ids, month, statement_formats, _worker_session_factory, _worker_store)
+
+def run(month: str,
+        statement_formats: List[str],
+        workers: Optional[int] = None,
+        chunk_size: int = 100,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        store: StatementStore = statement_store) -> int:
+    """Number of statements written; workers=1 renders in this process"""
+    _, end = month_range(month)
+    if not month_is_closed(month):
+        raise ValueError(f"{month} is not closed yet")
+    with session_factory() as db:
+        account_ids = AccountRepository(db).get_ids_opened_before(end)
+    chunks = [account_ids[start:start + chunk_size] for start in range(0, len(account_ids), chunk_size)]
+    if workers == 1:
+        return sum(generate_statements(chunk, month, statement_formats, session_factory, store) for chunk in chunks)
+
+    database_url = session_factory.kw["bind"].url.render_as_string(hide_password=False)
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(database_url, store.directory)) as executor:
+        return sum(executor.map(
+            _generate_chunk, chunks, [month] * len(chunks), [statement_formats] * len(chunks)
+        ))
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--month", required=True, help="YYYY-MM")
+    parser.add_argument("--format", action="append", choices=sorted(STATEMENT_MEDIA_TYPES), dest="formats")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=100)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    try:
+        written = run(args.month, args.formats or ["pdf"], args.workers, args.chunk_size)
+    except HTTPException as error:
+        logger.error("%s", error.detail)
+        sys.exit(2)
+    except ValueError as error:
+        logger.error("%s", error)
+        sys.exit(2)
+    logger.info("Wrote %s statements for %s in %.1fs", written, args.month, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
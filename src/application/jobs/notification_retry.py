@@ -0,0 +1,18 @@
+"""Hand notifications whose email is still owed back to the delivery worker.
+
+The worker retries failures itself while the process lives; this catches what it could not:
+emails dropped on a full queue, rows left behind by a crashed replica, or created by a job
+running in another process.
+"""
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.email_delivery_service import EmailDeliveryWorker, email_worker
+from src.infrastructure.config.database import SessionLocal
+from src.infrastructure.repositories.notification_repository import NotificationRepository
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, worker: EmailDeliveryWorker = email_worker) -> int:
+    if not worker.running:
+        return 0
+    with session_factory() as db:
+        pending = NotificationRepository(db).get_pending_email_ids(worker.max_attempts, limit=worker.queue_size)
+    return worker.enqueue_threadsafe(pending)
@@ -0,0 +1,34 @@
+"""Mark past-due pending payments as overdue and notify their owners.
+
+    python -m src.application.jobs.overdue_payments [--chunk-size 5000]
+
+Safe to run while the API is up and from several processes: every chunk is its own
+transaction, and on PostgreSQL concurrent runs skip each other's locked rows.
+"""
+import argparse
+import logging
+import time
+from typing import Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.pyament_service import PaymentService
+from src.infrastructure.config.database import SessionLocal
+
+logger = logging.getLogger(__name__)
+
+def run(session_factory: sessionmaker[Session] = SessionLocal, chunk_size: Optional[int] = None) -> int:
+    with session_factory() as db:
+        return PaymentService(db).mark_payments_as_overdue(chunk_size=chunk_size)
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--chunk-size", type=int, default=None)
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
+    started = time.perf_counter()
+    marked = run(chunk_size=args.chunk_size)
+    logger.info("Marked %s payments as overdue in %.1fs", marked, time.perf_counter() - started)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,206 @@
+"""Periodic background jobs, run by every API replica or by a dedicated worker process.
+
+    python -m src.application.jobs.scheduler
+
+A job runs on a worker thread, never on the event loop, and only where its row in
+job_leases could be taken: one replica per interval runs it, whichever polls first.
+"""
+import asyncio
+import logging
+import os
+import socket
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
+from typing import Callable, Dict, Optional
+
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.jobs import (
+    balance_snapshots,
+    credit_rollover,
+    idempotency_purge,
+    ledger_verification,
+    notification_retry,
+    overdue_payments
+)
+from src.application.services.email_delivery_service import email_worker
+from src.infrastructure.config.database import SessionLocal
+from src.infrastructure.config.settings import settings
+from src.infrastructure.repositories.job_lease_repository import JobLeaseRepository
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class JobMetrics:
+    runs: int = 0
+    failures: int = 0
+    rows_total: int = 0
+    last_rows: Optional[int] = None
+    last_duration_seconds: Optional[float] = None
+    last_lag_seconds: Optional[float] = None
+    last_started_at: Optional[datetime] = None
+    last_error: Optional[str] = None
+
+@dataclass
+class Job:
+    name: str
+    interval_seconds: float
+    run: Callable[[sessionmaker], Optional[int]]
+    metrics: JobMetrics = field(default_factory=JobMetrics)
+    next_check: float = 0.0
+
+class JobScheduler:
+    def __init__(
+        self,
+        session_factory: sessionmaker[Session] = SessionLocal,
+        owner: Optional[str] = None,
+        tick_seconds: Optional[float] = None,
+        lease_seconds: Optional[float] = None,
+        clock: Callable[[], datetime] = datetime.utcnow
+    ):
+        self.session_factory = session_factory
+        self.owner = owner or f"{socket.gethostname()}:{os.getpid()}:{uuid.uuid4().hex[:8]}"
+        self.tick_seconds = tick_seconds or settings.SCHEDULER_TICK_SECONDS
+        self.lease_seconds = lease_seconds or settings.JOB_LEASE_SECONDS
+        self.clock = clock
+        self.jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._task: Optional[asyncio.Task] = None
+        self._running: Dict[str, asyncio.Future] = {}
+
+    def register(self, name: str, interval_seconds: float, run: Callable[[sessionmaker], Optional[int]]) -> Job:
+        job = self.jobs[name] = Job(name, interval_seconds, run)
+        return job
+
+    def run_job(self, job: Job) -> bool:
+        """Run `job` here if it is due and its lease is free; blocking, so call it off the event loop"""
+        with self.session_factory() as db:
+            leases = JobLeaseRepository(db)
+            lease = leases.ensure(job.name)
+            last_run_at = lease.last_run_at
+            now = self.clock()
+            if last_run_at and last_run_at + timedelta(seconds=job.interval_seconds) > now:
+                self._schedule_check(job, last_run_at + timedelta(seconds=job.interval_seconds) - now)
+                return False
+            if not leases.acquire(job.name, self.owner, now, job.interval_seconds, self.lease_seconds):
+                # Running elsewhere: look again once that run would have finished
+                self._schedule_check(job, timedelta(seconds=min(job.interval_seconds, self.lease_seconds)))
+                return False
+
+        lag = (now - last_run_at).total_seconds() - job.interval_seconds if last_run_at else 0.0
+        started = time.perf_counter()
+        rows, error = None, None
+        try:
+            rows = job.run(self.session_factory)
+        except Exception as exc:
+            error = exc
+            logger.exception("Job %s failed", job.name)
+        duration = time.perf_counter() - started
+
+        with self.session_factory() as db:
+            JobLeaseRepository(db).release(job.name, self.owner, now, duration, rows)
+        with self._lock:
+            metrics = job.metrics
+            metrics.runs += 1
+            metrics.last_started_at = now
+            metrics.last_duration_seconds = round(duration, 3)
+            metrics.last_lag_seconds = round(max(lag, 0.0), 3)
+            metrics.last_rows = rows
+            metrics.rows_total += rows or 0
+            if error is not None:
+                metrics.failures += 1
+                metrics.last_error = repr(error)
+        self._schedule_check(job, timedelta(seconds=job.interval_seconds))
+        logger.info("Job %s processed %s rows in %.2fs (lag %.1fs)", job.name, rows, duration, max(lag, 0.0))
+        return True
+
+    def _run_job_logged(self, job: Job) -> bool:
+        try:
+            return self.run_job(job)
+        except Exception:
+            # The lease table itself is unreachable; do not hammer it every tick
+            logger.exception("Could not schedule job %s", job.name)
+            self._schedule_check(job, timedelta(seconds=min(job.interval_seconds, 60)))
+            return False
+
+    def _schedule_check(self, job: Job, delay: timedelta) -> None:
+        job.next_check = time.monotonic() + delay.total_seconds()
+
+    def run_pending(self) -> int:
+        """Run every due job once in the calling thread; returns how many ran"""
+        return sum(self.run_job(job) for job in self.jobs.values())
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            for job in self.jobs.values():
+                if job.name in self._running or time.monotonic() < job.next_check:
+                    continue
+                future = loop.run_in_executor(self._executor, self._run_job_logged, job)
+                self._running[job.name] = future
+                future.add_done_callback(lambda _, name=job.name: self._running.pop(name, None))
+            await asyncio.sleep(self.tick_seconds)
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._executor = ThreadPoolExecutor(max_workers=max(len(self.jobs), 1), thread_name_prefix="job")
+        self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+        # Let running jobs finish their current chunk and release their leases
+        await asyncio.gather(*self._running.values(), return_exceptions=True)
+        self._executor.shutdown(wait=True)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "owner": self.owner,
+                "jobs": {
+                    job.name: {
+                        "interval_seconds": job.interval_seconds,
+                        "running": job.name in self._running,
+                        **vars(job.metrics),
+                    }
+                    for job in self.jobs.values()
+                },
+            }
+
+def default_scheduler() -> JobScheduler:
+    scheduler = JobScheduler()
+    scheduler.register("overdue_payments", settings.OVERDUE_PAYMENTS_INTERVAL_SECONDS, overdue_payments.run)
+    scheduler.register("credit_rollover", settings.CREDIT_ROLLOVER_INTERVAL_SECONDS, credit_rollover.run)
+    scheduler.register("notification_retry", settings.NOTIFICATION_RETRY_INTERVAL_SECONDS, notification_retry.run)
+    scheduler.register("idempotency_purge", settings.IDEMPOTENCY_PURGE_INTERVAL_SECONDS, idempotency_purge.run)
+    scheduler.register("ledger_verification", settings.LEDGER_VERIFICATION_INTERVAL_SECONDS, ledger_verification.run)
+    scheduler.register("balance_snapshots", settings.BALANCE_SNAPSHOT_INTERVAL_SECONDS, balance_snapshots.run)
+    return scheduler
+
+scheduler = default_scheduler()
+
+async def serve() -> None:
+    # The worker process also mails what its jobs (and the retry scan) queue
+    email_worker.start()
+    scheduler.start()
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await scheduler.stop()
+        await email_worker.stop()
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s %(message)s")
+    try:
+        asyncio.run(serve())
+    except KeyboardInterrupt:
+        pass
@@ -5,6 +5,7 @@ from typing import List
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
 
+from src.infrastructure.http_cache import invalidate_account
 from src.infrastructure.repositories.account_repository import AccountRepository
 from src.infrastructure.models.account import Account, AccountStatus
 from src.presentation.schemas.account_schemas import AccountCreate, AccountUpdate
@@ -22,7 +23,9 @@ class AccountService:
 
     def create_account(self, account_data: AccountCreate, user_id: int) -> Account:
         account_number = self.generate_account_number()
-        return self.repository.create(account_data, user_id, account_number)
+        account = self.repository.create(account_data, user_id, account_number)
+        invalidate_account(user_id)
+        return account
 
     def get_account(self, account_id: int, user_id: int) -> Account:
         account = self.repository.get_by_id(account_id)
@@ -47,7 +50,9 @@ class AccountService:
             raise HTTPException(status_code=400, detail="Account status is already set to the desired status")
         if account.status == AccountStatus.CLOSED:
             raise HTTPException(status_code=400, detail="Account is closed. Cannot update status")
-        return self.repository.update(account_id, AccountUpdate(status=status))
+        account = self.repository.update(account_id, AccountUpdate(status=status))
+        invalidate_account(account.user_id, account.id)
+        return account
 
     def check_balance(self, account_id: int, user_id: int) -> Decimal:
         return self.get_account(account_id, user_id).balance
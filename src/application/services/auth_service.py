@@ -1,24 +1,48 @@
+import logging
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Optional, Union
 from jose import JWTError, jwt
 from fastapi import HTTPException, status
-from src.infrastructure.repositories.user_repository import UserRepository
-from src.infrastructure.security import verify_password
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from src.infrastructure.config.database import AsyncSessionLocal
+from src.infrastructure.repositories.user_repository import AsyncUserRepository, UserRepository
+from src.infrastructure.security import get_password_hash_async, password_needs_update, verify_password_async
 from src.presentation.schemas.auth_schemas import TokenData
 from src.infrastructure.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
+async def upgrade_password_hash(
+    user_id: int,
+    password: str,
+    old_hash: str,
+    session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal
+) -> bool:
+    """Re-hash with the configured scheme and cost; scheduled as a background task after login"""
+    try:
+        new_hash = await get_password_hash_async(password)
+        async with session_factory() as db:
+            return await AsyncUserRepository(db).replace_password_hash(user_id, old_hash, new_hash)
+    except Exception:
+        # The old hash keeps working; the upgrade is retried on the next login
+        logger.exception("Password hash upgrade failed for user %s", user_id)
+        return False
+
 class AuthService:
-    def __init__(self, user_repository: UserRepository):
+    def __init__(self, user_repository: Union[UserRepository, AsyncUserRepository]):
         self.user_repository = user_repository
 
-    def authenticate_user(self, email: str, password: str):
-        user = self.user_repository.get_by_email(email=email)
+    async def authenticate_user(self, email: str, password: str):
+        user = await self.user_repository.get_by_email(email=email)
         if not user:
             return False
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             return False
         return user
 
+    def needs_password_upgrade(self, user) -> bool:
+        return password_needs_update(user.hashed_password)
+
     def create_access_token(self, data: dict, expires_delta: Optional[timedelta] = None) -> str:
         to_encode = data.copy()
         if expires_delta:
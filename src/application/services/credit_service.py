@@ -1,13 +1,23 @@
+import calendar
 from decimal import Decimal
 from typing import List, Optional
 from fastapi import HTTPException
 from sqlalchemy.orm import Session
-from datetime import datetime
+from datetime import datetime, timedelta
 
+from src.infrastructure.http_cache import invalidate_credit
 from src.infrastructure.repositories.credit_repository import CreditRepository
+from src.infrastructure.config.settings import settings
 from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.payment import PaymentStatus
 from src.presentation.schemas.credit_schemas import CreditCreate, CreditUpdate
 
+def add_months(moment: datetime, months: int) -> datetime:
+    """Same day `months` later, clamped to the end of shorter months"""
+    month_index = moment.month - 1 + months
+    year, month = moment.year + month_index // 12, month_index % 12 + 1
+    return moment.replace(year=year, month=month, day=min(moment.day, calendar.monthrange(year, month)[1]))
+
 class CreditService:
     def __init__(self, db: Session):
         self.repository = CreditRepository(db)
@@ -41,7 +51,9 @@ class CreditService:
         credit_dict['monthly_payment'] = credit_dict.get('monthly_payment', monthly_payment)
         credit_dict['remaining_amount'] = credit_dict.get('remaining_amount', credit_data.amount)
 
-        return self.repository.create(CreditCreate(**credit_dict))
+        credit = self.repository.create(CreditCreate(**credit_dict))
+        invalidate_credit(credit.user_id)
+        return credit
 
     def get_credit(self, credit_id: int, user_id: int) -> Credit:
         credit = self.repository.get_by_id(credit_id)
@@ -77,4 +89,44 @@ class CreditService:
             "status": status,
             "approved_at": datetime.now() if status == CreditStatus.APPROVED else None
         }
-        return self.repository.update(credit_id, CreditUpdate(**update_data))
\ No newline at end of file
+        credit = self.repository.update(credit_id, CreditUpdate(**update_data))
+        invalidate_credit(credit.user_id, credit.id)
+        return credit
+
+    def roll_over_payment_dates(self, now: Optional[datetime] = None, chunk_size: Optional[int] = None) -> int:
+        """Create the pending installments falling due within CREDIT_INSTALLMENT_LEAD_DAYS and move the date on.
+
+        Installments are created ahead of their due date so the owner can pay before the overdue job
+        flags them. A credit stops getting installments once it has term_months of them or nothing
+        remains to be paid; its next_payment_date is then cleared.
+        """
+        now = now or datetime.utcnow()
+        chunk_size = chunk_size or settings.CREDIT_ROLLOVER_CHUNK_SIZE
+        cutoff = now + timedelta(days=settings.CREDIT_INSTALLMENT_LEAD_DAYS)
+        last_id, rolled = 0, 0
+        while True:
+            due = self.repository.get_due_for_rollover(cutoff, last_id, chunk_size)
+            if not due:
+                return rolled
+            next_payment_dates, payments = [], []
+            for credit_id, _, next_payment_date, monthly_payment, term_months, remaining_amount, installments in due:
+                left = 0 if remaining_amount is not None and remaining_amount <= 0 else term_months - installments
+                # A credit the job has not seen for a while gets one installment per missed month
+                months = 0
+                while months < left and add_months(next_payment_date, months) <= cutoff:
+                    payments.append({
+                        "credit_id": credit_id,
+                        "amount": monthly_payment,
+                        "payment_date": add_months(next_payment_date, months),
+                        "status": PaymentStatus.PENDING,
+                    })
+                    months += 1
+                next_payment_dates.append({
+                    "id": credit_id,
+                    "next_payment_date": add_months(next_payment_date, months) if months < left else None
+                })
+            self.repository.roll_over(next_payment_dates, payments)
+            for credit_id, user_id, *_ in due:
+                invalidate_credit(user_id, credit_id)
+            last_id = due[-1].id
+            rolled += len(due)
@@ -0,0 +1,202 @@
+import asyncio
+import logging
+import random
+from typing import Dict, Iterable, List, Optional, Set
+
+from fastapi_mail import MessageSchema, MessageType
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.infrastructure.config.database import AsyncSessionLocal
+from src.infrastructure.config.email import PooledMailer, fastmail
+from src.infrastructure.config.settings import settings
+from src.infrastructure.email_templates import email_templates
+from src.infrastructure.models.notification import Notification
+from src.infrastructure.monitoring.metrics import NOTIFICATION_EMAILS
+from src.infrastructure.repositories.notification_repository import AsyncNotificationRepository
+
+logger = logging.getLogger(__name__)
+
+def build_email_message(notification: Notification) -> MessageSchema:
+    return MessageSchema(
+        subject=notification.title,
+        recipients=[notification.email_to],
+        body=email_templates.render(notification.type, notification.title, notification.content),
+        subtype=MessageType.html
+    )
+
+class EmailDeliveryWorker:
+    """Mails stored notifications in the background, with bounded concurrency and retries.
+
+    Notification rows are the source of truth: the in-memory queue only carries ids, so
+    anything lost on shutdown or queue overflow is found again by recover() on startup.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession] = AsyncSessionLocal,
+        mailer: PooledMailer = fastmail,
+        concurrency: Optional[int] = None,
+        max_attempts: Optional[int] = None,
+        retry_base_seconds: Optional[float] = None,
+        retry_max_seconds: Optional[float] = None,
+        queue_size: Optional[int] = None,
+        batch_size: Optional[int] = None
+    ):
+        self.session_factory = session_factory
+        self.mailer = mailer
+        self.concurrency = concurrency or settings.EMAIL_WORKER_CONCURRENCY
+        self.max_attempts = max_attempts or settings.EMAIL_MAX_ATTEMPTS
+        self.retry_base_seconds = retry_base_seconds if retry_base_seconds is not None else settings.EMAIL_RETRY_BASE_SECONDS
+        self.retry_max_seconds = retry_max_seconds if retry_max_seconds is not None else settings.EMAIL_RETRY_MAX_SECONDS
+        self.queue_size = queue_size or settings.EMAIL_QUEUE_SIZE
+        self.batch_size = batch_size or settings.EMAIL_BATCH_SIZE
+        self.queue: Optional[asyncio.Queue] = None
+        self._consumers: Set[asyncio.Task] = set()
+        self._retries: Dict[int, asyncio.TimerHandle] = {}
+        # Ids queued or waiting for a retry, so rescans do not queue them twice
+        self._owned: Set[int] = set()
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self.sent = 0
+        self.failed_attempts = 0
+        self.abandoned = 0
+
+    @property
+    def running(self) -> bool:
+        return bool(self._consumers)
+
+    def start(self) -> None:
+        if self.running:
+            return
+        self._loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=self.queue_size)
+        self._consumers = {asyncio.create_task(self._consume()) for _ in range(self.concurrency)}
+
+    async def stop(self) -> None:
+        for handle in self._retries.values():
+            handle.cancel()
+        self._retries.clear()
+        self._owned.clear()
+        for task in self._consumers:
+            task.cancel()
+        await asyncio.gather(*self._consumers, return_exceptions=True)
+        self._consumers = set()
+        await self.mailer.close()
+
+    async def recover(self) -> int:
+        """Queue every notification whose email is still owed, e.g. after a restart"""
+        async with self.session_factory() as db:
+            pending = await AsyncNotificationRepository(db).get_pending_email_ids(self.max_attempts)
+        for notification_id in pending:
+            self.enqueue(notification_id)
+        return len(pending)
+
+    def enqueue(self, notification_id: int) -> bool:
+        if not self.running:
+            return False
+        if notification_id in self._owned:
+            return True
+        try:
+            self.queue.put_nowait(notification_id)
+        except asyncio.QueueFull:
+            logger.warning("Email queue full, notification %s left for the next recovery scan", notification_id)
+            return False
+        self._owned.add(notification_id)
+        return True
+
+    def enqueue_threadsafe(self, notification_ids: Iterable[int]) -> int:
+        """enqueue() from another thread, e.g. a scheduled job; returns how many were handed over"""
+        if not self.running:
+            return 0
+        notification_ids = list(notification_ids)
+        self._loop.call_soon_threadsafe(lambda: [self.enqueue(notification_id) for notification_id in notification_ids])
+        return len(notification_ids)
+
+    async def drain(self) -> None:
+        """Wait until every queued email was attempted (scheduled retries not included)"""
+        await self.queue.join()
+
+    async def _consume(self) -> None:
+        while True:
+            batch = [await self.queue.get()]
+            # Whatever is already waiting goes out over the same SMTP connection
+            while len(batch) < self.batch_size and not self.queue.empty():
+                batch.append(self.queue.get_nowait())
+            try:
+                await self.deliver_batch(batch)
+            except Exception:
+                logger.exception("Email delivery for notifications %s crashed", batch)
+            finally:
+                for notification_id in batch:
+                    if notification_id not in self._retries:
+                        self._owned.discard(notification_id)
+                    self.queue.task_done()
+
+    async def deliver(self, notification_id: int) -> bool:
+        return (await self.deliver_batch([notification_id]))[0]
+
+    async def deliver_batch(self, notification_ids: List[int]) -> List[bool]:
+        """Claim, send and record each notification; True where nothing is left to do"""
+        async with self.session_factory() as db:
+            repository = AsyncNotificationRepository(db)
+            notifications = {
+                notification.id: notification
+                for notification in await repository.get_by_ids(notification_ids)
+                if not notification.email_sent and notification.email_to
+            }
+            attempts = {notification_id: notification.email_attempts for notification_id, notification in notifications.items()}
+            # Claiming first keeps two workers (or processes) from mailing the same attempt
+            claimed = await repository.claim_email_attempts([
+                (notification_id, count) for notification_id, count in attempts.items() if count < self.max_attempts
+            ])
+            sent = []
+            if claimed:
+                messages = [build_email_message(notifications[notification_id]) for notification_id in claimed]
+                try:
+                    errors = await self.mailer.send_batch(messages)
+                except Exception as error:
+                    errors = [error] * len(claimed)
+                for notification_id, error in zip(claimed, errors):
+                    if error is None:
+                        sent.append(notification_id)
+                    else:
+                        self.failed_attempts += 1
+                        NOTIFICATION_EMAILS.labels("failed").inc()
+                        self._retry_later(notification_id, attempts[notification_id] + 1, error)
+                if sent:
+                    await repository.mark_emails_sent(sent)
+                    self.sent += len(sent)
+                    NOTIFICATION_EMAILS.labels("sent").inc(len(sent))
+        done = set(notification_ids) - set(notifications) | set(sent)
+        return [notification_id in done for notification_id in notification_ids]
+
+    def retry_delay(self, attempts: int) -> float:
+        delay = min(self.retry_base_seconds * 2 ** (attempts - 1), self.retry_max_seconds)
+        # Jitter spreads the retries of a burst that failed together
+        return delay * random.uniform(0.5, 1.0)
+
+    def _retry_later(self, notification_id: int, attempts: int, error: Exception) -> None:
+        if attempts >= self.max_attempts:
+            self.abandoned += 1
+            logger.error("Giving up on email for notification %s after %s attempts: %s", notification_id, attempts, error)
+            return
+        delay = self.retry_delay(attempts)
+        logger.warning("Email for notification %s failed (%s), retrying in %.1fs", notification_id, error, delay)
+
+        def fire() -> None:
+            del self._retries[notification_id]
+            self._owned.discard(notification_id)
+            self.enqueue(notification_id)
+
+        self._retries[notification_id] = asyncio.get_running_loop().call_later(delay, fire)
+
+    def stats(self) -> dict:
+        return {
+            "queued": self.queue.qsize() if self.queue else 0,
+            "scheduled_retries": len(self._retries),
+            "sent": self.sent,
+            "failed_attempts": self.failed_attempts,
+            "abandoned": self.abandoned,
+            "smtp": self.mailer.stats(),
+        }
+
+email_worker = EmailDeliveryWorker()
@@ -0,0 +1,223 @@
+import asyncio
+import hashlib
+import json
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import datetime
+from enum import Enum
+from typing import Any, Awaitable, Callable, Iterator, Optional, Type
+
+from fastapi import HTTPException, Response, status
+from fastapi.encoders import jsonable_encoder
+from pydantic import BaseModel
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from src.infrastructure.config.settings import settings
+from src.infrastructure.repositories.idempotency_repository import IdempotencyRepository
+
+class IdempotencyOutcome(str, Enum):
+    STARTED = "started"          # this request owns the key and does the work
+    REPLAY = "replay"            # the key's first request finished; send its response again
+    IN_PROGRESS = "in_progress"  # the key's first request is still running
+
+@dataclass
+class IdempotencyClaim:
+    outcome: IdempotencyOutcome
+    record_id: Optional[int] = None
+    status_code: Optional[int] = None
+    response_body: Optional[str] = None
+    # created_at of the claim: the token that proves this request still owns the key
+    claimed_at: Optional[datetime] = None
+    # Set once the request's changes were committed together with the key's status_code
+    committed: bool = False
+
+# Nothing was done and the client is told to retry: keep the key free for that retry
+RETRYABLE_STATUS_CODES = {status.HTTP_409_CONFLICT, status.HTTP_429_TOO_MANY_REQUESTS}
+
+def request_fingerprint(method: str, path: str, payload: BaseModel) -> str:
+    """Hash of what the request asks for; a key reused for a different request is refused"""
+    return hashlib.sha256(f"{method} {path} {payload.model_dump_json()}".encode()).hexdigest()
+
+def replay_response(claim: IdempotencyClaim) -> Response:
+    return Response(
+        content=claim.response_body,
+        status_code=claim.status_code,
+        media_type="application/json",
+        headers={"Idempotent-Replayed": "true"}
+    )
+
+class IdempotencyService:
+    """Idempotency-Key handling for POSTs that move money.
+
+    The first request with a key claims it in idempotency_keys and its response is stored there;
+    a retry with the same key gets that response back without the work running again, and a
+    duplicate arriving while the first is still running waits for it. Like the result of a
+    successful request, errors are stored too (the work may have committed before failing),
+    except those that say nothing happened and the client should retry.
+
+    The key is marked done in the same transaction as the work's first commit, and that commit
+    fails if the claim was taken over meanwhile. A claim whose lock lapsed is only taken over when
+    its request committed nothing; one that committed but died before storing its response is
+    answered with a 409 rather than run again.
+    """
+
+    def __init__(self, db: Session, clock: Callable[[], datetime] = datetime.utcnow):
+        self.db = db
+        self.repository = IdempotencyRepository(db)
+        self.clock = clock
+
+    def begin(self, user_id: int, key: str, request_hash: str) -> IdempotencyClaim:
+        """Claim `key` for this request or report the state of the request that holds it"""
+        now = self.clock()
+        while True:
+            record = self.repository.insert(
+                user_id, key, request_hash, now, settings.IDEMPOTENCY_LOCK_SECONDS, settings.IDEMPOTENCY_KEY_TTL_SECONDS
+            )
+            if record is not None:
+                return IdempotencyClaim(IdempotencyOutcome.STARTED, record.id, claimed_at=now)
+            existing = self.repository.get(user_id, key)
+            if existing is None:
+                # Released or purged in between: claim it again
+                continue
+            expired = existing.expires_at <= now
+            lapsed = existing.response_body is None and existing.locked_until <= now
+            if expired or (lapsed and existing.status_code is None):
+                if self.repository.take_over(
+                    existing.id, request_hash, now, settings.IDEMPOTENCY_LOCK_SECONDS,
+                    settings.IDEMPOTENCY_KEY_TTL_SECONDS
+                ):
+                    return IdempotencyClaim(IdempotencyOutcome.STARTED, existing.id, claimed_at=now)
+                continue
+            if existing.request_hash != request_hash:
+                raise HTTPException(
+                    status_code=422,
+                    detail="Idempotency-Key was already used for a different request"
+                )
+            if lapsed:
+                self.db.rollback()
+                raise HTTPException(
+                    status_code=status.HTTP_409_CONFLICT,
+                    detail="The request with this Idempotency-Key was processed but its response was lost"
+                )
+            claim = IdempotencyClaim(
+                IdempotencyOutcome.IN_PROGRESS if existing.response_body is None else IdempotencyOutcome.REPLAY,
+                existing.id,
+                existing.status_code,
+                existing.response_body
+            )
+            # End the read so the next poll sees the first request's commit
+            self.db.rollback()
+            return claim
+
+    def claim(self, user_id: int, key: str, request_hash: str) -> IdempotencyClaim:
+        """begin(), waiting out a duplicate that is still running; STARTED or REPLAY"""
+        deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+        while True:
+            claim = self.begin(user_id, key, request_hash)
+            if claim.outcome != IdempotencyOutcome.IN_PROGRESS:
+                return claim
+            if time.monotonic() >= deadline:
+                raise still_in_progress()
+            time.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+
+    @contextmanager
+    def committing_with(self, session: Session, claim: IdempotencyClaim, status_code: int) -> Iterator[None]:
+        """Stage the key's status_code into the first commit `session` makes inside the block.
+
+        That commit carries the request's changes: if the claim was taken over, it fails with a
+        409 instead, and the changes are rolled back. A commit that fails in its flush rolls the
+        status_code back with it, so it is staged again into the next one.
+        """
+        def before_commit(committing: Session) -> None:
+            if claim.committed:
+                return
+            if not IdempotencyRepository(committing).mark_committed(claim.record_id, claim.claimed_at, status_code):
+                raise still_in_progress()
+
+        def after_commit(committed: Session) -> None:
+            claim.committed = True
+
+        event.listen(session, "before_commit", before_commit)
+        event.listen(session, "after_commit", after_commit)
+        try:
+            yield
+        finally:
+            event.remove(session, "before_commit", before_commit)
+            event.remove(session, "after_commit", after_commit)
+
+    def finish(self, claim: IdempotencyClaim, status_code: int, body: Any) -> None:
+        self.repository.complete(claim.record_id, claim.claimed_at, status_code, json.dumps(jsonable_encoder(body)))
+
+    def fail(self, claim: IdempotencyClaim, error: Exception) -> None:
+        """Store (or, if retryable and nothing was committed, release) the outcome of a request that raised"""
+        self.db.rollback()
+        if isinstance(error, HTTPException):
+            if error.status_code in RETRYABLE_STATUS_CODES and not claim.committed:
+                self.repository.release(claim.record_id, claim.claimed_at)
+            else:
+                self.finish(claim, error.status_code, {"detail": error.detail})
+        else:
+            self.finish(claim, status.HTTP_500_INTERNAL_SERVER_ERROR, {"detail": "Internal Server Error"})
+
+    def run(self, user_id: int, key: Optional[str], request_hash: str, operation: Callable[[], Any],
+            response_model: Type[BaseModel], status_code: int) -> Any:
+        """operation() at most once per key; returns its result, or a Response replaying the stored one"""
+        if key is None:
+            return operation()
+        claim = self.claim(user_id, key, request_hash)
+        if claim.outcome == IdempotencyOutcome.REPLAY:
+            return replay_response(claim)
+        try:
+            with self.committing_with(self.db, claim, status_code):
+                result = operation()
+        except Exception as error:
+            self.fail(claim, error)
+            raise
+        self.finish(claim, status_code, response_model.model_validate(result))
+        return result
+
+    def purge_expired(self, chunk_size: Optional[int] = None, now: Optional[datetime] = None) -> int:
+        """Delete expired keys, one chunk per transaction; returns how many went"""
+        chunk_size = chunk_size or settings.IDEMPOTENCY_PURGE_CHUNK_SIZE
+        now = now or self.clock()
+        total = 0
+        while True:
+            deleted = self.repository.purge_expired(now, chunk_size)
+            total += deleted
+            if deleted < chunk_size:
+                return total
+
+def still_in_progress() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_409_CONFLICT,
+        detail="A request with this Idempotency-Key is still being processed, retry later"
+    )
+
+async def run_idempotent_async(db: AsyncSession, user_id: int, key: Optional[str], request_hash: str,
+                               operation: Callable[[], Awaitable[Any]], response_model: Type[BaseModel],
+                               status_code: int) -> Any:
+    """IdempotencyService.run() for async routes: waits on the event loop instead of a thread"""
+    if key is None:
+        return await operation()
+    deadline = time.monotonic() + settings.IDEMPOTENCY_WAIT_SECONDS
+    while True:
+        claim = await db.run_sync(lambda session: IdempotencyService(session).begin(user_id, key, request_hash))
+        if claim.outcome == IdempotencyOutcome.REPLAY:
+            return replay_response(claim)
+        if claim.outcome == IdempotencyOutcome.STARTED:
+            break
+        if time.monotonic() >= deadline:
+            raise still_in_progress()
+        await asyncio.sleep(settings.IDEMPOTENCY_POLL_SECONDS)
+    try:
+        with IdempotencyService(db.sync_session).committing_with(db.sync_session, claim, status_code):
+            result = await operation()
+    except Exception as error:
+        await db.run_sync(lambda session: IdempotencyService(session).fail(claim, error))
+        raise
+    body = response_model.model_validate(result)
+    await db.run_sync(lambda session: IdempotencyService(session).finish(claim, status_code, body))
+    return result
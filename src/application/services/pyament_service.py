@@ -2,11 +2,14 @@ from datetime import datetime
 from decimal import Decimal
 from typing import List, Optional
 
-from sqlalchemy.orm import Session
+from sqlalchemy.orm import Session, joinedload
+from src.infrastructure.config.settings import settings
 from src.infrastructure.models.payment import Payment, PaymentStatus
 from src.infrastructure.models.credit import Credit
 from src.infrastructure.models.transaction import Transaction, TransactionType, TransactionStatus
 from src.infrastructure.models.notification import Notification, NotificationType, NotificationPriority
+from src.infrastructure.repositories.notification_repository import NotificationRepository
+from src.infrastructure.repositories.payment_repository import PaymentRepository
 
 class PaymentService:
     def __init__(self, db: Session):
@@ -25,17 +28,17 @@ class PaymentService:
         self.db.refresh(payment)
         return payment
 
-    def get_payment(self, payment_id: int) -> Optional[Payment]:
-        """Get a payment by ID"""
-        return self.db.query(Payment).filter(Payment.id == payment_id).first()
+    def get_payment(self, payment_id: int, *options) -> Optional[Payment]:
+        """Get a payment by ID, with the loader `options` for the relations the caller reads"""
+        return PaymentRepository(self.db).get_by_id(payment_id, *options)
 
     def get_payments_by_credit(self, credit_id: int) -> List[Payment]:
         """Get all payments for a specific credit"""
         return self.db.query(Payment).filter(Payment.credit_id == credit_id).all()
 
-    def process_payment(self, payment_id: int) -> Payment:
-        """Process a pending payment"""
-        payment = self.get_payment(payment_id)
+    def process_payment(self, payment_id: int, account_id: int) -> Payment:
+        """Process a pending payment, charged to `account_id`"""
+        payment = self.get_payment(payment_id, joinedload(Payment.credit))
         if not payment or payment.status != PaymentStatus.PENDING:
             raise ValueError("Invalid payment or payment already processed")
 
@@ -46,7 +49,7 @@ class PaymentService:
             transaction_type=TransactionType.TRANSFER,
             status=TransactionStatus.PENDING,
             amount=payment.amount,
-            account_id=credit.account_id,
+            account_id=account_id,
             description=f"Credit payment - Credit ID: {credit.id}",
             reference_number=f"PAY-{payment.id}-{datetime.utcnow().strftime('%Y%m%d%H%M%S')}"
         )
@@ -54,11 +57,11 @@ class PaymentService:
         
         # Update payment status and link transaction
         payment.status = PaymentStatus.COMPLETED
-        payment.transaction_id = transaction.id
+        payment.transaction = transaction
         
         # Create notification
         notification = Notification(
-            user_id=credit.account.user_id,
+            user_id=credit.user_id,
             type=NotificationType.CREDIT_PAYMENT,
             priority=NotificationPriority.MEDIUM,
             title="Credit Payment Processed",
@@ -72,14 +75,14 @@ class PaymentService:
 
     def mark_payment_as_failed(self, payment_id: int, reason: str) -> Payment:
         """Mark a payment as failed"""
-        payment = self.get_payment(payment_id)
+        payment = self.get_payment(payment_id, joinedload(Payment.credit))
         if not payment:
             raise ValueError("Payment not found")
             
         payment.status = PaymentStatus.FAILED
         
         notification = Notification(
-            user_id=payment.credit.account.user_id,
+            user_id=payment.credit.user_id,
             type=NotificationType.CREDIT_PAYMENT,
             priority=NotificationPriority.HIGH,
             title="Credit Payment Failed",
@@ -93,7 +96,7 @@ class PaymentService:
 
     def reverse_payment(self, payment_id: int) -> Payment:
         """Reverse a completed payment"""
-        payment = self.get_payment(payment_id)
+        payment = self.get_payment(payment_id, joinedload(Payment.credit), joinedload(Payment.transaction))
         if not payment or payment.status != PaymentStatus.COMPLETED:
             raise ValueError("Invalid payment or payment not completed")
             
@@ -103,7 +106,7 @@ class PaymentService:
             payment.transaction.status = TransactionStatus.REVERSED
             
         notification = Notification(
-            user_id=payment.credit.account.user_id,
+            user_id=payment.credit.user_id,
             type=NotificationType.CREDIT_PAYMENT,
             priority=NotificationPriority.HIGH,
             title="Credit Payment Reversed",
@@ -122,19 +125,33 @@ class PaymentService:
             .filter(Payment.payment_date < datetime.utcnow())\
             .all()
 
-    def mark_payments_as_overdue(self):
-        """Mark all overdue payments"""
-        overdue_payments = self.get_overdue_payments()
-        for payment in overdue_payments:
-            payment.status = PaymentStatus.OVERDUE
-            
-            notification = Notification(
-                user_id=payment.credit.account.user_id,
-                type=NotificationType.CREDIT_PAYMENT,
-                priority=NotificationPriority.HIGH,
-                title="Payment Overdue",
-                content=f"Your credit payment of ${payment.amount} is overdue."
-            )
-            self.db.add(notification)
-        
-        self.db.commit()
+    def mark_payments_as_overdue(self, chunk_size: Optional[int] = None, now: Optional[datetime] = None) -> int:
+        """Mark every past-due pending payment as overdue and notify its owner, one chunk per transaction"""
+        chunk_size = chunk_size or settings.OVERDUE_PAYMENTS_CHUNK_SIZE
+        now = now or datetime.utcnow()
+        payments = PaymentRepository(self.db)
+        notifications = NotificationRepository(self.db)
+        total = 0
+        while True:
+            overdue = payments.mark_overdue_chunk(now, chunk_size)
+            if not overdue:
+                return total
+            owners = {
+                credit_id: (user_id, email)
+                for credit_id, user_id, email in payments.get_credit_owners({row.credit_id for row in overdue})
+            }
+            notifications.bulk_create([
+                {
+                    "user_id": owners[row.credit_id][0],
+                    "email_to": owners[row.credit_id][1],
+                    "type": NotificationType.CREDIT_PAYMENT,
+                    "priority": NotificationPriority.HIGH,
+                    "title": "Payment Overdue",
+                    "content": f"Your credit payment of ${row.amount} is overdue.",
+                    "created_at": now,
+                }
+                for row in overdue
+            ])
+            # Committing per chunk keeps row locks and the session small on millions of payments
+            self.db.commit()
+            total += len(overdue)
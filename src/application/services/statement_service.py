@@ -0,0 +1,170 @@
+import csv
+import io
+from datetime import datetime, timedelta
+from decimal import Decimal
+from typing import Iterator, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlalchemy import Row
+from sqlalchemy.orm import Session, sessionmaker
+
+from src.application.services.ledger_service import LedgerService
+from src.infrastructure.config.database import SessionLocal
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.account import Account
+from src.infrastructure.pdf import LINE_WIDTH, LINES_PER_PAGE, stream_text_pdf
+from src.infrastructure.repositories.account_repository import AccountRepository
+from src.infrastructure.statement_store import StatementStore, statement_store
+
+STATEMENT_FIELDS = ("date", "reference_number", "transaction_type", "description", "amount", "balance")
+STATEMENT_MEDIA_TYPES = {"pdf": "application/pdf", "csv": "text/csv"}
+# Rows rendered per chunk of the response body
+STATEMENT_CHUNK_ROWS = 1000
+# Title, account line, blank line, column headings
+PDF_HEADER_LINES = 4
+
+def month_range(month: str) -> Tuple[datetime, datetime]:
+    """[first instant, first instant of the next month) of a YYYY-MM month, naive UTC"""
+    try:
+        start = datetime.strptime(month, "%Y-%m")
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid month, expected YYYY-MM")
+    return start, (start + timedelta(days=32)).replace(day=1)
+
+def month_is_closed(month: str, now: Optional[datetime] = None) -> bool:
+    """Nothing more can be posted into the month, so its statement will never change"""
+    _, end = month_range(month)
+    return end + timedelta(seconds=settings.BALANCE_SNAPSHOT_DELAY_SECONDS) <= (now or datetime.utcnow())
+
+class Statement:
+    """An account's postings for one month with the running balance; lines() can be iterated once"""
+
+    def __init__(self, db: Session, account: Account, month: str):
+        self.db = db
+        self.account = account
+        self.month = month
+        self.start, self.end = month_range(month)
+        # Snapshot plus at most a day of postings, not the account's history
+        self.opening_balance = LedgerService(db).balance_at(account.id, self.start)
+        self.closing_balance = self.opening_balance
+        self.credits = Decimal(0)
+        self.debits = Decimal(0)
+
+    def lines(self) -> Iterator[Tuple[Row, Decimal]]:
+        """(posting, balance after it), oldest first; closing_balance is final once exhausted"""
+        postings = LedgerService(self.db).repository.iter_account_postings(
+            self.account.id, self.start, self.end, STATEMENT_CHUNK_ROWS
+        )
+        for posting in postings:
+            self.closing_balance += posting.amount
+            if posting.amount >= 0:
+                self.credits += posting.amount
+            else:
+                self.debits -= posting.amount
+            yield posting, self.closing_balance
+
+def _fields(posting: Row, balance: Decimal) -> List[str]:
+    return [
+        posting.posted_at.isoformat(sep=" ", timespec="seconds"),
+        posting.reference_number or "",
+        posting.transaction_type.value if posting.transaction_type else "",
+        posting.description or ("Opening balance" if posting.reference_number is None else ""),
+        str(posting.amount),
+        str(balance),
+    ]
+
+def render_csv(statement: Statement) -> Iterator[bytes]:
+    """Column headings, an opening balance row, one row per posting and a closing balance row"""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(STATEMENT_FIELDS)
+    writer.writerow([statement.start.date().isoformat(), "", "", "Opening balance", "", str(statement.opening_balance)])
+    for index, (posting, balance) in enumerate(statement.lines(), 1):
+        writer.writerow(_fields(posting, balance))
+        if index % STATEMENT_CHUNK_ROWS == 0:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+    last_day = (statement.end - timedelta(days=1)).date().isoformat()
+    writer.writerow([last_day, "", "", "Closing balance", "", str(statement.closing_balance)])
+    yield buffer.getvalue().encode()
+
+def _pdf_line(fields: List[str]) -> str:
+    date, reference, kind, description, amount, balance = fields
+    return f"{date:<19} {reference:<20} {kind:<10} {description[:24]:<24} {amount:>14} {balance:>14}"[:LINE_WIDTH]
+
+def _pdf_pages(statement: Statement) -> Iterator[List[str]]:
+    account = statement.account
+    page_number = 1
+
+    def header() -> List[str]:
+        return [
+            f"Statement {statement.month}  Account {account.account_number}  Page {page_number}",
+            f"Currency {account.currency}  Opening balance {statement.opening_balance}",
+            "",
+            _pdf_line(["Date", "Reference", "Type", "Description", "Amount", "Balance"]),
+        ]
+
+    page = header()
+    for posting, balance in statement.lines():
+        if len(page) == LINES_PER_PAGE:
+            yield page
+            page_number += 1
+            page = header()
+        page.append(_pdf_line(_fields(posting, balance)))
+    summary = [
+        "",
+        f"Credits {statement.credits}  Debits {statement.debits}",
+        f"Closing balance {statement.closing_balance}",
+    ]
+    if len(page) + len(summary) > LINES_PER_PAGE:
+        yield page
+        page_number += 1
+        page = header()
+    yield page + summary
+
+def render_pdf(statement: Statement) -> Iterator[bytes]:
+    return stream_text_pdf(_pdf_pages(statement))
+
+RENDERERS = {"csv": render_csv, "pdf": render_pdf}
+
+def render_statement(account_id: int,
+                     month: str,
+                     statement_format: str,
+                     session_factory: sessionmaker = SessionLocal) -> Iterator[bytes]:
+    """Yield the statement in chunks, reading it in its own session.
+
+    The body is produced after the request's session is closed, as with the history export.
+    """
+    with session_factory() as db:
+        account = AccountRepository(db).get_by_id(account_id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
+        yield from RENDERERS[statement_format](Statement(db, account, month))
+
+def stream_statement(account_id: int,
+                     month: str,
+                     statement_format: str,
+                     session_factory: sessionmaker = SessionLocal,
+                     store: StatementStore = statement_store) -> Iterator[bytes]:
+    """Render the statement, keeping a copy in the store when the month is closed"""
+    chunks = render_statement(account_id, month, statement_format, session_factory)
+    if month_is_closed(month):
+        chunks = store.save(account_id, month, statement_format, chunks)
+    return chunks
+
+def generate_statements(account_ids: List[int],
+                        month: str,
+                        statement_formats: List[str],
+                        session_factory: sessionmaker = SessionLocal,
+                        store: StatementStore = statement_store) -> int:
+    """Store the statements of a closed month not stored yet; returns how many were written"""
+    written = 0
+    for account_id in account_ids:
+        for statement_format in statement_formats:
+            if store.get(account_id, month, statement_format):
+                continue
+            for _ in store.save(account_id, month, statement_format,
+                                render_statement(account_id, month, statement_format, session_factory)):
+                pass
+            written += 1
+    return written
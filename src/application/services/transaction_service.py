@@ -1,23 +1,236 @@
+import asyncio
+import base64
+import binascii
+import csv
+import io
+import json
+import random
+import time
 import uuid
+from collections import defaultdict
+from datetime import datetime
 from decimal import Decimal
-from typing import List
-from fastapi import HTTPException
-from sqlalchemy.orm import Session
+from tempfile import SpooledTemporaryFile
+from typing import AsyncIterator, BinaryIO, Callable, Dict, Iterator, List, Optional, Tuple
+from fastapi import HTTPException, UploadFile
+from pydantic import ValidationError
+from sqlalchemy import Row
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, sessionmaker
+from sqlalchemy.orm.exc import StaleDataError
 
+from src.infrastructure.config.database import SessionLocal
+from src.infrastructure.config.settings import settings
+from src.infrastructure.http_cache import invalidate_account
+from src.infrastructure.monitoring.metrics import record_transaction
 from src.infrastructure.repositories.transaction_repository import TransactionRepository
-from src.infrastructure.repositories.account_repository import AccountRepository
+from src.infrastructure.repositories.account_repository import AccountRepository, modified_concurrently
+from src.infrastructure.repositories.ledger_repository import LedgerRepository, movement
 from src.infrastructure.models.transaction import Transaction, TransactionStatus, TransactionType
 from src.infrastructure.models.account import Account, AccountStatus
-from src.presentation.schemas.transaction_schemas import DepositCreate, WithdrawalCreate, TransferCreate
+from src.presentation.schemas.transaction_schemas import (
+    BatchCreate,
+    BatchItem,
+    BatchItemResult,
+    BatchResult,
+    DepositCreate,
+    WithdrawalCreate,
+    TransferCreate,
+    TransactionPage,
+    TransactionResponse
+)
+
+# Column order of Transaction, as returned by TransactionRepository.iter_account_transactions
+EXPORT_FIELDS = tuple(Transaction.__table__.columns.keys())
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+
+def encode_key(moment: datetime, row_id: int) -> str:
+    """Opaque keyset cursor over (timestamp, id), read back by decode_cursor"""
+    raw = f"{moment.isoformat()}|{row_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def encode_cursor(transaction: Transaction) -> str:
+    return encode_key(transaction.created_at, transaction.id)
+
+def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+    try:
+        created_at, transaction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.fromisoformat(created_at), int(transaction_id)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid pagination cursor")
+
+def _export_row(transaction: Row) -> dict:
+    row = transaction._asdict()
+    row["transaction_type"] = transaction.transaction_type.value
+    row["status"] = transaction.status.value
+    row["amount"] = str(transaction.amount)
+    row["created_at"] = transaction.created_at.isoformat() if transaction.created_at else None
+    row["updated_at"] = transaction.updated_at.isoformat() if transaction.updated_at else None
+    return row
+
+def stream_transaction_export(account_id: int,
+                              export_format: str,
+                              session_factory: sessionmaker = SessionLocal,
+                              batch_size: int = 1000) -> Iterator[str]:
+    """Yield the account history as NDJSON or CSV, one chunk per batch_size rows.
+
+    Opens its own session: the response body is produced after the request's session is closed.
+    """
+    with session_factory() as db:
+        buffer = io.StringIO()
+        writer = None
+        if export_format == "csv":
+            writer = csv.DictWriter(buffer, fieldnames=EXPORT_FIELDS)
+            writer.writeheader()
+        rows = 0
+        for transaction in TransactionRepository(db).iter_account_transactions(account_id, batch_size):
+            row = _export_row(transaction)
+            if writer:
+                writer.writerow(row)
+            else:
+                buffer.write(json.dumps(row) + "\n")
+            rows += 1
+            if rows % batch_size == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        if buffer.tell():
+            yield buffer.getvalue()
+
+# Columns of a CSV batch upload; NDJSON lines are objects with the same keys
+UPLOAD_FIELDS = ("transaction_type", "amount", "destination_account_number", "description")
+# Uploads up to this size stay in memory while they are received, larger ones go to a temp file
+UPLOAD_SPOOL_MEMORY_BYTES = 1024 * 1024
+
+async def spool_upload(chunks: AsyncIterator[bytes]) -> UploadFile:
+    """Receive a request body into a temporary file, refusing bodies over TRANSACTION_UPLOAD_MAX_BYTES"""
+    upload = UploadFile(SpooledTemporaryFile(max_size=UPLOAD_SPOOL_MEMORY_BYTES), size=0)
+    try:
+        async for chunk in chunks:
+            if upload.size + len(chunk) > settings.TRANSACTION_UPLOAD_MAX_BYTES:
+                raise HTTPException(
+                    status_code=413,
+                    detail=f"Upload exceeds {settings.TRANSACTION_UPLOAD_MAX_BYTES} bytes"
+                )
+            await upload.write(chunk)
+        await upload.seek(0)
+    except BaseException:
+        await upload.close()
+        raise
+    return upload
+
+def _upload_rows(file: BinaryIO, upload_format: str) -> Iterator[Tuple[Optional[dict], Optional[str]]]:
+    """(row, None) per line of the file, or (None, error) for a line that does not parse"""
+    text = io.TextIOWrapper(file, encoding="utf-8", newline="")
+    try:
+        if upload_format == "csv":
+            for row in csv.DictReader(text):
+                yield {key: value or None for key, value in row.items() if key in UPLOAD_FIELDS}, None
+            return
+        for line in text:
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except json.JSONDecodeError:
+                yield None, "Invalid JSON"
+                continue
+            yield (row, None) if isinstance(row, dict) else (None, "Expected a JSON object")
+    finally:
+        # The caller owns the file
+        text.detach()
+
+def _validation_error(error: ValidationError) -> str:
+    return "; ".join(f"{'.'.join(map(str, item['loc'])) or 'row'}: {item['msg']}" for item in error.errors())
+
+def stream_batch_upload(account_id: int,
+                        file: BinaryIO,
+                        upload_format: str,
+                        session_factory: sessionmaker = SessionLocal,
+                        chunk_size: Optional[int] = None) -> Iterator[str]:
+    """Apply an uploaded CSV/NDJSON batch chunk_size rows at a time, yielding NDJSON results per chunk.
+
+    Each chunk goes through process_batch and commits on its own, so memory stays flat however long
+    the file is. One line per row (BatchItemResult, index counting data rows from 0), then a
+    {"completed": n, "failed": n} summary. Opens its own session, like stream_transaction_export.
+    """
+    chunk_size = chunk_size or settings.TRANSACTION_BATCH_MAX_ITEMS
+    completed = failed = 0
+    with session_factory() as db:
+        service = TransactionService(db)
+        results: List[BatchItemResult] = []
+        pending: List[Tuple[int, BatchItem]] = []
+
+        def apply_chunk() -> str:
+            nonlocal completed, failed
+            if pending:
+                try:
+                    batch = service.process_batch(account_id, BatchCreate(items=[item for _, item in pending]))
+                except HTTPException as error:
+                    results.extend(
+                        BatchItemResult(index=index, status=TransactionStatus.FAILED, error=str(error.detail))
+                        for index, _ in pending
+                    )
+                else:
+                    for result, (index, _) in zip(batch.items, pending):
+                        result.index = index
+                    results.extend(batch.items)
+                    completed += batch.completed
+                db.expunge_all()
+            results.sort(key=lambda result: result.index)
+            failed += sum(result.status == TransactionStatus.FAILED for result in results)
+            lines = "".join(result.model_dump_json() + "\n" for result in results)
+            results.clear()
+            pending.clear()
+            return lines
+
+        index = -1
+        for index, (row, error) in enumerate(_upload_rows(file, upload_format)):
+            if row is not None:
+                try:
+                    pending.append((index, BatchItem.model_validate(row)))
+                except ValidationError as invalid:
+                    error = _validation_error(invalid)
+            if error:
+                results.append(BatchItemResult(index=index, status=TransactionStatus.FAILED, error=error))
+            if (index + 1) % chunk_size == 0:
+                yield apply_chunk()
+        if (index + 1) % chunk_size:
+            yield apply_chunk()
+        yield json.dumps({"completed": completed, "failed": failed}) + "\n"
+
+def retry_delay(attempt: int) -> float:
+    """Random backoff before re-running a balance change that lost a version check"""
+    return random.uniform(0, 0.005 * (attempt + 1))
+
+async def process_withdrawal_async(db: AsyncSession, account_id: int, withdrawal_data: WithdrawalCreate) -> Transaction:
+    """TransactionService.process_withdrawal for async routes.
+
+    Each attempt runs in the session's greenlet through run_sync, which is on the event loop thread,
+    so the backoff between attempts awaits instead of sleeping.
+    """
+    def attempt(session: Session) -> Optional[Transaction]:
+        service = TransactionService(session)
+        return service._attempt(lambda: service._withdraw(account_id, withdrawal_data))
+
+    for attempt_number in range(settings.ACCOUNT_LOCK_MAX_RETRIES + 1):
+        transaction = await db.run_sync(attempt)
+        if transaction is not None:
+            return transaction
+        await asyncio.sleep(retry_delay(attempt_number))
+    raise modified_concurrently()
 
 class TransactionService:
     def __init__(self, db: Session):
         self.db = db
         self.transaction_repository = TransactionRepository(db)
         self.account_repository = AccountRepository(db)
+        self.ledger_repository = LedgerRepository(db)
 
     def generate_reference_number(self) -> str:
-        return f"TRX-{str(uuid.uuid4())[:8].upper()}"
+        # 64 random bits: with 32, a million-row upload would be all but certain to repeat one
+        return f"TRX-{uuid.uuid4().hex[:16].upper()}"
 
     def validate_accounts(self, *accounts: Account) -> None:
         for account in accounts:
@@ -34,52 +247,202 @@ class TransactionService:
                 detail="Insufficient funds"
             )
 
+    def _commit(self, transaction: Transaction, *accounts: Account) -> Transaction:
+        """Commit the staged ledger row and balance changes of `accounts` as one unit of work"""
+        # Read before the commit expires them
+        owners = [(account.user_id, account.id) for account in accounts]
+        currency = accounts[0].currency
+        try:
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail="Transaction reference number already exists")
+        for user_id, account_id in owners:
+            invalidate_account(user_id, account_id)
+        self.db.refresh(transaction)
+        record_transaction(transaction.transaction_type, transaction.amount, currency)
+        return transaction
+
+    def _attempt(self, operation: Callable[[], Transaction]) -> Optional[Transaction]:
+        """operation(), or None (rolled back) when it lost an optimistic version check to a concurrent writer"""
+        try:
+            return operation()
+        except StaleDataError:
+            self.db.rollback()
+            return None
+        except HTTPException:
+            # release any row locks taken before validation failed
+            self.db.rollback()
+            raise
+
+    def _run_with_retries(self, operation: Callable[[], Transaction]) -> Transaction:
+        """Re-run a balance change that lost an optimistic version check to a concurrent writer"""
+        for attempt in range(settings.ACCOUNT_LOCK_MAX_RETRIES + 1):
+            result = self._attempt(operation)
+            if result is not None:
+                return result
+            time.sleep(retry_delay(attempt))
+        raise modified_concurrently()
+
     def process_deposit(self, account_id: int, deposit_data: DepositCreate) -> Transaction:
-        account = self.account_repository.get_by_id(account_id)
+        return self._run_with_retries(lambda: self._deposit(account_id, deposit_data))
+
+    def process_withdrawal(self, account_id: int, withdrawal_data: WithdrawalCreate) -> Transaction:
+        return self._run_with_retries(lambda: self._withdraw(account_id, withdrawal_data))
+
+    def process_transfer(self, source_account_id: int, transfer_data: TransferCreate) -> Transaction:
+        return self._run_with_retries(lambda: self._transfer(source_account_id, transfer_data))
+
+    def process_batch(self, account_id: int, batch: BatchCreate) -> BatchResult:
+        """Deposits into / transfers out of one account; each item succeeds or fails on its own"""
+        if len(batch.items) > settings.TRANSACTION_BATCH_MAX_ITEMS:
+            raise HTTPException(
+                status_code=400,
+                detail=f"A batch holds at most {settings.TRANSACTION_BATCH_MAX_ITEMS} items"
+            )
+        return self._run_with_retries(lambda: self._batch(account_id, batch))
+
+    def _batch_item_error(self, source: Account, item: BatchItem, destination: Optional[Account],
+                          available: Decimal) -> Optional[str]:
+        if item.transaction_type == TransactionType.DEPOSIT:
+            return None
+        if not destination:
+            return "Destination account not found"
+        if destination.id == source.id:
+            return "Cannot transfer to the same account"
+        if destination.status != AccountStatus.ACTIVE:
+            return f"Account {destination.account_number} is {destination.status}."
+        if destination.currency != source.currency:
+            return "Cannot transfer between accounts with different currencies"
+        if available < item.amount:
+            return "Insufficient funds"
+        return None
+
+    def _batch(self, account_id: int, batch: BatchCreate) -> BatchResult:
+        """One locking SELECT, items checked in order against the running balance, one INSERT into
+        transactions and one into ledger_postings, one UPDATE per account"""
+        source, destinations = self.account_repository.get_for_batch(
+            account_id,
+            (item.destination_account_number for item in batch.items if item.destination_account_number)
+        )
+        if not source:
+            raise HTTPException(status_code=404, detail="Account not found")
+        self.validate_accounts(source)
+
+        accounts: Dict[int, Account] = {source.id: source}
+        deltas: Dict[int, Decimal] = defaultdict(Decimal)
+        results: List[BatchItemResult] = []
+        rows, completed = [], []
+        now = datetime.utcnow()
+        for index, item in enumerate(batch.items):
+            destination = destinations.get(item.destination_account_number)
+            error = self._batch_item_error(source, item, destination, source.balance + deltas[source.id])
+            if error:
+                results.append(BatchItemResult(index=index, status=TransactionStatus.FAILED, error=error))
+                continue
+            if item.transaction_type == TransactionType.TRANSFER:
+                accounts[destination.id] = destination
+                deltas[source.id] -= item.amount
+                deltas[destination.id] += item.amount
+            else:
+                deltas[source.id] += item.amount
+            rows.append({
+                "account_id": source.id,
+                "transaction_type": item.transaction_type,
+                "status": TransactionStatus.COMPLETED,
+                "amount": item.amount,
+                "reference_number": self.generate_reference_number(),
+                "destination_account_id": destination.id if destination else None,
+                "description": item.description,
+                "created_at": now,
+                "updated_at": now
+            })
+            completed.append(BatchItemResult(index=index, status=TransactionStatus.COMPLETED))
+            results.append(completed[-1])
+
+        if not rows:
+            self.db.rollback()
+            return BatchResult(completed=0, failed=len(results), items=results)
+
+        # Read before the commit expires them
+        owners = [(account.user_id, account.id) for account in accounts.values()]
+        currency = source.currency
+        try:
+            inserted = {
+                transaction.reference_number: transaction
+                for transaction in self.transaction_repository.add_many(rows)
+            }
+            postings = []
+            for result, row in zip(completed, rows):
+                transaction = inserted[row["reference_number"]]
+                result.transaction = TransactionResponse.model_validate(transaction)
+                if transaction.transaction_type == TransactionType.TRANSFER:
+                    sides = (source.id, transaction.destination_account_id)
+                else:
+                    sides = (None, source.id)
+                postings.extend(
+                    {"transaction_id": transaction.id, "account_id": posting_account_id, "amount": amount,
+                     "posted_at": now}
+                    for posting_account_id, amount in movement(transaction.amount, *sides)
+                )
+            self.ledger_repository.add_many(postings)
+            for changed_id, delta in deltas.items():
+                if delta:
+                    self.account_repository.apply_balance_delta(accounts[changed_id], delta)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            raise HTTPException(status_code=400, detail="Transaction reference number already exists")
+        for user_id, changed_id in owners:
+            invalidate_account(user_id, changed_id)
+        for result in completed:
+            record_transaction(result.transaction.transaction_type, result.transaction.amount, currency)
+        return BatchResult(completed=len(completed), failed=len(results) - len(completed), items=results)
+
+    def _deposit(self, account_id: int, deposit_data: DepositCreate) -> Transaction:
+        account = self.account_repository.get_for_update(account_id)
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
         
         self.validate_accounts(account)
         
-        transaction = self.transaction_repository.create(
+        transaction = self.transaction_repository.add(
             account_id=account_id,
             transaction_type=TransactionType.DEPOSIT,
             amount=deposit_data.amount,
             reference_number=self.generate_reference_number(),
-            description=deposit_data.description
+            description=deposit_data.description,
+            status=TransactionStatus.COMPLETED
         )
+        self.ledger_repository.post(transaction, deposit_data.amount, None, account_id)
+        self.account_repository.apply_balance_delta(account, deposit_data.amount)
         
-        self.account_repository.update_balance(account_id, deposit_data.amount)
-        
-        self.transaction_repository.update_status(transaction.id, TransactionStatus.COMPLETED)
-        
-        return transaction
+        return self._commit(transaction, account)
 
-    def process_withdrawal(self, account_id: int, withdrawal_data: WithdrawalCreate) -> Transaction:
-        account = self.account_repository.get_by_id(account_id)
+    def _withdraw(self, account_id: int, withdrawal_data: WithdrawalCreate) -> Transaction:
+        account = self.account_repository.get_for_update(account_id)
         if not account:
             raise HTTPException(status_code=404, detail="Account not found")
         
         self.validate_accounts(account)
         self.validate_sufficient_funds(account, withdrawal_data.amount)
         
-        transaction = self.transaction_repository.create(
+        transaction = self.transaction_repository.add(
             account_id=account_id,
             transaction_type=TransactionType.WITHDRAWAL,
             amount=withdrawal_data.amount,
             reference_number=self.generate_reference_number(),
-            description=withdrawal_data.description
+            description=withdrawal_data.description,
+            status=TransactionStatus.COMPLETED
         )
+        self.ledger_repository.post(transaction, withdrawal_data.amount, account_id, None)
+        self.account_repository.apply_balance_delta(account, -withdrawal_data.amount)
         
-        self.account_repository.update_balance(account_id, -withdrawal_data.amount)
-        
-        self.transaction_repository.update_status(transaction.id, TransactionStatus.COMPLETED)
-        
-        return transaction
+        return self._commit(transaction, account)
 
-    def process_transfer(self, source_account_id: int, transfer_data: TransferCreate) -> Transaction:
-        source_account = self.account_repository.get_by_id(source_account_id)
-        destination_account = self.account_repository.get_by_account_number(
+    def _transfer(self, source_account_id: int, transfer_data: TransferCreate) -> Transaction:
+        source_account, destination_account = self.account_repository.get_for_transfer(
+            source_account_id,
             transfer_data.destination_account_number
         )
         
@@ -92,21 +455,47 @@ class TransactionService:
         self.validate_accounts(source_account, destination_account)
         self.validate_sufficient_funds(source_account, transfer_data.amount)
         
-        transaction = self.transaction_repository.create(
+        transaction = self.transaction_repository.add(
             account_id=source_account_id,
             transaction_type=TransactionType.TRANSFER,
             amount=transfer_data.amount,
             reference_number=self.generate_reference_number(),
             destination_account_id=destination_account.id,
-            description=transfer_data.description
+            description=transfer_data.description,
+            status=TransactionStatus.COMPLETED
         )
+        self.ledger_repository.post(transaction, transfer_data.amount, source_account_id, destination_account.id)
+        self.account_repository.apply_balance_delta(source_account, -transfer_data.amount)
+        self.account_repository.apply_balance_delta(destination_account, transfer_data.amount)
         
-        self.account_repository.update_balance(source_account_id, -transfer_data.amount)
-        self.account_repository.update_balance(destination_account.id, transfer_data.amount)
-        
-        self.transaction_repository.update_status(transaction.id, TransactionStatus.COMPLETED)
-        
-        return transaction
+        return self._commit(transaction, source_account, destination_account)
 
     def get_transaction_history(self, account_id: int) -> List[Transaction]:
-        return self.transaction_repository.get_account_transactions(account_id)
\ No newline at end of file
+        return self.transaction_repository.get_account_transactions(account_id)
+
+    def get_transaction_page(self,
+                             account_id: int,
+                             limit: int,
+                             before: Optional[str] = None,
+                             after: Optional[str] = None) -> TransactionPage:
+        if before and after:
+            raise HTTPException(status_code=400, detail="Use either before or after, not both")
+        # One extra row tells whether another page exists in the direction of travel
+        items = self.transaction_repository.get_account_transactions_page(
+            account_id,
+            limit + 1,
+            before=decode_cursor(before) if before else None,
+            after=decode_cursor(after) if after else None
+        )
+        has_more = len(items) > limit
+        if after:
+            items = items[1:] if has_more else items
+            has_older, has_newer = True, has_more
+        else:
+            items = items[:limit]
+            has_older, has_newer = has_more, before is not None
+        return TransactionPage(
+            items=[TransactionResponse.model_validate(item) for item in items],
+            next_cursor=encode_cursor(items[-1]) if items and has_older else None,
+            prev_cursor=encode_cursor(items[0]) if items and has_newer else None
+        )
\ No newline at end of file
@@ -0,0 +1,113 @@
+import importlib
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional, Tuple
+
+class CacheBackend(ABC):
+    """Storage behind a Cache; implement this to share entries between workers"""
+
+    @abstractmethod
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Return the stored value, or None when missing or expired"""
+
+    @abstractmethod
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        ...
+
+    @abstractmethod
+    def delete(self, key: Hashable) -> None:
+        ...
+
+    @abstractmethod
+    def clear(self) -> None:
+        ...
+
+    def __len__(self) -> int:
+        return 0
+
+class InMemoryCacheBackend(CacheBackend):
+    """Per-process LRU bounded to max_size entries, each expiring after its TTL"""
+
+    def __init__(self, max_size: int, clock: Callable[[], float] = time.monotonic):
+        self.max_size = max_size
+        self._clock = clock
+        self._entries: "OrderedDict[Hashable, Tuple[float, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, value = entry
+            if expires_at <= self._clock():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (self._clock() + ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+
+    def delete(self, key: Hashable) -> None:
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+def load_backend(path: str, max_size: int) -> CacheBackend:
+    """Instantiate a backend class from its dotted path, e.g. settings.CACHE_BACKEND"""
+    module_name, _, class_name = path.rpartition(".")
+    backend_class = getattr(importlib.import_module(module_name), class_name)
+    return backend_class(max_size=max_size)
+
+class Cache:
+    """Namespaced view over a backend that counts hits and misses"""
+
+    def __init__(self, name: str, backend: CacheBackend, ttl: float):
+        self.name = name
+        self.backend = backend
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+
+    def _key(self, key: Hashable) -> str:
+        return f"{self.name}:{key}"
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        value = self.backend.get(self._key(key)) if self.ttl > 0 else None
+        with self._lock:
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        if self.ttl > 0:
+            self.backend.set(self._key(key), value, self.ttl)
+
+    def invalidate(self, key: Hashable) -> None:
+        self.backend.delete(self._key(key))
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_ratio": round(self.hits / lookups, 4) if lookups else 0.0,
+            "size": len(self.backend),
+            "ttl_seconds": self.ttl,
+        }
@@ -1,12 +1,50 @@
 from sqlalchemy import create_engine
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker
-from typing import Generator
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool, QueuePool
+from typing import AsyncGenerator, Generator, Type
 from src.infrastructure.config.settings import settings
+from src.infrastructure.monitoring.pool_metrics import instrumented_pool_class
+from src.infrastructure.monitoring.query_counter import install_query_counter
 
-engine = create_engine(settings.DATABASE_URL)
+ASYNC_DRIVERS = {
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+def get_async_database_url(url: str) -> str:
+    """Map a sync DATABASE_URL onto the matching asyncio driver"""
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+def get_pool_options(url: str, pool_class: Type[Pool], name: str) -> dict:
+    """Pool sizing from settings; in-memory SQLite keeps its single-connection pool"""
+    if url.startswith("sqlite") and (":memory:" in url or url.endswith("://")):
+        return {}
+    return {
+        "poolclass": instrumented_pool_class(pool_class, name),
+        "pool_size": settings.DB_POOL_SIZE,
+        "max_overflow": settings.DB_MAX_OVERFLOW,
+        "pool_timeout": settings.DB_POOL_TIMEOUT,
+        "pool_recycle": settings.DB_POOL_RECYCLE,
+        "pool_pre_ping": settings.DB_POOL_PRE_PING,
+    }
+
+engine = create_engine(settings.DATABASE_URL, **get_pool_options(settings.DATABASE_URL, QueuePool, "sync"))
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
+ASYNC_DATABASE_URL = settings.ASYNC_DATABASE_URL or get_async_database_url(settings.DATABASE_URL)
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    **get_pool_options(ASYNC_DATABASE_URL, AsyncAdaptedQueuePool, "async")
+)
+install_query_counter(engine)
+install_query_counter(async_engine.sync_engine)
+# expire_on_commit=False: attributes cannot be lazily reloaded outside an await
+AsyncSessionLocal = async_sessionmaker(async_engine, class_=AsyncSession, autoflush=False, expire_on_commit=False)
+
 Base = declarative_base()
 
 # Dependency
@@ -15,4 +53,9 @@ def get_db() -> Generator:
     try:
         yield db
     finally:
-        db.close()
\ No newline at end of file
+        db.close()
+
+# Dependency for async def routes, so no blocking DB I/O runs on the event loop
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSessionLocal() as db:
+        yield db
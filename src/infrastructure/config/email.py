@@ -1,6 +1,15 @@
-from fastapi_mail import ConnectionConfig, FastMail
+import asyncio
+import logging
+import time
+from contextlib import asynccontextmanager
+from typing import List, Optional, Union
+
+import aiosmtplib
+from fastapi_mail import ConnectionConfig, FastMail, MessageSchema
 from src.infrastructure.config.settings import settings
 
+logger = logging.getLogger(__name__)
+
 email_conf = ConnectionConfig(
     MAIL_USERNAME=settings.MAIL_USERNAME,
     MAIL_PASSWORD=settings.MAIL_PASSWORD,
@@ -8,9 +17,152 @@ email_conf = ConnectionConfig(
     MAIL_PORT=settings.MAIL_PORT,
     MAIL_SERVER=settings.MAIL_SERVER,
     MAIL_FROM_NAME=settings.MAIL_FROM_NAME,
-    MAIL_STARTTLS=True,
-    MAIL_SSL_TLS=False,
-    USE_CREDENTIALS=True
+    MAIL_STARTTLS=settings.MAIL_STARTTLS,
+    MAIL_SSL_TLS=settings.MAIL_SSL_TLS,
+    USE_CREDENTIALS=settings.MAIL_USE_CREDENTIALS,
+    TIMEOUT=settings.MAIL_TIMEOUT
 )
 
-fastmail = FastMail(email_conf)
\ No newline at end of file
+# Errors after which the connection itself is unusable; anything else is a per-message refusal
+CONNECTION_ERRORS = (aiosmtplib.SMTPServerDisconnected, aiosmtplib.SMTPTimeoutError, ConnectionError, OSError)
+
+class _PooledConnection:
+    def __init__(self, smtp: aiosmtplib.SMTP):
+        self.smtp = smtp
+        self.messages = 0
+        self.last_used = time.monotonic()
+
+class PooledMailer(FastMail):
+    """FastMail that keeps authenticated SMTP connections open and reuses them across messages.
+
+    send_message() keeps the FastMail contract (raise on failure); send_batch() pushes a list
+    through one connection and reports a result per message, reconnecting once if the server
+    drops the connection mid-batch.
+    """
+
+    def __init__(
+        self,
+        config: ConnectionConfig,
+        pool_size: Optional[int] = None,
+        max_messages_per_connection: Optional[int] = None,
+        idle_seconds: Optional[float] = None
+    ):
+        super().__init__(config)
+        self.pool_size = pool_size or settings.MAIL_POOL_SIZE
+        self.max_messages_per_connection = max_messages_per_connection or settings.MAIL_POOL_MAX_MESSAGES
+        self.idle_seconds = idle_seconds if idle_seconds is not None else settings.MAIL_POOL_IDLE_SECONDS
+        self._idle: List[_PooledConnection] = []
+        self._slots: Optional[asyncio.Semaphore] = None
+        self.connections_opened = 0
+        self.reconnects = 0
+
+    async def _connect(self) -> _PooledConnection:
+        smtp = aiosmtplib.SMTP(
+            hostname=self.config.MAIL_SERVER,
+            port=self.config.MAIL_PORT,
+            timeout=self.config.TIMEOUT,
+            use_tls=self.config.MAIL_SSL_TLS,
+            start_tls=self.config.MAIL_STARTTLS,
+            validate_certs=self.config.VALIDATE_CERTS,
+            local_hostname=self.config.LOCAL_HOSTNAME,
+            cert_bundle=self.config.CERT_BUNDLE
+        )
+        await smtp.connect()
+        if self.config.USE_CREDENTIALS:
+            await smtp.login(self.config.MAIL_USERNAME, self.config.MAIL_PASSWORD.get_secret_value())
+        self.connections_opened += 1
+        return _PooledConnection(smtp)
+
+    @staticmethod
+    async def _discard(connection: _PooledConnection) -> None:
+        try:
+            await connection.smtp.quit()
+        except Exception:
+            connection.smtp.close()
+
+    def _reusable(self, connection: _PooledConnection) -> bool:
+        return (
+            connection.smtp.is_connected
+            and connection.messages < self.max_messages_per_connection
+            and time.monotonic() - connection.last_used < self.idle_seconds
+        )
+
+    @asynccontextmanager
+    async def connection(self):
+        """Borrow a live connection; at most pool_size are in use at once"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.pool_size)
+        async with self._slots:
+            connection = None
+            while self._idle and connection is None:
+                candidate = self._idle.pop()
+                if self._reusable(candidate):
+                    connection = candidate
+                else:
+                    await self._discard(candidate)
+            if connection is None:
+                connection = await self._connect()
+            try:
+                yield connection
+            except BaseException:
+                await self._discard(connection)
+                raise
+            connection.last_used = time.monotonic()
+            if self._reusable(connection):
+                self._idle.append(connection)
+            else:
+                await self._discard(connection)
+
+    async def send_batch(self, messages: List[MessageSchema]) -> List[Optional[Exception]]:
+        """Send every message over one pooled connection; returns None or the error per message"""
+        prepared = await self.get_message(list(messages)) if messages else []
+        results: List[Optional[Exception]] = [None] * len(prepared)
+        if not prepared or self.config.SUPPRESS_SEND:
+            return results
+        async with self.connection() as connection:
+            for index, message in enumerate(prepared):
+                for reconnected in (False, True):
+                    try:
+                        await connection.smtp.send_message(message)
+                        connection.messages += 1
+                        break
+                    except CONNECTION_ERRORS as error:
+                        if reconnected:
+                            results[index] = error
+                            break
+                        logger.warning("SMTP connection lost (%s), reconnecting", error)
+                        connection.smtp.close()
+                        try:
+                            replacement = await self._connect()
+                        except Exception as connect_error:
+                            results[index:] = [connect_error] * (len(prepared) - index)
+                            return results
+                        connection.smtp, connection.messages = replacement.smtp, 0
+                        self.reconnects += 1
+                    except aiosmtplib.SMTPException as error:
+                        results[index] = error
+                        break
+        return results
+
+    async def send_message(self, message: Union[MessageSchema, List[MessageSchema]], *args, **kwargs) -> None:
+        if args or kwargs:
+            # Template rendering through FastMail's own single-use connection
+            return await super().send_message(message, *args, **kwargs)
+        messages = message if isinstance(message, list) else [message]
+        for error in await self.send_batch(messages):
+            if error is not None:
+                raise error
+
+    async def close(self) -> None:
+        while self._idle:
+            await self._discard(self._idle.pop())
+
+    def stats(self) -> dict:
+        return {
+            "pool_size": self.pool_size,
+            "idle_connections": len(self._idle),
+            "connections_opened": self.connections_opened,
+            "reconnects": self.reconnects,
+        }
+
+fastmail = PooledMailer(email_conf)
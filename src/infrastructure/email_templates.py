@@ -0,0 +1,72 @@
+import os
+from typing import Dict, List, Optional
+
+from jinja2 import Environment, FileSystemLoader, Template, select_autoescape
+from markupsafe import Markup, escape
+
+TEMPLATE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "email")
+
+# Placeholders the layout is pre-rendered with, then split on
+_SLOTS = ("title", "body")
+_MARKERS = {slot: Markup(f"\x00{slot}\x00") for slot in _SLOTS}
+
+class EmailTemplates:
+    """Compiled notification email templates.
+
+    The layout (CSS, logo, signature, footer) is rendered once when loaded and cut into static
+    chunks around its title/body slots; a send only renders the per-type body fragment, with
+    autoescaping, and joins it between those chunks.
+    """
+
+    def __init__(self, template_dir: str = TEMPLATE_DIR):
+        self.environment = Environment(
+            loader=FileSystemLoader(template_dir),
+            autoescape=select_autoescape(["html"]),
+            trim_blocks=True,
+            lstrip_blocks=True
+        )
+        self._chunks, self._slots = self._prerender(self.environment.get_template("layout.html"))
+        self._bodies: Dict[str, Template] = {}
+        for name in self.environment.list_templates(filter_func=self._is_body_template):
+            self._bodies[name[:-len(".html")]] = self.environment.get_template(name)
+
+    @staticmethod
+    def _is_body_template(name: str) -> bool:
+        return name.endswith(".html") and name != "layout.html" and not name.startswith("_")
+
+    @staticmethod
+    def _prerender(layout: Template):
+        rendered = layout.render(**_MARKERS)
+        chunks: List[str] = []
+        slots: List[str] = []
+        position = 0
+        while True:
+            found = [(rendered.find(marker, position), slot) for slot, marker in _MARKERS.items()]
+            found = [(index, slot) for index, slot in found if index >= 0]
+            if not found:
+                chunks.append(rendered[position:])
+                return chunks, slots
+            index, slot = min(found)
+            chunks.append(rendered[position:index])
+            slots.append(slot)
+            position = index + len(_MARKERS[slot])
+
+    @property
+    def types(self) -> List[str]:
+        return sorted(self._bodies)
+
+    def render_body(self, notification_type: Optional[str], title: str, content: Optional[str]) -> Markup:
+        # NotificationType members hash by name, so look them up by value
+        template = self._bodies.get(getattr(notification_type, "value", notification_type)) or self._bodies["default"]
+        paragraphs = [paragraph.strip() for paragraph in (content or "").split("\n\n") if paragraph.strip()]
+        return Markup(template.render(title=title, paragraphs=paragraphs))
+
+    def render(self, notification_type: Optional[str], title: str, content: Optional[str]) -> str:
+        values = {"title": escape(title), "body": self.render_body(notification_type, title, content)}
+        parts = [self._chunks[0]]
+        for slot, chunk in zip(self._slots, self._chunks[1:]):
+            parts.append(values[slot])
+            parts.append(chunk)
+        return "".join(parts)
+
+email_templates = EmailTemplates()
@@ -0,0 +1,124 @@
+"""Minimal SMTP sink for tests, benchmarks and local development.
+
+Accepts every message (no TLS, any AUTH) and keeps it in memory. `delay` stands in for a
+slow relay, `connect_delay` for the TCP/TLS/AUTH handshake, `fail_first` answers the first N
+messages with a temporary 451 error and `drop_after` hangs up after N messages on a connection.
+
+    python -m src.infrastructure.fake_smtp --port 1025
+
+then run the API with MAIL_SERVER=localhost MAIL_PORT=1025 MAIL_STARTTLS=false
+MAIL_USE_CREDENTIALS=false.
+"""
+import argparse
+import asyncio
+import email
+import logging
+from email.message import Message
+from typing import List, Optional
+
+logger = logging.getLogger(__name__)
+
+class FakeSMTPServer:
+    def __init__(
+        self,
+        host: str = "127.0.0.1",
+        port: int = 0,
+        delay: float = 0.0,
+        fail_first: int = 0,
+        connect_delay: float = 0.0,
+        drop_after: int = 0
+    ):
+        self.host = host
+        self.port = port
+        self.delay = delay
+        self.fail_first = fail_first
+        self.connect_delay = connect_delay
+        self.drop_after = drop_after
+        self.messages: List[Message] = []
+        self.connections = 0
+        self._server: Optional[asyncio.base_events.Server] = None
+
+    async def start(self) -> "FakeSMTPServer":
+        self._server = await asyncio.start_server(self._handle, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+        return self
+
+    async def stop(self) -> None:
+        if self._server:
+            self._server.close()
+            await self._server.wait_closed()
+
+    async def __aenter__(self) -> "FakeSMTPServer":
+        return await self.start()
+
+    async def __aexit__(self, *exc) -> None:
+        await self.stop()
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self.connections += 1
+        received = 0
+
+        async def reply(line: str) -> None:
+            writer.write(f"{line}\r\n".encode())
+            await writer.drain()
+
+        if self.connect_delay:
+            await asyncio.sleep(self.connect_delay)
+        await reply("220 fake-smtp ready")
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                command = line.decode(errors="replace").strip().split(" ", 1)[0].upper()
+                if command == "EHLO":
+                    await reply("250-fake-smtp\r\n250-8BITMIME\r\n250-AUTH PLAIN LOGIN\r\n250 SIZE 52428800")
+                elif command == "AUTH":
+                    await reply("235 Authentication successful")
+                elif command == "DATA":
+                    await reply("354 End data with <CR><LF>.<CR><LF>")
+                    data = bytearray()
+                    while True:
+                        chunk = await reader.readline()
+                        if chunk in (b".\r\n", b".\n", b""):
+                            break
+                        data += chunk[1:] if chunk.startswith(b"..") else chunk
+                    if self.delay:
+                        await asyncio.sleep(self.delay)
+                    if self.fail_first > 0:
+                        self.fail_first -= 1
+                        await reply("451 Temporary failure, try again later")
+                    else:
+                        self.messages.append(email.message_from_bytes(bytes(data)))
+                        await reply("250 OK: queued")
+                        received += 1
+                        if self.drop_after and received >= self.drop_after:
+                            break
+                elif command == "QUIT":
+                    await reply("221 Bye")
+                    break
+                else:
+                    # HELO, MAIL, RCPT, RSET, NOOP ...
+                    await reply("250 OK")
+        except ConnectionError:
+            pass
+        finally:
+            writer.close()
+
+async def serve(host: str, port: int) -> None:
+    server = await FakeSMTPServer(host, port).start()
+    logger.warning("Fake SMTP sink listening on %s:%s", server.host, server.port)
+    seen = 0
+    while True:
+        await asyncio.sleep(1)
+        for message in server.messages[seen:]:
+            logger.warning("To: %s | Subject: %s", message["To"], message["Subject"])
+        seen = len(server.messages)
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=1025)
+    args = parser.parse_args()
+    logging.basicConfig(format="%(asctime)s %(message)s")
+    asyncio.run(serve(args.host, args.port))
@@ -0,0 +1,85 @@
+import hashlib
+from typing import Hashable, Optional
+
+from fastapi import Request, Response, status
+
+from src.infrastructure.cache import Cache, load_backend
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.account import Account
+from src.infrastructure.models.credit import Credit
+
+# Current ETag of account/credit responses, keyed by (resource, id or "list", user id); lets a
+# matching If-None-Match be answered with 304 before any query. Service write paths invalidate.
+resource_etags = Cache(
+    "etag",
+    load_backend(settings.CACHE_BACKEND, settings.ETAG_CACHE_SIZE),
+    settings.ETAG_CACHE_TTL_SECONDS
+)
+
+def make_etag(*parts) -> str:
+    """Weak ETag over the values a response is built from"""
+    digest = hashlib.sha1(repr(parts).encode()).hexdigest()[:20]
+    return f'W/"{digest}"'
+
+def account_etag(*accounts: Account) -> str:
+    # The version counter moves on every UPDATE of the row
+    return make_etag(*((account.id, account.version) for account in accounts))
+
+def credit_etag(*credits: Credit) -> str:
+    # Credits carry no version column: hash what the response shows
+    return make_etag(*(
+        (credit.id, credit.status, credit.amount, credit.interest_rate, credit.term_months, credit.monthly_payment,
+         credit.purpose, credit.approved_at, credit.next_payment_date, credit.remaining_amount)
+        for credit in credits
+    ))
+
+def etag_matches(request: Request, etag: str) -> bool:
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    if header.strip() == "*":
+        return True
+    # If-None-Match uses the weak comparison: W/"x" and "x" are the same tag
+    opaque = etag.removeprefix("W/")
+    return any(candidate.strip().removeprefix("W/") == opaque for candidate in header.split(","))
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=_cache_headers(etag))
+
+def _cache_headers(etag: str) -> dict:
+    # Clients may keep the body but must revalidate before every use
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+def cached_not_modified(request: Request, key: Hashable) -> Optional[Response]:
+    """304 straight from resource_etags when the client already holds the current version"""
+    if "if-none-match" not in request.headers:
+        return None
+    etag = resource_etags.get(key)
+    if etag is not None and etag_matches(request, etag):
+        return not_modified(etag)
+    return None
+
+def conditional(request: Request, response: Response, key: Hashable, etag: str) -> Optional[Response]:
+    """Remember `etag` for `key` and tag the response; returns a 304 when the client's copy is current"""
+    resource_etags.set(key, etag)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+    response.headers.update(_cache_headers(etag))
+    return None
+
+def account_key(user_id: int, account_id: Optional[int] = None) -> tuple:
+    """Key of one account, or of the user's account list when account_id is None"""
+    return ("accounts", account_id or "list", user_id)
+
+def credit_key(user_id: int, credit_id: Optional[int] = None) -> tuple:
+    return ("credits", credit_id or "list", user_id)
+
+def invalidate_account(user_id: int, account_id: Optional[int] = None) -> None:
+    resource_etags.invalidate(account_key(user_id))
+    if account_id is not None:
+        resource_etags.invalidate(account_key(user_id, account_id))
+
+def invalidate_credit(user_id: int, credit_id: Optional[int] = None) -> None:
+    resource_etags.invalidate(credit_key(user_id))
+    if credit_id is not None:
+        resource_etags.invalidate(credit_key(user_id, credit_id))
@@ -19,7 +19,7 @@ class Account(Base):
     __tablename__ = "accounts"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"))
+    user_id = Column(Integer, ForeignKey("users.id"), index=True)
     account_number = Column(String(20), unique=True, nullable=False, index=True)
     account_type = Column(SQLEnum(AccountType), nullable=False)
     status = Column(SQLEnum(AccountStatus), nullable=False, default=AccountStatus.ACTIVE)
@@ -27,6 +27,8 @@ class Account(Base):
     currency = Column(String(3), nullable=False, default="MXN")
     created_at = Column(DateTime, default=datetime.utcnow)
     last_transaction_date = Column(DateTime, nullable=True)
+    # Bumped on every UPDATE; a concurrent writer holding a stale copy gets StaleDataError
+    version = Column(Integer, nullable=False, default=1, server_default="1")
 
     # Relationships
     user = relationship("User", back_populates="accounts")
@@ -34,4 +36,6 @@ class Account(Base):
         "Transaction",
         back_populates="account",
         foreign_keys="[Transaction.account_id]"
-    )
\ No newline at end of file
+    )
+
+    __mapper_args__ = {"version_id_col": version}
\ No newline at end of file
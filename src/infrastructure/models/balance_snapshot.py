@@ -0,0 +1,17 @@
+from datetime import datetime
+from sqlalchemy import Column, Date, DateTime, ForeignKey, Integer, Numeric
+
+from src.infrastructure.models.base import Base
+
+class BalanceSnapshot(Base):
+    """An account's closing balance on a day it had postings: the sum of its postings before the next midnight (UTC).
+
+    Days without postings get no row; the balance carries over from the latest earlier snapshot.
+    """
+    __tablename__ = "balance_snapshots"
+
+    # Primary key order makes "latest snapshot of an account before a day" one index seek
+    account_id = Column(Integer, ForeignKey("accounts.id"), primary_key=True)
+    day = Column(Date, primary_key=True)
+    balance = Column(Numeric(precision=15, scale=2), nullable=False)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
@@ -18,7 +18,7 @@ class Credit(Base):
     __tablename__ = "credits"
 
     id = Column(Integer, primary_key=True, index=True)
-    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False, index=True)
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     interest_rate = Column(Numeric(precision=5, scale=2), nullable=False)
     term_months = Column(Integer, nullable=False)
@@ -0,0 +1,24 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Integer, String, Text, UniqueConstraint
+
+from src.infrastructure.models.base import Base
+
+class IdempotencyKey(Base):
+    """A client's Idempotency-Key and the response of the request that first used it.
+
+    response_body is NULL while that request is still running. status_code is set in the same
+    transaction as the request's changes, so a key whose request committed is never run again.
+    """
+    __tablename__ = "idempotency_keys"
+    __table_args__ = (UniqueConstraint("user_id", "key", name="uq_idempotency_keys_user_key"),)
+
+    id = Column(Integer, primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
+    key = Column(String(255), nullable=False)
+    request_hash = Column(String(64), nullable=False)
+    status_code = Column(Integer, nullable=True)
+    response_body = Column(Text, nullable=True)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    # A running claim older than this is taken to belong to a crashed request and can be taken over
+    locked_until = Column(DateTime, nullable=False)
+    expires_at = Column(DateTime, nullable=False, index=True)
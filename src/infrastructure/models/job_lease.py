@@ -0,0 +1,14 @@
+from sqlalchemy import Column, DateTime, Float, Integer, String
+
+from src.infrastructure.models.base import Base
+
+class JobLease(Base):
+    """One row per scheduled job: who may run it right now and when it last ran"""
+    __tablename__ = "job_leases"
+
+    name = Column(String(100), primary_key=True)
+    owner = Column(String(255), nullable=True)
+    expires_at = Column(DateTime, nullable=True)
+    last_run_at = Column(DateTime, nullable=True)
+    last_duration_seconds = Column(Float, nullable=True)
+    last_rows = Column(Integer, nullable=True)
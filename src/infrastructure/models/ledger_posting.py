@@ -0,0 +1,31 @@
+from datetime import datetime
+from sqlalchemy import Column, DateTime, ForeignKey, Index, Integer, Numeric
+from sqlalchemy.orm import relationship
+
+from src.infrastructure.models.base import Base
+
+class LedgerPosting(Base):
+    """One side of a money movement; append-only.
+
+    Every movement is posted twice, amount leaving one side (negative) and arriving on the other
+    (positive), so the postings of a movement sum to zero. account_id NULL is the world outside
+    the bank (cash deposited or withdrawn, balances carried over from before the ledger), so an
+    account's balance is the sum of its postings.
+    """
+    __tablename__ = "ledger_postings"
+
+    id = Column(Integer, primary_key=True)
+    # NULL for the opening balances of accounts that predate the ledger
+    transaction_id = Column(Integer, ForeignKey("transactions.id"), nullable=True)
+    account_id = Column(Integer, ForeignKey("accounts.id"), nullable=True)
+    amount = Column(Numeric(precision=15, scale=2), nullable=False)
+    posted_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+
+    transaction = relationship("Transaction")
+
+    # An account's history is one range of the first index; id makes the keyset cursor unique.
+    # The second finds a day's postings of every account for the balance snapshot job.
+    __table_args__ = (
+        Index("ix_ledger_postings_account_posted", account_id, posted_at, id),
+        Index("ix_ledger_postings_posted_at", posted_at),
+    )
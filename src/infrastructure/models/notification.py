@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, DateTime, Boolean, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, DateTime, Boolean, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 from src.infrastructure.models.base import Base
 
@@ -25,9 +25,29 @@ class Notification(Base):
     title = Column(String)
     content = Column(String)
     email_sent = Column(Boolean, default=False)
+    # Recipient for the delivery worker; NULL when no email was requested
+    email_to = Column(String, nullable=True)
+    email_attempts = Column(Integer, nullable=False, default=0, server_default="0")
     read = Column(Boolean, default=False)
     created_at = Column(DateTime, default=datetime.utcnow)
     sent_at = Column(DateTime, nullable=True)
 
     # Relationship
-    user = relationship("User", back_populates="notifications")
\ No newline at end of file
+    user = relationship("User", back_populates="notifications")
+
+    __table_args__ = (
+        Index("ix_notifications_user_created", user_id, created_at),
+        Index("ix_notifications_user_type_created", user_id, type, created_at),
+        # Unread notifications are a small slice of the table
+        Index(
+            "ix_notifications_user_unread", user_id, created_at,
+            postgresql_where=read == False,
+            sqlite_where=read == False
+        ),
+        # Startup scan for mail the worker still owes
+        Index(
+            "ix_notifications_email_pending", id,
+            postgresql_where=(email_sent == False) & email_to.isnot(None),
+            sqlite_where=(email_sent == False) & email_to.isnot(None)
+        ),
+    )
\ No newline at end of file
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Numeric, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from src.infrastructure.models.base import Base
@@ -16,7 +16,7 @@ class Payment(Base):
     __tablename__ = "payments"
 
     id = Column(Integer, primary_key=True, index=True)
-    credit_id = Column(Integer, ForeignKey("credits.id"), nullable=False)
+    credit_id = Column(Integer, ForeignKey("credits.id"), nullable=False, index=True)
     amount = Column(Numeric(precision=10, scale=2), nullable=False)
     payment_date = Column(DateTime, nullable=False, default=datetime.utcnow)
     status = Column(SQLEnum(PaymentStatus), nullable=False, default=PaymentStatus.PENDING)
@@ -27,3 +27,7 @@ class Payment(Base):
     # Relationships
     credit = relationship("Credit", back_populates="payments")
     transaction = relationship("Transaction")
+
+    __table_args__ = (
+        Index("ix_payments_status_payment_date", status, payment_date),
+    )
@@ -1,6 +1,6 @@
 from datetime import datetime
 from enum import Enum
-from sqlalchemy import Column, Integer, String, Numeric, DateTime, ForeignKey, Enum as SQLEnum
+from sqlalchemy import Column, Index, Integer, String, Numeric, DateTime, ForeignKey, Enum as SQLEnum
 from sqlalchemy.orm import relationship
 
 from src.infrastructure.models.base import Base
@@ -32,3 +32,13 @@ class Transaction(Base):
 
     account = relationship("Account", foreign_keys=[account_id], back_populates="transactions")
     destination_account = relationship("Account", foreign_keys=[destination_account_id])
+
+    # One per side of account_history's UNION ALL; id makes the keyset cursor an index range
+    __table_args__ = (
+        Index("ix_transactions_account_created", account_id, created_at, id),
+        Index(
+            "ix_transactions_destination_created", destination_account_id, created_at, id,
+            postgresql_where=destination_account_id.isnot(None),
+            sqlite_where=destination_account_id.isnot(None)
+        ),
+    )
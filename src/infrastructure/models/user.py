@@ -23,6 +23,6 @@ class User(BaseModel):
                  server_default=UserRole.USER.value)
 
     # Relationships
-    credits = relationship("Credit", back_populates="user")
-    accounts = relationship("Account", back_populates="user")
-    notifications = relationship("Notification", back_populates="user")
+    credits = relationship("Credit", back_populates="user", lazy="raise_on_sql")
+    accounts = relationship("Account", back_populates="user", lazy="raise_on_sql")
+    notifications = relationship("Notification", back_populates="user", lazy="raise_on_sql")
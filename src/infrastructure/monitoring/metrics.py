@@ -0,0 +1,85 @@
+"""Prometheus metrics served on /metrics.
+
+With PROMETHEUS_MULTIPROC_DIR set, every uvicorn worker writes its samples to its own mmap-ed
+files in that directory and /metrics sums the files of all workers, so any worker can answer a
+scrape. The directory must exist before the workers start and be emptied on every deploy.
+Without it the values are those of the process serving the scrape.
+"""
+import os
+from decimal import Decimal
+
+# Imported first: it loads .env, and prometheus_client picks its value storage from
+# PROMETHEUS_MULTIPROC_DIR when it is imported
+from src.infrastructure.config.settings import settings
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+
+# Upper bounds of the histogram buckets: seconds, and SQL statements per request
+DURATION_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+PROMETHEUS_CONTENT_TYPE = CONTENT_TYPE_LATEST
+
+# HTTP, labelled by route template so the number of series stays bounded
+REQUESTS = Counter("http_requests", "Requests handled", ["method", "route", "status"])
+REQUEST_ERRORS = Counter(
+    "http_request_errors", "Requests that failed with a 5xx response or an unhandled exception", ["method", "route"]
+)
+REQUESTS_IN_PROGRESS = Gauge(
+    "http_requests_in_progress", "Requests being handled", ["method"], multiprocess_mode="livesum"
+)
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time from request to the end of the response body",
+    ["method", "route"], buckets=DURATION_BUCKETS
+)
+REQUEST_DB_SECONDS = Histogram(
+    "http_request_db_seconds", "Time spent executing SQL statements per request",
+    ["method", "route"], buckets=DURATION_BUCKETS
+)
+REQUEST_DB_SLOWEST_STATEMENT = Histogram(
+    "http_request_db_slowest_statement_seconds", "Slowest SQL statement of each request",
+    ["method", "route"], buckets=DURATION_BUCKETS
+)
+REQUEST_DB_STATEMENTS = Histogram(
+    "http_request_db_statements", "SQL statements executed per request",
+    ["method", "route"], buckets=STATEMENT_BUCKETS
+)
+
+# Business throughput
+TRANSACTIONS = Counter("banking_transactions", "Completed deposits, withdrawals and transfers", ["type"])
+TRANSACTION_VOLUME = Counter(
+    "banking_transaction_volume", "Amount moved by completed transactions", ["type", "currency"]
+)
+NOTIFICATION_EMAILS = Counter("notification_emails", "Notification email delivery attempts", ["result"])
+LOGINS = Counter("auth_logins", "Login attempts", ["result"])
+LEDGER_MISMATCHES = Gauge(
+    "ledger_balance_mismatches", "Accounts whose balance differed from their postings at the last verification",
+    multiprocess_mode="mostrecent"
+)
+
+def record_transaction(transaction_type: str, amount: Decimal, currency: str) -> None:
+    transaction_type = getattr(transaction_type, "value", transaction_type)
+    TRANSACTIONS.labels(transaction_type).inc()
+    TRANSACTION_VOLUME.labels(transaction_type, currency).inc(float(amount))
+
+def render_metrics() -> bytes:
+    """Prometheus text exposition format, summed over all workers in multiprocess mode"""
+    if not settings.PROMETHEUS_MULTIPROC_DIR:
+        return generate_latest(REGISTRY)
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry, path=settings.PROMETHEUS_MULTIPROC_DIR)
+    return generate_latest(registry)
+
+def mark_worker_stopped() -> None:
+    """Drop this worker's live gauges from the aggregate; its counters keep counting"""
+    if settings.PROMETHEUS_MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid(), settings.PROMETHEUS_MULTIPROC_DIR)
@@ -0,0 +1,82 @@
+import logging
+import threading
+import time
+from typing import Dict, Type
+
+from sqlalchemy import exc
+from sqlalchemy.pool import Pool
+
+logger = logging.getLogger(__name__)
+
+# Upper bounds (seconds) of the checkout wait histogram buckets
+WAIT_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+class PoolMetrics:
+    """Checkout counters and wait-time histogram for one connection pool"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.pool: Pool = None
+        self._lock = threading.Lock()
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_seconds_sum = 0.0
+        self.wait_bucket_counts = [0] * (len(WAIT_BUCKETS) + 1)
+
+    def observe_wait(self, seconds: float) -> None:
+        index = next((i for i, bound in enumerate(WAIT_BUCKETS) if seconds <= bound), len(WAIT_BUCKETS))
+        with self._lock:
+            self.checkouts += 1
+            self.wait_seconds_sum += seconds
+            self.wait_bucket_counts[index] += 1
+
+    def record_timeout(self, seconds: float) -> None:
+        with self._lock:
+            self.timeouts += 1
+        logger.warning("Connection pool %s: checkout timed out after %.2fs", self.name, seconds)
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            cumulative, buckets = 0, {}
+            for bound, count in zip(WAIT_BUCKETS + (float("inf"),), self.wait_bucket_counts):
+                cumulative += count
+                buckets["+Inf" if bound == float("inf") else str(bound)] = cumulative
+            data = {
+                "checkouts": self.checkouts,
+                "checkout_timeouts": self.timeouts,
+                "wait_seconds_sum": round(self.wait_seconds_sum, 6),
+                "wait_seconds_buckets": buckets,
+            }
+        if self.pool is not None and hasattr(self.pool, "checkedout"):
+            data.update(
+                size=self.pool.size(),
+                checked_out=self.pool.checkedout(),
+                checked_in=self.pool.checkedin(),
+                overflow=self.pool.overflow(),
+            )
+        return data
+
+POOL_METRICS: Dict[str, PoolMetrics] = {}
+
+def instrumented_pool_class(base: Type[Pool], name: str) -> Type[Pool]:
+    """Subclass `base` so every checkout records its wait time into POOL_METRICS[name].
+
+    The metrics live on the class, so they survive Pool.recreate() after engine.dispose().
+    """
+    metrics = POOL_METRICS.setdefault(name, PoolMetrics(name))
+
+    def __init__(self, *args, **kwargs):
+        base.__init__(self, *args, **kwargs)
+        metrics.pool = self
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            record = base._do_get(self)
+        except exc.TimeoutError:
+            metrics.record_timeout(time.perf_counter() - start)
+            raise
+        metrics.observe_wait(time.perf_counter() - start)
+        return record
+
+    return type(f"Instrumented{base.__name__}", (base,), {"__init__": __init__, "_do_get": _do_get})
@@ -0,0 +1,77 @@
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Iterator, List, Optional, Tuple
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+logger = logging.getLogger(__name__)
+
+class QueryCount:
+    """SQL statements issued inside one count_queries() block"""
+
+    def __init__(self, keep_statements: bool = False):
+        self.selects = 0
+        self.statements = 0
+        self.db_seconds = 0.0
+        self.slowest_seconds = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.keep_statements = keep_statements
+        self.select_statements: List[str] = []
+
+    def record(self, statement: str) -> None:
+        self.statements += 1
+        if statement.lstrip()[:6].upper().startswith(("SELECT", "WITH")):
+            self.selects += 1
+            if self.keep_statements:
+                self.select_statements.append(statement)
+
+    def record_duration(self, statement: str, seconds: float) -> None:
+        self.db_seconds += seconds
+        if seconds > self.slowest_seconds:
+            self.slowest_seconds = seconds
+            self.slowest_statement = statement
+
+# Open count_queries() blocks, innermost last; nested blocks (a test around a request) all count.
+# Shared by the request's threadpool hops and run_sync greenlets, since both copy the context
+_current: ContextVar[Tuple[QueryCount, ...]] = ContextVar("query_counts", default=())
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    counters = _current.get()
+    if counters:
+        for counter in counters:
+            counter.record(statement)
+        # Outside a count_queries() block the hooks cost one ContextVar lookup
+        conn.info["query_started"] = time.perf_counter()
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    started = conn.info.pop("query_started", None)
+    if started is not None:
+        seconds = time.perf_counter() - started
+        for counter in _current.get():
+            counter.record_duration(statement, seconds)
+
+def install_query_counter(engine: Engine) -> None:
+    if not event.contains(engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(engine, "after_cursor_execute", _after_cursor_execute)
+
+@contextmanager
+def count_queries(keep_statements: bool = False) -> Iterator[QueryCount]:
+    counter = QueryCount(keep_statements)
+    token = _current.set(_current.get() + (counter,))
+    try:
+        yield counter
+    finally:
+        _current.reset(token)
+
+@contextmanager
+def assert_max_selects(limit: int) -> Iterator[QueryCount]:
+    """Fail when the block issues more than `limit` SELECTs, listing them; catches N+1 regressions in tests"""
+    with count_queries(keep_statements=True) as counter:
+        yield counter
+    if counter.selects > limit:
+        listing = "\n".join(f"  {statement.strip()}" for statement in counter.select_statements)
+        raise AssertionError(f"{counter.selects} SELECTs issued, at most {limit} expected:\n{listing}")
@@ -0,0 +1,89 @@
+import logging
+import time
+from typing import Optional
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.infrastructure.monitoring import metrics
+from src.infrastructure.monitoring.query_counter import QueryCount, count_queries
+
+logger = logging.getLogger(__name__)
+
+def route_template(scope: Scope) -> str:
+    """The matched route's path template, e.g. /api/v1/payments/{payment_id}, or "unmatched".
+
+    Routes of an included router may carry only their own part of the path (newer FastAPI
+    matches the prefix separately), so the prefix is taken from the request path: the first
+    "/" from which the route's pattern matches the rest.
+    """
+    route = scope.get("route")
+    path_format = getattr(route, "path_format", None)
+    if path_format is None:
+        return "unmatched"
+    path = scope["path"]
+    for index, char in enumerate(path):
+        if char == "/" and route.path_regex.match(path[index:]):
+            return path[:index] + path_format
+    return path_format
+
+def server_timing(queries: QueryCount, elapsed: float) -> str:
+    return (
+        f'db;dur={queries.db_seconds * 1000:.1f};desc="{queries.statements} statements", '
+        f"db-slowest;dur={queries.slowest_seconds * 1000:.1f}, "
+        f"app;dur={elapsed * 1000:.1f}"
+    )
+
+class RequestMetricsMiddleware:
+    """Times each request and the SQL it runs; adds a Server-Timing header and feeds the HTTP metrics.
+
+    With max_selects set (QUERY_COUNT_DEBUG) it also sends X-Query-Count and logs requests that
+    issue more SELECTs than that, with their slowest statement.
+    """
+
+    def __init__(self, app: ASGIApp, max_selects: Optional[int] = None):
+        self.app = app
+        self.max_selects = max_selects
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        method = scope["method"]
+        started = time.perf_counter()
+        status_code = 500
+        in_progress = metrics.REQUESTS_IN_PROGRESS.labels(method)
+        in_progress.inc()
+        with count_queries() as queries:
+            async def send_with_timing(message: Message) -> None:
+                nonlocal status_code
+                if message["type"] == "http.response.start":
+                    status_code = message["status"]
+                    headers = MutableHeaders(scope=message)
+                    headers.append("Server-Timing", server_timing(queries, time.perf_counter() - started))
+                    if self.max_selects is not None:
+                        headers["X-Query-Count"] = str(queries.selects)
+                await send(message)
+
+            try:
+                await self.app(scope, receive, send_with_timing)
+            finally:
+                in_progress.dec()
+                self._observe(scope, status_code, time.perf_counter() - started, queries)
+
+    def _observe(self, scope: Scope, status_code: int, seconds: float, queries: QueryCount) -> None:
+        method, route = scope["method"], route_template(scope)
+        metrics.REQUESTS.labels(method, route, str(status_code)).inc()
+        if status_code >= 500:
+            metrics.REQUEST_ERRORS.labels(method, route).inc()
+        metrics.REQUEST_DURATION.labels(method, route).observe(seconds)
+        metrics.REQUEST_DB_SECONDS.labels(method, route).observe(queries.db_seconds)
+        metrics.REQUEST_DB_SLOWEST_STATEMENT.labels(method, route).observe(queries.slowest_seconds)
+        metrics.REQUEST_DB_STATEMENTS.labels(method, route).observe(queries.statements)
+        if self.max_selects is not None and queries.selects > self.max_selects:
+            logger.warning(
+                "%s %s issued %d SELECTs (limit %d); slowest %.1fms: %s",
+                method, scope["path"], queries.selects, self.max_selects,
+                queries.slowest_seconds * 1000, queries.slowest_statement
+            )
@@ -0,0 +1,67 @@
+"""Minimal PDF writer for plain text reports: pages of Courier lines, produced as a byte stream"""
+from typing import Dict, Iterable, Iterator, Sequence
+
+# A4 in points
+PAGE_WIDTH = 595
+PAGE_HEIGHT = 842
+MARGIN = 40
+FONT_SIZE = 8
+LEADING = 11
+# Courier glyphs are 0.6 em wide
+LINE_WIDTH = int((PAGE_WIDTH - 2 * MARGIN) / (FONT_SIZE * 0.6))
+LINES_PER_PAGE = (PAGE_HEIGHT - 2 * MARGIN) // LEADING
+
+CATALOG, PAGES, FONT = 1, 2, 3
+
+def _escape(line: str) -> bytes:
+    text = line.replace("\\", "\\\\").replace("(", "\\(").replace(")", "\\)")
+    return text.encode("cp1252", "replace")
+
+def _page_content(lines: Sequence[str]) -> bytes:
+    text = b"".join(b"(" + _escape(line) + b") Tj T*\n" for line in lines)
+    return b"BT /F1 %d Tf %d TL %d %d Td\n%sET\n" % (FONT_SIZE, LEADING, MARGIN, PAGE_HEIGHT - MARGIN, text)
+
+def stream_text_pdf(pages: Iterable[Sequence[str]]) -> Iterator[bytes]:
+    """Yield a PDF with one page per item of `pages`, each at most LINES_PER_PAGE lines.
+
+    Every page is written as soon as it is produced; only object offsets are kept for the
+    cross-reference table, so memory does not grow with the document.
+    """
+    offsets: Dict[int, int] = {}
+    position = 0
+
+    def chunk(number: int, body: bytes) -> bytes:
+        nonlocal position
+        data = b"%d 0 obj\n%s\nendobj\n" % (number, body)
+        offsets[number] = position
+        position += len(data)
+        return data
+
+    header = b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n"
+    position = len(header)
+    yield header + chunk(CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % PAGES) + chunk(
+        FONT, b"<< /Type /Font /Subtype /Type1 /BaseFont /Courier /Encoding /WinAnsiEncoding >>"
+    )
+
+    kids = []
+    number = FONT
+    for lines in pages:
+        content = _page_content(lines)
+        page = (
+            b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Resources << /Font << /F1 %d 0 R >> >> "
+            b"/Contents %d 0 R >>" % (PAGES, PAGE_WIDTH, PAGE_HEIGHT, FONT, number + 1)
+        )
+        yield chunk(number + 1, b"<< /Length %d >>\nstream\n%s\nendstream" % (len(content), content)) + chunk(
+            number + 2, page
+        )
+        kids.append(number + 2)
+        number += 2
+
+    references = b" ".join(b"%d 0 R" % kid for kid in kids)
+    tail = chunk(PAGES, b"<< /Type /Pages /Kids [%s] /Count %d >>" % (references, len(kids)))
+    xref = b"xref\n0 %d\n0000000000 65535 f \n" % (number + 1) + b"".join(
+        b"%010d 00000 n \n" % offsets[index] for index in range(1, number + 1)
+    )
+    yield tail + xref + b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (
+        number + 1, CATALOG, position
+    )
@@ -1,13 +1,25 @@
 from datetime import datetime
 import decimal
-from typing import List, Optional
-from sqlalchemy.orm import Session
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple
+from sqlalchemy import or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Query, Session
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
 from fastapi import HTTPException
 
+from src.infrastructure.config.settings import settings
 from src.infrastructure.models.account import Account, AccountStatus
 from src.presentation.schemas.account_schemas import AccountCreate, AccountUpdate
 
+class LockingMode(str, Enum):
+    PESSIMISTIC = "pessimistic"
+    OPTIMISTIC = "optimistic"
+
+def modified_concurrently() -> HTTPException:
+    return HTTPException(status_code=409, detail="Account was modified concurrently, please retry")
+
 class AccountRepository:
     def __init__(self, db: Session):
         self.db = db
@@ -33,24 +45,138 @@ class AccountRepository:
     def get_by_account_number(self, account_number: str) -> Optional[Account]:
         return self.db.query(Account).filter(Account.account_number == account_number).first()
 
+    def _for_update(self, query: Query) -> Query:
+        """Reload rows about to change; in pessimistic mode also lock them in Account.id order.
+
+        Every writer locks in the same order, so an A->B and a B->A transfer cannot deadlock.
+        The version counter still guards both modes (and databases without FOR UPDATE).
+        """
+        query = query.populate_existing()
+        if settings.ACCOUNT_LOCKING_MODE == LockingMode.PESSIMISTIC:
+            query = query.order_by(Account.id).with_for_update()
+        return query
+
+    def get_for_update(self, account_id: int) -> Optional[Account]:
+        return self._for_update(self.db.query(Account).filter(Account.id == account_id)).first()
+
+    def lock_accounts(self, account_ids: Iterable[int]) -> Dict[int, Account]:
+        accounts = self._for_update(self.db.query(Account).filter(Account.id.in_(set(account_ids)))).all()
+        return {account.id: account for account in accounts}
+
+    def get_for_transfer(self, source_account_id: int, destination_account_number: str) -> Tuple[Optional[Account], Optional[Account]]:
+        """Load (and lock) both sides of a transfer in a single query"""
+        accounts = self._for_update(self.db.query(Account).filter(
+            or_(Account.id == source_account_id, Account.account_number == destination_account_number)
+        )).all()
+        source = next((account for account in accounts if account.id == source_account_id), None)
+        destination = next((account for account in accounts if account.account_number == destination_account_number), None)
+        return source, destination
+
+    def get_for_batch(self, source_account_id: int, destination_account_numbers: Iterable[str]) -> Tuple[Optional[Account], Dict[str, Account]]:
+        """Load (and lock) a batch's source account and all its destinations in a single query"""
+        accounts = self._for_update(self.db.query(Account).filter(
+            or_(Account.id == source_account_id, Account.account_number.in_(set(destination_account_numbers)))
+        )).all()
+        source = next((account for account in accounts if account.id == source_account_id), None)
+        return source, {account.account_number: account for account in accounts}
+
     def get_by_user_id(self, user_id: int) -> List[Account]:
         return self.db.query(Account).filter(Account.user_id == user_id).all()
 
+    def get_ids_opened_before(self, moment: datetime) -> List[int]:
+        return list(self.db.scalars(select(Account.id).where(Account.created_at < moment).order_by(Account.id)))
+
     def update(self, account_id: int, account_data: AccountUpdate) -> Optional[Account]:
-        db_account = self.get_by_id(account_id)
-        if db_account:
+        """Apply account_data to a fresh copy of the row, again if a concurrent balance change bumped its version"""
+        for _ in range(settings.ACCOUNT_LOCK_MAX_RETRIES + 1):
+            db_account = self.get_for_update(account_id)
+            if db_account is None:
+                return None
             for key, value in account_data.model_dump(exclude_unset=True).items():
                 setattr(db_account, key, value)
-            self.db.commit()
+            try:
+                self.db.commit()
+            except StaleDataError:
+                self.db.rollback()
+                continue
             self.db.refresh(db_account)
-        return db_account
+            return db_account
+        raise modified_concurrently()
+
+    def apply_balance_delta(self, account: Account, amount: decimal.Decimal) -> Account:
+        """Change the balance in the current unit of work; the caller commits"""
+        account.balance += amount
+        account.last_transaction_date = datetime.utcnow()
+        return account
 
     def update_balance(self, account_id: int, amount: decimal.Decimal) -> Account:
-        db_account = self.get_by_id(account_id)
+        db_account = self.get_for_update(account_id)
         if db_account:
-            db_account.balance += amount
-            db_account.last_transaction_date = datetime.utcnow()
+            self.apply_balance_delta(db_account, amount)
             self.db.commit()
             self.db.refresh(db_account)
             return db_account
-        raise HTTPException(status_code=404, detail="Account not found")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Account not found")
+
+class AsyncAccountRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, account_data: AccountCreate, user_id: int, account_number: str) -> Account:
+        db_account = Account(
+            user_id=user_id,
+            account_number=account_number,
+            **account_data.model_dump(exclude={'email'})
+        )
+        try:
+            self.db.add(db_account)
+            await self.db.commit()
+            await self.db.refresh(db_account)
+            return db_account
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(status_code=400, detail="Account number already exists")
+
+    async def get_by_id(self, account_id: int) -> Optional[Account]:
+        return await self.db.get(Account, account_id)
+
+    async def get_by_account_number(self, account_number: str) -> Optional[Account]:
+        result = await self.db.execute(select(Account).where(Account.account_number == account_number))
+        return result.scalars().first()
+
+    async def get_by_user_id(self, user_id: int) -> List[Account]:
+        result = await self.db.execute(select(Account).where(Account.user_id == user_id))
+        return list(result.scalars().all())
+
+    async def get_for_update(self, account_id: int) -> Optional[Account]:
+        statement = select(Account).where(Account.id == account_id).execution_options(populate_existing=True)
+        if settings.ACCOUNT_LOCKING_MODE == LockingMode.PESSIMISTIC:
+            statement = statement.with_for_update()
+        result = await self.db.execute(statement)
+        return result.scalars().first()
+
+    async def update(self, account_id: int, account_data: AccountUpdate) -> Optional[Account]:
+        for _ in range(settings.ACCOUNT_LOCK_MAX_RETRIES + 1):
+            db_account = await self.get_for_update(account_id)
+            if db_account is None:
+                return None
+            for key, value in account_data.model_dump(exclude_unset=True).items():
+                setattr(db_account, key, value)
+            try:
+                await self.db.commit()
+            except StaleDataError:
+                await self.db.rollback()
+                continue
+            await self.db.refresh(db_account)
+            return db_account
+        raise modified_concurrently()
+
+    async def update_balance(self, account_id: int, amount: decimal.Decimal) -> Account:
+        db_account = await self.get_for_update(account_id)
+        if db_account:
+            db_account.balance += amount
+            db_account.last_transaction_date = datetime.utcnow()
+            await self.db.commit()
+            await self.db.refresh(db_account)
+            return db_account
+        raise HTTPException(status_code=404, detail="Account not found")
@@ -1,6 +1,10 @@
+from datetime import datetime
 from typing import List, Optional
+from sqlalchemy import Row, func, insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.payment import Payment
 from src.presentation.schemas.credit_schemas import CreditCreate, CreditUpdate
 
 class CreditRepository:
@@ -12,31 +16,35 @@ class CreditRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    @classmethod
+    def _prepare(cls, credit_data: CreditCreate) -> dict:
+        """Column values of a new credit, filling in the default rate, monthly payment and remaining amount"""
+        credit_dict = credit_data.model_dump()
+        if credit_dict.get('interest_rate') is None:
+            credit_dict['interest_rate'] = cls.DEFAULT_ANNUAL_INTEREST_RATE
+        if credit_dict.get('monthly_payment') is None:
+            from decimal import Decimal
+            amount = Decimal(str(credit_dict['amount']))
+            interest_rate = Decimal(str(credit_dict['interest_rate']))
+            term_months = credit_dict['term_months']
+            
+            # Calculate monthly payment using amortization formula
+            monthly_rate = interest_rate / Decimal(str(cls.MONTHS_PER_YEAR)) / Decimal(str(cls.PERCENTAGE_DIVISOR))
+            
+            if monthly_rate == 0:
+                credit_dict['monthly_payment'] = amount / Decimal(term_months)
+            else:
+                numerator = monthly_rate * (1 + monthly_rate) ** term_months
+                denominator = (1 + monthly_rate) ** term_months - 1
+                monthly_payment = amount * (numerator / denominator)
+                credit_dict['monthly_payment'] = Decimal(round(monthly_payment, cls.DECIMAL_PLACES))
+        if credit_dict.get('remaining_amount') is None:
+            credit_dict['remaining_amount'] = credit_dict['amount']
+        return credit_dict
+
     def create(self, credit_data: CreditCreate) -> Credit:
         try:
-            credit_dict = credit_data.model_dump()
-            if credit_dict.get('interest_rate') is None:
-                credit_dict['interest_rate'] = self.DEFAULT_ANNUAL_INTEREST_RATE
-            if credit_dict.get('monthly_payment') is None:
-                from decimal import Decimal
-                amount = Decimal(str(credit_dict['amount']))
-                interest_rate = Decimal(str(credit_dict['interest_rate']))
-                term_months = credit_dict['term_months']
-                
-                # Calculate monthly payment using amortization formula
-                monthly_rate = interest_rate / Decimal(str(self.MONTHS_PER_YEAR)) / Decimal(str(self.PERCENTAGE_DIVISOR))
-                
-                if monthly_rate == 0:
-                    credit_dict['monthly_payment'] = amount / Decimal(term_months)
-                else:
-                    numerator = monthly_rate * (1 + monthly_rate) ** term_months
-                    denominator = (1 + monthly_rate) ** term_months - 1
-                    monthly_payment = amount * (numerator / denominator)
-                    credit_dict['monthly_payment'] = Decimal(round(monthly_payment, self.DECIMAL_PLACES))
-            if credit_dict.get('remaining_amount') is None:
-                credit_dict['remaining_amount'] = credit_dict['amount']
-
-            db_credit = Credit(**credit_dict)
+            db_credit = Credit(**self._prepare(credit_data))
             self.db.add(db_credit)
             self.db.commit()
             self.db.refresh(db_credit)
@@ -60,10 +68,89 @@ class CreditRepository:
             self.db.refresh(db_credit)
         return db_credit
 
+    def get_due_for_rollover(self, cutoff: datetime, after_id: int, limit: int) -> List[Row]:
+        """Active credits whose next payment date is at or before `cutoff`, by id.
+
+        Rows are (id, user_id, next_payment_date, monthly_payment, term_months, remaining_amount, installments),
+        installments being the number of payments already created for the credit.
+        """
+        installments = (
+            select(func.count(Payment.id))
+            .where(Payment.credit_id == Credit.id)
+            .correlate(Credit)
+            .scalar_subquery()
+        )
+        return self.db.execute(
+            select(
+                Credit.id,
+                Credit.user_id,
+                Credit.next_payment_date,
+                Credit.monthly_payment,
+                Credit.term_months,
+                Credit.remaining_amount,
+                installments.label("installments")
+            )
+            .where(
+                Credit.status == CreditStatus.ACTIVE,
+                Credit.next_payment_date <= cutoff,
+                Credit.id > after_id
+            )
+            .order_by(Credit.id)
+            .limit(limit)
+        ).all()
+
+    def roll_over(self, next_payment_dates: List[dict], payments: List[dict]) -> None:
+        """executemany: move each credit's next_payment_date and insert its due installments"""
+        if next_payment_dates:
+            self.db.execute(update(Credit), next_payment_dates)
+        if payments:
+            self.db.execute(insert(Payment), payments)
+        self.db.commit()
+
     def delete(self, credit_id: int) -> bool:
         db_credit = self.get_by_id(credit_id)
         if db_credit:
             self.db.delete(db_credit)
             self.db.commit()
             return True
-        return False
\ No newline at end of file
+        return False
+
+
+class AsyncCreditRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, credit_data: CreditCreate) -> Credit:
+        try:
+            db_credit = Credit(**CreditRepository._prepare(credit_data))
+            self.db.add(db_credit)
+            await self.db.commit()
+            await self.db.refresh(db_credit)
+            return db_credit
+        except Exception as e:
+            await self.db.rollback()
+            raise Exception(f"Error creating credit: {str(e)}")
+
+    async def get_by_id(self, credit_id: int) -> Optional[Credit]:
+        return await self.db.get(Credit, credit_id)
+
+    async def get_by_user_id(self, user_id: int) -> List[Credit]:
+        result = await self.db.execute(select(Credit).where(Credit.user_id == user_id))
+        return list(result.scalars().all())
+
+    async def update(self, credit_id: int, credit_data: CreditUpdate) -> Optional[Credit]:
+        db_credit = await self.get_by_id(credit_id)
+        if db_credit:
+            for key, value in credit_data.model_dump(exclude_unset=True).items():
+                setattr(db_credit, key, value)
+            await self.db.commit()
+            await self.db.refresh(db_credit)
+        return db_credit
+
+    async def delete(self, credit_id: int) -> bool:
+        db_credit = await self.get_by_id(credit_id)
+        if db_credit:
+            await self.db.delete(db_credit)
+            await self.db.commit()
+            return True
+        return False
@@ -0,0 +1,107 @@
+from datetime import datetime, timedelta
+from typing import Optional
+from sqlalchemy import delete, or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.infrastructure.models.idempotency_key import IdempotencyKey
+
+class IdempotencyRepository:
+    """Each method but mark_committed commits: a claim has to be visible to concurrent requests
+    before the work starts.
+
+    A claim is identified by its record id and created_at, which take_over resets, so a request
+    whose claim was taken over can no longer touch it.
+    """
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, user_id: int, key: str) -> Optional[IdempotencyKey]:
+        return self.db.scalars(
+            select(IdempotencyKey)
+            .where(IdempotencyKey.user_id == user_id, IdempotencyKey.key == key)
+            .execution_options(populate_existing=True)
+        ).first()
+
+    def insert(self, user_id: int, key: str, request_hash: str, now: datetime, lock_seconds: float,
+               ttl_seconds: float) -> Optional[IdempotencyKey]:
+        """New running claim, or None when the key is already taken"""
+        record = IdempotencyKey(
+            user_id=user_id,
+            key=key,
+            request_hash=request_hash,
+            created_at=now,
+            locked_until=now + timedelta(seconds=lock_seconds),
+            expires_at=now + timedelta(seconds=ttl_seconds)
+        )
+        try:
+            self.db.add(record)
+            self.db.commit()
+        except IntegrityError:
+            self.db.rollback()
+            return None
+        return record
+
+    def take_over(self, record_id: int, request_hash: str, now: datetime, lock_seconds: float,
+                  ttl_seconds: float) -> bool:
+        """Restart an expired key, or a running claim whose lock lapsed; False if someone else did first"""
+        result = self.db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                or_(
+                    IdempotencyKey.expires_at <= now,
+                    IdempotencyKey.status_code.is_(None) & (IdempotencyKey.locked_until <= now)
+                )
+            )
+            .values(
+                request_hash=request_hash,
+                status_code=None,
+                response_body=None,
+                created_at=now,
+                locked_until=now + timedelta(seconds=lock_seconds),
+                expires_at=now + timedelta(seconds=ttl_seconds)
+            )
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def mark_committed(self, record_id: int, claimed_at: datetime, status_code: int) -> bool:
+        """Stage status_code in the caller's transaction; False if the claim is no longer ours"""
+        result = self.db.execute(
+            update(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                IdempotencyKey.created_at == claimed_at,
+                IdempotencyKey.response_body.is_(None)
+            )
+            .values(status_code=status_code)
+        )
+        return result.rowcount == 1
+
+    def complete(self, record_id: int, claimed_at: datetime, status_code: int, response_body: str) -> None:
+        self.db.execute(
+            update(IdempotencyKey)
+            .where(IdempotencyKey.id == record_id, IdempotencyKey.created_at == claimed_at)
+            .values(status_code=status_code, response_body=response_body)
+        )
+        self.db.commit()
+
+    def release(self, record_id: int, claimed_at: datetime) -> None:
+        """Delete a claim whose request changed nothing"""
+        self.db.execute(
+            delete(IdempotencyKey)
+            .where(
+                IdempotencyKey.id == record_id,
+                IdempotencyKey.created_at == claimed_at,
+                IdempotencyKey.status_code.is_(None)
+            )
+        )
+        self.db.commit()
+
+    def purge_expired(self, now: datetime, limit: int) -> int:
+        """Delete up to `limit` expired keys; returns how many went"""
+        chunk = select(IdempotencyKey.id).where(IdempotencyKey.expires_at <= now).limit(limit).scalar_subquery()
+        result = self.db.execute(delete(IdempotencyKey).where(IdempotencyKey.id.in_(chunk)))
+        self.db.commit()
+        return result.rowcount
@@ -0,0 +1,56 @@
+from datetime import datetime, timedelta
+from typing import List, Optional
+from sqlalchemy import or_, select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import Session
+from src.infrastructure.models.job_lease import JobLease
+
+class JobLeaseRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get(self, name: str) -> Optional[JobLease]:
+        return self.db.get(JobLease, name)
+
+    def get_all(self) -> List[JobLease]:
+        return list(self.db.scalars(select(JobLease).order_by(JobLease.name)))
+
+    def ensure(self, name: str) -> JobLease:
+        lease = self.get(name)
+        if lease is None:
+            try:
+                self.db.add(JobLease(name=name))
+                self.db.commit()
+            except IntegrityError:
+                # Another replica created it first
+                self.db.rollback()
+            lease = self.get(name)
+        return lease
+
+    def acquire(self, name: str, owner: str, now: datetime, interval_seconds: float, lease_seconds: float) -> bool:
+        """Take the lease if the job is due and nobody else holds an unexpired lease on it"""
+        result = self.db.execute(
+            update(JobLease)
+            .where(
+                JobLease.name == name,
+                or_(JobLease.owner.is_(None), JobLease.owner == owner, JobLease.expires_at < now),
+                or_(JobLease.last_run_at.is_(None), JobLease.last_run_at <= now - timedelta(seconds=interval_seconds))
+            )
+            .values(owner=owner, expires_at=now + timedelta(seconds=lease_seconds))
+        )
+        self.db.commit()
+        return result.rowcount == 1
+
+    def release(self, name: str, owner: str, started_at: datetime, duration_seconds: float, rows: Optional[int]) -> None:
+        self.db.execute(
+            update(JobLease)
+            .where(JobLease.name == name, JobLease.owner == owner)
+            .values(
+                owner=None,
+                expires_at=None,
+                last_run_at=started_at,
+                last_duration_seconds=duration_seconds,
+                last_rows=rows
+            )
+        )
+        self.db.commit()
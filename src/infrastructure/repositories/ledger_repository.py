@@ -0,0 +1,156 @@
+from datetime import date, datetime
+from decimal import Decimal
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from sqlalchemy import Row, exists, func, insert, select, tuple_
+from sqlalchemy.orm import Session, aliased
+
+from src.infrastructure.models.account import Account
+from src.infrastructure.models.balance_snapshot import BalanceSnapshot
+from src.infrastructure.models.ledger_posting import LedgerPosting
+from src.infrastructure.models.transaction import Transaction
+
+def movement(amount: Decimal, from_account_id: Optional[int], to_account_id: Optional[int]) -> List[Tuple[Optional[int], Decimal]]:
+    """(account_id, signed amount) of both postings of a movement; None is outside the bank"""
+    return [(from_account_id, -amount), (to_account_id, amount)]
+
+class LedgerRepository:
+    def __init__(self, db: Session):
+        self.db = db
+
+    def post(self,
+             transaction: Transaction,
+             amount: Decimal,
+             from_account_id: Optional[int],
+             to_account_id: Optional[int],
+             posted_at: Optional[datetime] = None) -> None:
+        """Stage both postings of `transaction` in the current unit of work without committing"""
+        posted_at = posted_at or datetime.utcnow()
+        self.db.add_all([
+            LedgerPosting(transaction=transaction, account_id=account_id, amount=signed, posted_at=posted_at)
+            for account_id, signed in movement(amount, from_account_id, to_account_id)
+        ])
+
+    def add_many(self, rows: List[dict]) -> None:
+        """Insert postings with one multi-row INSERT; the caller commits"""
+        if rows:
+            self.db.execute(insert(LedgerPosting).execution_options(render_nulls=True), rows)
+
+    def get_account_postings_page(self,
+                                  account_id: int,
+                                  limit: int,
+                                  before: Optional[Tuple[datetime, int]] = None) -> List[LedgerPosting]:
+        """Up to limit postings of the account newest first, strictly older than `before`"""
+        query = select(LedgerPosting).where(LedgerPosting.account_id == account_id)
+        if before is not None:
+            query = query.where(tuple_(LedgerPosting.posted_at, LedgerPosting.id) < before)
+        query = query.order_by(LedgerPosting.posted_at.desc(), LedgerPosting.id.desc()).limit(limit)
+        return list(self.db.scalars(query).all())
+
+    def get_balances_after(self, account_id: int, limit: int) -> List[Row]:
+        """(id, cached balance, sum of postings) of up to limit accounts with id > account_id"""
+        posted = (
+            select(func.coalesce(func.sum(LedgerPosting.amount), 0))
+            .where(LedgerPosting.account_id == Account.id)
+            .correlate(Account)
+            .scalar_subquery()
+        )
+        query = (
+            select(Account.id, Account.balance, posted.label("posted"))
+            .where(Account.id > account_id)
+            .order_by(Account.id)
+            .limit(limit)
+        )
+        return list(self.db.execute(query).all())
+
+    def iter_account_postings(self,
+                              account_id: int,
+                              since: datetime,
+                              until: datetime,
+                              batch_size: int = 1000) -> Iterator[Row]:
+        """Postings of the account in [since, until) oldest first, with their transaction's details.
+
+        One range of ix_ledger_postings_account_posted, fetched batch_size rows at a time.
+        """
+        query = (
+            select(
+                LedgerPosting.id,
+                LedgerPosting.posted_at,
+                LedgerPosting.amount,
+                Transaction.transaction_type,
+                Transaction.reference_number,
+                Transaction.description
+            )
+            .outerjoin(Transaction, LedgerPosting.transaction_id == Transaction.id)
+            .where(
+                LedgerPosting.account_id == account_id,
+                LedgerPosting.posted_at >= since,
+                LedgerPosting.posted_at < until
+            )
+            .order_by(LedgerPosting.posted_at, LedgerPosting.id)
+        )
+        yield from self.db.execute(query.execution_options(yield_per=batch_size))
+
+    def sum_account_postings(self, account_id: int, since: Optional[datetime], until: datetime) -> Decimal:
+        """Net of the account's postings in [since, until); since None means from the start"""
+        query = select(func.coalesce(func.sum(LedgerPosting.amount), 0)).where(
+            LedgerPosting.account_id == account_id,
+            LedgerPosting.posted_at < until
+        )
+        if since is not None:
+            query = query.where(LedgerPosting.posted_at >= since)
+        return self.db.scalar(query)
+
+    def get_snapshot_before(self, account_id: int, day: date) -> Optional[BalanceSnapshot]:
+        """The account's latest snapshot of a day before `day`"""
+        return self.db.scalars(
+            select(BalanceSnapshot)
+            .where(BalanceSnapshot.account_id == account_id, BalanceSnapshot.day < day)
+            .order_by(BalanceSnapshot.day.desc())
+            .limit(1)
+        ).first()
+
+    def get_snapshot_balances_before(self, account_ids: Iterable[int], day: date) -> Dict[int, Decimal]:
+        """Latest snapshot balance before `day` of each account that has one"""
+        earlier = aliased(BalanceSnapshot)
+        latest = (
+            select(func.max(earlier.day))
+            .where(earlier.account_id == BalanceSnapshot.account_id, earlier.day < day)
+            .scalar_subquery()
+        )
+        rows = self.db.execute(
+            select(BalanceSnapshot.account_id, BalanceSnapshot.balance)
+            .where(BalanceSnapshot.account_id.in_(list(account_ids)), BalanceSnapshot.day == latest)
+        ).all()
+        return {account_id: balance for account_id, balance in rows}
+
+    def get_last_snapshot_day(self) -> Optional[date]:
+        return self.db.scalar(select(func.max(BalanceSnapshot.day)))
+
+    def get_first_posting_time(self) -> Optional[datetime]:
+        return self.db.scalar(select(func.min(LedgerPosting.posted_at)))
+
+    def get_unsnapshotted_day_totals(self, day: date, start: datetime, end: datetime, after_account_id: int,
+                                     limit: int) -> List[Row]:
+        """(account_id, net) of up to limit accounts with postings in [start, end) and no snapshot of `day` yet"""
+        snapshotted = exists().where(BalanceSnapshot.account_id == LedgerPosting.account_id, BalanceSnapshot.day == day)
+        return self.db.execute(
+            select(LedgerPosting.account_id, func.sum(LedgerPosting.amount).label("net"))
+            .where(
+                LedgerPosting.posted_at >= start,
+                LedgerPosting.posted_at < end,
+                LedgerPosting.account_id > after_account_id,
+                ~snapshotted
+            )
+            .group_by(LedgerPosting.account_id)
+            .order_by(LedgerPosting.account_id)
+            .limit(limit)
+        ).all()
+
+    def add_snapshots(self, rows: List[dict]) -> None:
+        if rows:
+            self.db.execute(insert(BalanceSnapshot), rows)
+        self.db.commit()
+
+    def get_ledger_total(self) -> Decimal:
+        """Sum of every posting; anything but zero means a movement was posted on one side only"""
+        return self.db.scalar(select(func.coalesce(func.sum(LedgerPosting.amount), 0)))
@@ -1,4 +1,7 @@
-from typing import List, Optional
+from datetime import datetime
+from typing import List, Optional, Tuple
+from sqlalchemy import insert, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from src.infrastructure.models.notification import Notification, NotificationType
 
@@ -13,6 +16,24 @@ class NotificationRepository:
         self.db.refresh(notification)
         return notification
 
+    def bulk_create(self, rows: List[dict]) -> None:
+        """executemany INSERT; the caller commits"""
+        if rows:
+            self.db.execute(insert(Notification), rows)
+
+    def get_pending_email_ids(self, max_attempts: int, limit: Optional[int] = None) -> List[int]:
+        """Notifications whose email is still owed, oldest first"""
+        return list(self.db.scalars(
+            select(Notification.id)
+            .where(
+                Notification.email_sent == False,
+                Notification.email_to.isnot(None),
+                Notification.email_attempts < max_attempts
+            )
+            .order_by(Notification.id)
+            .limit(limit)
+        ))
+
     def get_user_notifications(
         self,
         user_id: int,
@@ -45,7 +66,110 @@ class NotificationRepository:
         return notification
 
     def mark_all_as_read(self, user_id: int) -> int:
-        return self.db.query(Notification).filter(
+        updated = self.db.query(Notification).filter(
             Notification.user_id == user_id,
             Notification.read == False
-        ).update({"read": True})
\ No newline at end of file
+        ).update({"read": True})
+        self.db.commit()
+        return updated
+
+
+class AsyncNotificationRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, **kwargs) -> Notification:
+        notification = Notification(**kwargs)
+        self.db.add(notification)
+        await self.db.commit()
+        await self.db.refresh(notification)
+        return notification
+
+    async def get_user_notifications(
+        self,
+        user_id: int,
+        skip: int = 0,
+        limit: int = 100,
+        unread_only: bool = False,
+        notification_type: Optional[NotificationType] = None
+    ) -> List[Notification]:
+        query = select(Notification).where(Notification.user_id == user_id)
+
+        if unread_only:
+            query = query.where(Notification.read == False)
+
+        if notification_type:
+            query = query.where(Notification.type == notification_type)
+
+        result = await self.db.execute(
+            query.order_by(Notification.created_at.desc()).offset(skip).limit(limit)
+        )
+        return list(result.scalars().all())
+
+    async def mark_as_read(self, notification_id: int, user_id: int) -> Notification:
+        result = await self.db.execute(
+            select(Notification).where(
+                Notification.id == notification_id,
+                Notification.user_id == user_id
+            )
+        )
+        notification = result.scalars().first()
+
+        if notification:
+            notification.read = True
+            await self.db.commit()
+            await self.db.refresh(notification)
+
+        return notification
+
+    async def mark_all_as_read(self, user_id: int) -> int:
+        result = await self.db.execute(
+            update(Notification)
+            .where(Notification.user_id == user_id, Notification.read == False)
+            .values(read=True)
+        )
+        await self.db.commit()
+        return result.rowcount
+
+    async def get_pending_email_ids(self, max_attempts: int) -> List[int]:
+        """Notifications whose email is still owed, oldest first"""
+        result = await self.db.execute(
+            select(Notification.id)
+            .where(
+                Notification.email_sent == False,
+                Notification.email_to.isnot(None),
+                Notification.email_attempts < max_attempts
+            )
+            .order_by(Notification.id)
+        )
+        return list(result.scalars().all())
+
+    async def get_by_ids(self, notification_ids: List[int]) -> List[Notification]:
+        result = await self.db.execute(select(Notification).where(Notification.id.in_(notification_ids)))
+        return list(result.scalars().all())
+
+    async def claim_email_attempts(self, claims: List[Tuple[int, int]]) -> List[int]:
+        """Count a delivery attempt per (id, attempts seen), skipping rows another worker already claimed"""
+        claimed = []
+        for notification_id, attempts in claims:
+            result = await self.db.execute(
+                update(Notification)
+                .where(
+                    Notification.id == notification_id,
+                    Notification.email_sent == False,
+                    Notification.email_attempts == attempts
+                )
+                .values(email_attempts=attempts + 1)
+            )
+            if result.rowcount == 1:
+                claimed.append(notification_id)
+        await self.db.commit()
+        return claimed
+
+    async def mark_emails_sent(self, notification_ids: List[int]) -> None:
+        await self.db.execute(
+            update(Notification)
+            .where(Notification.id.in_(notification_ids))
+            .values(email_sent=True, sent_at=datetime.utcnow())
+        )
+        await self.db.commit()
@@ -1,7 +1,11 @@
 from datetime import datetime
 from typing import List, Optional
-from sqlalchemy.orm import Session
+from sqlalchemy import Row, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, selectinload
 from src.infrastructure.models.payment import Payment, PaymentStatus
+from src.infrastructure.models.credit import Credit
+from src.infrastructure.models.user import User
 from src.infrastructure.models.notification import Notification, NotificationType, NotificationPriority
 
 class PaymentRepository:
@@ -14,8 +18,8 @@ class PaymentRepository:
         self.db.refresh(payment)
         return payment
 
-    def get_by_id(self, payment_id: int) -> Optional[Payment]:
-        return self.db.query(Payment).filter(Payment.id == payment_id).first()
+    def get_by_id(self, payment_id: int, *options) -> Optional[Payment]:
+        return self.db.query(Payment).options(*options).filter(Payment.id == payment_id).first()
 
     def get_by_credit_id(self, credit_id: int) -> List[Payment]:
         return self.db.query(Payment).filter(Payment.credit_id == credit_id).all()
@@ -26,6 +30,31 @@ class PaymentRepository:
             .filter(Payment.payment_date < datetime.utcnow())\
             .all()
 
+    def mark_overdue_chunk(self, now: datetime, limit: int) -> List[Row]:
+        """Flip up to `limit` past-due pending payments to OVERDUE in one UPDATE; returns (id, credit_id, amount)"""
+        chunk = (
+            select(Payment.id)
+            .where(Payment.status == PaymentStatus.PENDING, Payment.payment_date < now)
+            .limit(limit)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        result = self.db.execute(
+            update(Payment)
+            .where(Payment.id.in_(chunk))
+            .values(status=PaymentStatus.OVERDUE, updated_at=now)
+            .returning(Payment.id, Payment.credit_id, Payment.amount)
+        )
+        return list(result.all())
+
+    def get_credit_owners(self, credit_ids: List[int]) -> List[Row]:
+        """(credit_id, user_id, email) for each credit"""
+        return self.db.execute(
+            select(Credit.id, Credit.user_id, User.email)
+            .join(User, User.id == Credit.user_id)
+            .where(Credit.id.in_(credit_ids))
+        ).all()
+
     def update(self, payment: Payment) -> Payment:
         self.db.commit()
         self.db.refresh(payment)
@@ -47,7 +76,7 @@ class PaymentRepository:
         payment.status = PaymentStatus.OVERDUE
         
         notification = Notification(
-            user_id=payment.credit.account.user_id,
+            user_id=payment.credit.user_id,
             type=NotificationType.CREDIT_PAYMENT,
             priority=NotificationPriority.HIGH,
             title="Payment Overdue",
@@ -56,3 +85,65 @@ class PaymentRepository:
         self.db.add(notification)
         
         return self.update(payment)
+
+
+class AsyncPaymentRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def create(self, payment: Payment) -> Payment:
+        self.db.add(payment)
+        await self.db.commit()
+        await self.db.refresh(payment)
+        return payment
+
+    async def get_by_id(self, payment_id: int) -> Optional[Payment]:
+        return await self.db.get(Payment, payment_id)
+
+    async def get_by_credit_id(self, credit_id: int) -> List[Payment]:
+        result = await self.db.execute(select(Payment).where(Payment.credit_id == credit_id))
+        return list(result.scalars().all())
+
+    async def get_overdue_payments(self) -> List[Payment]:
+        result = await self.db.execute(
+            select(Payment)
+            .where(Payment.status == PaymentStatus.PENDING)
+            .where(Payment.payment_date < datetime.utcnow())
+        )
+        return list(result.scalars().all())
+
+    async def update(self, payment: Payment) -> Payment:
+        await self.db.commit()
+        await self.db.refresh(payment)
+        return payment
+
+    async def mark_as_completed(self, payment: Payment) -> Payment:
+        payment.status = PaymentStatus.COMPLETED
+        return await self.update(payment)
+
+    async def mark_as_failed(self, payment: Payment) -> Payment:
+        payment.status = PaymentStatus.FAILED
+        return await self.update(payment)
+
+    async def mark_as_reversed(self, payment: Payment) -> Payment:
+        payment.status = PaymentStatus.REVERSED
+        return await self.update(payment)
+
+    async def mark_as_overdue(self, payment: Payment) -> Payment:
+        # relationships cannot lazy-load under asyncio, so fetch the credit explicitly
+        result = await self.db.execute(
+            select(Payment).options(selectinload(Payment.credit)).where(Payment.id == payment.id)
+        )
+        payment = result.scalars().one()
+        payment.status = PaymentStatus.OVERDUE
+
+        notification = Notification(
+            user_id=payment.credit.user_id,
+            type=NotificationType.CREDIT_PAYMENT,
+            priority=NotificationPriority.HIGH,
+            title="Payment Overdue",
+            content=f"Your credit payment of ${payment.amount} is overdue."
+        )
+        self.db.add(notification)
+
+        return await self.update(payment)
@@ -1,17 +1,82 @@
 from decimal import Decimal
-from typing import List, Optional
+from typing import Iterator, List, Optional, Tuple
 from datetime import datetime
-from sqlalchemy.orm import Session
+from sqlalchemy import ColumnElement, Row, Subquery, insert, select, tuple_, union_all
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, aliased
 from sqlalchemy.exc import IntegrityError
 from fastapi import HTTPException
 
 from src.infrastructure.models.transaction import Transaction, TransactionStatus, TransactionType
 from src.infrastructure.models.account import Account, AccountStatus
 
+def account_history(account_id: int,
+                    *criteria: ColumnElement[bool],
+                    ascending: bool = False,
+                    limit: Optional[int] = None) -> Subquery:
+    """Transactions sent from or received by an account, as a UNION ALL of two index ranges.
+
+    An OR across account_id and destination_account_id cannot use either index; each branch
+    here reads ix_transactions_account_created / ix_transactions_destination_created in key
+    order and stops after `limit` rows. Callers re-apply the ordering on the result.
+    """
+    if ascending:
+        order = (Transaction.created_at, Transaction.id)
+    else:
+        order = (Transaction.created_at.desc(), Transaction.id.desc())
+    sides = (
+        Transaction.account_id == account_id,
+        # Transfers between the same account are already in the first branch
+        (Transaction.destination_account_id == account_id) & (Transaction.account_id != account_id),
+    )
+    branches = []
+    for side in sides:
+        branch = select(*Transaction.__table__.columns).where(side, *criteria).order_by(*order)
+        if limit is not None:
+            branch = branch.limit(limit)
+        # Wrapped so ORDER BY/LIMIT stay inside the branch on every dialect (SQLite included)
+        branches.append(select(branch.subquery()))
+    return union_all(*branches).subquery("account_history")
+
 class TransactionRepository:
     def __init__(self, db: Session):
         self.db = db
 
+    def add(self,
+            account_id: int,
+            transaction_type: TransactionType,
+            amount: Decimal,
+            reference_number: str,
+            destination_account_id: Optional[int] = None,
+            description: Optional[str] = None,
+            status: TransactionStatus = TransactionStatus.PENDING) -> Transaction:
+        """Stage a transaction in the current unit of work without committing"""
+        transaction = Transaction(
+            account_id=account_id,
+            transaction_type=transaction_type,
+            status=status,
+            amount=amount,
+            reference_number=reference_number,
+            destination_account_id=destination_account_id,
+            description=description
+        )
+        self.db.add(transaction)
+        return transaction
+
+    def add_many(self, rows: List[dict]) -> List[Transaction]:
+        """Insert transactions with one multi-row INSERT ... RETURNING; the caller commits.
+
+        The rows come back in no particular order (asking for parameter order makes SQLAlchemy fall
+        back to one INSERT per row on SQLite); match them up by reference_number.
+        """
+        statement = (
+            insert(Transaction)
+            .returning(Transaction)
+            # Send NULLs instead of dropping the key, so every row shares one statement
+            .execution_options(render_nulls=True)
+        )
+        return list(self.db.scalars(statement, rows).all())
+
     def create(self, 
                account_id: int, 
                transaction_type: TransactionType,
@@ -20,7 +85,7 @@ class TransactionRepository:
                destination_account_id: Optional[int] = None,
                description: Optional[str] = None) -> Transaction:
         try:
-            transaction = Transaction(
+            transaction = self.add(
                 account_id=account_id,
                 transaction_type=transaction_type,
                 amount=amount,
@@ -28,7 +93,6 @@ class TransactionRepository:
                 destination_account_id=destination_account_id,
                 description=description
             )
-            self.db.add(transaction)
             self.db.commit()
             self.db.refresh(transaction)
             return transaction
@@ -43,10 +107,37 @@ class TransactionRepository:
         return self.db.query(Transaction).filter(Transaction.reference_number == reference_number).first()
 
     def get_account_transactions(self, account_id: int) -> List[Transaction]:
-        return self.db.query(Transaction).filter(
-            (Transaction.account_id == account_id) | 
-            (Transaction.destination_account_id == account_id)
-        ).order_by(Transaction.created_at.desc()).all()
+        history = aliased(Transaction, account_history(account_id))
+        query = select(history).order_by(history.created_at.desc(), history.id.desc())
+        return list(self.db.execute(query).scalars().all())
+
+    def get_account_transactions_page(self,
+                                      account_id: int,
+                                      limit: int,
+                                      before: Optional[Tuple[datetime, int]] = None,
+                                      after: Optional[Tuple[datetime, int]] = None) -> List[Transaction]:
+        """Up to limit transactions newest first, strictly older than `before` or newer than `after`.
+
+        Keyset on (created_at, id): the cost of a page does not grow with its depth.
+        """
+        key = tuple_(Transaction.created_at, Transaction.id)
+        if after is not None:
+            history = aliased(Transaction, account_history(account_id, key > tuple_(*after), ascending=True, limit=limit))
+            query = select(history).order_by(history.created_at, history.id).limit(limit)
+            return list(reversed(self.db.execute(query).scalars().all()))
+        criteria = [key < tuple_(*before)] if before is not None else []
+        history = aliased(Transaction, account_history(account_id, *criteria, limit=limit))
+        query = select(history).order_by(history.created_at.desc(), history.id.desc()).limit(limit)
+        return list(self.db.execute(query).scalars().all())
+
+    def iter_account_transactions(self, account_id: int, batch_size: int = 1000) -> Iterator[Row]:
+        """Stream every transaction newest first as plain rows, skipping ORM identity tracking.
+
+        yield_per fetches through a server-side cursor where the driver supports one.
+        """
+        history = account_history(account_id)
+        query = select(*history.c).order_by(history.c.created_at.desc(), history.c.id.desc())
+        yield from self.db.execute(query.execution_options(yield_per=batch_size))
 
     def update_status(self, transaction_id: int, status: TransactionStatus) -> Transaction:
         transaction = self.get_by_id(transaction_id)
@@ -56,4 +147,73 @@ class TransactionRepository:
             self.db.commit()
             self.db.refresh(transaction)
             return transaction
-        raise HTTPException(status_code=404, detail="Transaction not found")
\ No newline at end of file
+        raise HTTPException(status_code=404, detail="Transaction not found")
+
+class AsyncTransactionRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    def add(self,
+            account_id: int,
+            transaction_type: TransactionType,
+            amount: Decimal,
+            reference_number: str,
+            destination_account_id: Optional[int] = None,
+            description: Optional[str] = None,
+            status: TransactionStatus = TransactionStatus.PENDING) -> Transaction:
+        transaction = Transaction(
+            account_id=account_id,
+            transaction_type=transaction_type,
+            status=status,
+            amount=amount,
+            reference_number=reference_number,
+            destination_account_id=destination_account_id,
+            description=description
+        )
+        self.db.add(transaction)
+        return transaction
+
+    async def create(self,
+                     account_id: int,
+                     transaction_type: TransactionType,
+                     amount: Decimal,
+                     reference_number: str,
+                     destination_account_id: Optional[int] = None,
+                     description: Optional[str] = None) -> Transaction:
+        try:
+            transaction = self.add(
+                account_id=account_id,
+                transaction_type=transaction_type,
+                amount=amount,
+                reference_number=reference_number,
+                destination_account_id=destination_account_id,
+                description=description
+            )
+            await self.db.commit()
+            await self.db.refresh(transaction)
+            return transaction
+        except IntegrityError:
+            await self.db.rollback()
+            raise HTTPException(status_code=400, detail="Transaction reference number already exists")
+
+    async def get_by_id(self, transaction_id: int) -> Optional[Transaction]:
+        return await self.db.get(Transaction, transaction_id)
+
+    async def get_by_reference(self, reference_number: str) -> Optional[Transaction]:
+        result = await self.db.execute(select(Transaction).where(Transaction.reference_number == reference_number))
+        return result.scalars().first()
+
+    async def get_account_transactions(self, account_id: int) -> List[Transaction]:
+        history = aliased(Transaction, account_history(account_id))
+        result = await self.db.execute(select(history).order_by(history.created_at.desc(), history.id.desc()))
+        return list(result.scalars().all())
+
+    async def update_status(self, transaction_id: int, status: TransactionStatus) -> Transaction:
+        transaction = await self.get_by_id(transaction_id)
+        if transaction:
+            transaction.status = status
+            transaction.updated_at = datetime.utcnow()
+            await self.db.commit()
+            await self.db.refresh(transaction)
+            return transaction
+        raise HTTPException(status_code=404, detail="Transaction not found")
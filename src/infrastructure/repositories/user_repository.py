@@ -1,8 +1,15 @@
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
 from typing import Optional, List
 from src.infrastructure.models.user import User
 from src.presentation.schemas.user_schemas import UserCreate, UserUpdate
-from src.infrastructure.security import get_password_hash
+from src.infrastructure.security import (
+    get_password_hash,
+    get_password_hash_async,
+    principal_cache,
+    submit_password_task,
+)
 
 class UserRepository:
     def __init__(self, db: Session):
@@ -18,7 +25,7 @@ class UserRepository:
         return self.db.query(User).offset(skip).limit(limit).all()
 
     def create(self, user_data: UserCreate) -> User:
-        hashed_password = get_password_hash(user_data.password)
+        hashed_password = submit_password_task(get_password_hash, user_data.password).result()
         db_user = User(
             email=user_data.email,
             hashed_password=hashed_password,
@@ -37,12 +44,13 @@ class UserRepository:
             
         update_data = user_data.dict(exclude_unset=True)
         if 'password' in update_data:
-            update_data['hashed_password'] = get_password_hash(update_data.pop('password'))
+            update_data['hashed_password'] = submit_password_task(get_password_hash, update_data.pop('password')).result()
 
         for field, value in update_data.items():
             setattr(db_user, field, value)
 
         self.db.commit()
+        principal_cache.invalidate(user_id)
         self.db.refresh(db_user)
         return db_user
 
@@ -53,4 +61,70 @@ class UserRepository:
         
         self.db.delete(db_user)
         self.db.commit()
-        return True
\ No newline at end of file
+        principal_cache.invalidate(user_id)
+        return True
+
+class AsyncUserRepository:
+    def __init__(self, db: AsyncSession):
+        self.db = db
+
+    async def get_by_id(self, user_id: int) -> Optional[User]:
+        return await self.db.get(User, user_id)
+
+    async def get_by_email(self, email: str) -> Optional[User]:
+        result = await self.db.execute(select(User).where(User.email == email))
+        return result.scalars().first()
+
+    async def get_all(self, skip: int = 0, limit: int = 100) -> List[User]:
+        result = await self.db.execute(select(User).offset(skip).limit(limit))
+        return list(result.scalars().all())
+
+    async def create(self, user_data: UserCreate) -> User:
+        hashed_password = await get_password_hash_async(user_data.password)
+        db_user = User(
+            email=user_data.email,
+            hashed_password=hashed_password,
+            first_name=user_data.first_name,
+            last_name=user_data.last_name
+        )
+        self.db.add(db_user)
+        await self.db.commit()
+        await self.db.refresh(db_user)
+        return db_user
+
+    async def update(self, user_id: int, user_data: UserUpdate) -> Optional[User]:
+        db_user = await self.get_by_id(user_id)
+        if not db_user:
+            return None
+
+        update_data = user_data.model_dump(exclude_unset=True)
+        if 'password' in update_data:
+            update_data['hashed_password'] = await get_password_hash_async(update_data.pop('password'))
+
+        for field, value in update_data.items():
+            setattr(db_user, field, value)
+
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
+        await self.db.refresh(db_user)
+        return db_user
+
+    async def replace_password_hash(self, user_id: int, old_hash: str, new_hash: str) -> bool:
+        """Swap the hash only if the password was not changed in the meantime"""
+        result = await self.db.execute(
+            update(User)
+            .where(User.id == user_id, User.hashed_password == old_hash)
+            .values(hashed_password=new_hash)
+        )
+        await self.db.commit()
+        return result.rowcount == 1
+
+    async def delete(self, user_id: int) -> bool:
+        db_user = await self.get_by_id(user_id)
+        if not db_user:
+            return False
+
+        await self.db.delete(db_user)
+        await self.db.commit()
+        principal_cache.invalidate(user_id)
+        return True
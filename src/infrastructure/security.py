@@ -1,9 +1,14 @@
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from dataclasses import dataclass
 from datetime import datetime, timedelta
 from enum import Enum
-from typing import Optional, Union
+from typing import Any, Callable, List, Optional, Union
 from fastapi import Depends, HTTPException, status
 from jose import JWTError, jwt
 from passlib.context import CryptContext
+from src.infrastructure.cache import Cache, load_backend
 from src.infrastructure.config.settings import settings
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
@@ -14,7 +19,29 @@ class TokenType(str, Enum):
     ACCESS = "access"
     REFRESH = "refresh"
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+# Bump when the principal claims carried in access tokens change; older tokens then
+# fall back to a database lookup until they expire
+PRINCIPAL_CLAIMS_VERSION = 1
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as described by the access token claims"""
+    id: int
+    email: str
+    role: UserRole
+    is_active: bool = True
+
+# Principals loaded from the users table, keyed by user id; UserRepository invalidates on change
+principal_cache = Cache(
+    "principal",
+    load_backend(settings.CACHE_BACKEND, settings.PRINCIPAL_CACHE_SIZE),
+    settings.PRINCIPAL_CACHE_TTL_SECONDS
+)
+
+def build_password_context(schemes: List[str], bcrypt_rounds: int) -> CryptContext:
+    return CryptContext(schemes=schemes, deprecated="auto", bcrypt__rounds=bcrypt_rounds)
+
+pwd_context = build_password_context(settings.PASSWORD_HASH_SCHEMES, settings.BCRYPT_ROUNDS)
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
@@ -23,6 +50,54 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 def get_password_hash(password: str) -> str:
     return pwd_context.hash(password)
 
+def password_needs_update(hashed_password: str) -> bool:
+    """True when the hash uses a deprecated scheme or a different bcrypt cost than configured"""
+    return pwd_context.needs_update(hashed_password)
+
+# bcrypt costs 100-300 ms of CPU per call; a dedicated, bounded pool keeps login bursts off
+# the event loop and out of the threadpool that serves the sync routes
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_tasks_lock = threading.Lock()
+_password_tasks_pending = 0
+
+def _release_password_slot() -> None:
+    global _password_tasks_pending
+    with _password_tasks_lock:
+        _password_tasks_pending -= 1
+
+def _run_password_task(function: Callable[..., Any], *args: Any) -> Any:
+    # Release the slot inside the worker, before the caller sees the result
+    try:
+        return function(*args)
+    finally:
+        _release_password_slot()
+
+def submit_password_task(function: Callable[..., Any], *args: Any) -> Future:
+    """Queue a hash/verify call, or fail fast with 429 once workers and queue are all taken"""
+    global _password_tasks_pending
+    with _password_tasks_lock:
+        if _password_tasks_pending >= settings.PASSWORD_HASH_WORKERS + settings.PASSWORD_HASH_QUEUE_SIZE:
+            raise HTTPException(
+                status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+                detail="Too many password operations in progress, please retry shortly",
+                headers={"Retry-After": "1"},
+            )
+        _password_tasks_pending += 1
+    try:
+        return _password_executor.submit(_run_password_task, function, *args)
+    except BaseException:
+        _release_password_slot()
+        raise
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    return await asyncio.wrap_future(submit_password_task(verify_password, plain_password, hashed_password))
+
+async def get_password_hash_async(password: str) -> str:
+    return await asyncio.wrap_future(submit_password_task(get_password_hash, password))
+
 def create_token(data: dict, token_type: TokenType, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     
@@ -44,9 +119,16 @@ def create_token(data: dict, token_type: TokenType, expires_delta: Optional[time
     encoded_jwt = jwt.encode(to_encode, settings.SECRET_KEY, algorithm="HS256")
     return encoded_jwt
 
-def create_tokens(user_id: int, role: UserRole, email: str) -> dict:
+def create_tokens(user_id: int, role: UserRole, email: str, is_active: bool = True) -> dict:
     access_token = create_token(
-        data={"sub": str(user_id), "role": role, "type": TokenType.ACCESS, "email": email},
+        data={
+            "sub": str(user_id),
+            "role": role,
+            "type": TokenType.ACCESS,
+            "email": email,
+            "active": is_active,
+            "ver": PRINCIPAL_CLAIMS_VERSION
+        },
         token_type=TokenType.ACCESS,
         expires_delta=timedelta(minutes=settings.ACCESS_TOKEN_EXPIRE_MINUTES)
     )
@@ -79,7 +161,8 @@ def verify_token(token: str, token_type: TokenType) -> dict:
             headers={"WWW-Authenticate": "Bearer"},
         )
 
-async def get_current_user(
+# Plain def: FastAPI runs it in the threadpool, keeping the blocking query off the event loop
+def get_current_user(
     token: str = Depends(oauth2_scheme),
     db: Session = Depends(get_db)
 ) -> User:
@@ -93,7 +176,46 @@ async def get_current_user(
         )
     return user
 
-def check_admin_role(user: User) -> User:
+def load_principal(db: Session, user_id: int) -> Principal:
+    """Current state of the user behind a token, served from principal_cache when fresh"""
+    principal = principal_cache.get(user_id)
+    if principal is None:
+        user = db.query(User).filter(User.id == user_id).first()
+        if user is None:
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="User not found",
+            )
+        principal = Principal(id=user.id, email=user.email, role=user.role, is_active=user.is_active)
+        principal_cache.set(user_id, principal)
+    return principal
+
+def get_current_principal(
+    token: str = Depends(oauth2_scheme),
+    db: Session = Depends(get_db)
+) -> Principal:
+    """Authenticate from the token claims; the users table is only read through principal_cache.
+
+    Routes that need the full User row should depend on get_current_user instead.
+    """
+    payload = verify_token(token, TokenType.ACCESS)
+    if payload.get("ver") == PRINCIPAL_CLAIMS_VERSION and not settings.AUTH_VERIFY_USER_STATE:
+        principal = Principal(
+            id=int(payload["sub"]),
+            email=payload["email"],
+            role=UserRole(payload["role"]),
+            is_active=payload["active"]
+        )
+    else:
+        principal = load_principal(db, int(payload["sub"]))
+    if not principal.is_active:
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Inactive user",
+        )
+    return principal
+
+def check_admin_role(user: Union[User, Principal]) -> Union[User, Principal]:
     if user.role != UserRole.ADMIN:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
@@ -104,7 +226,6 @@ def check_admin_role(user: User) -> User:
 def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)) -> dict:
     payload = verify_token(refresh_token, TokenType.REFRESH)
     user_id = payload.get("sub")
-    role = payload.get("role")
     
     user = db.query(User).filter(User.id == user_id).first()
     if not user:
@@ -113,4 +234,5 @@ def refresh_access_token(refresh_token: str, db: Session = Depends(get_db)) -> d
             detail="User not found"
         )
     
-    return create_tokens(user_id, role)
\ No newline at end of file
+    # Refresh re-reads the user, so role or activation changes reach the new access token
+    return create_tokens(user.id, user.role, user.email, user.is_active)
\ No newline at end of file
@@ -0,0 +1,36 @@
+"""Rendered statements of closed months, kept on disk so every API worker and the batch job share them"""
+import os
+import tempfile
+from typing import Iterable, Iterator, Optional
+
+from src.infrastructure.config.settings import settings
+
+class StatementStore:
+    def __init__(self, directory: str):
+        self.directory = directory
+
+    def path(self, account_id: int, month: str, statement_format: str) -> str:
+        return os.path.join(self.directory, month, f"account-{account_id}.{statement_format}")
+
+    def get(self, account_id: int, month: str, statement_format: str) -> Optional[str]:
+        """Path of the stored statement, or None when it has not been generated yet"""
+        path = self.path(account_id, month, statement_format)
+        return path if os.path.exists(path) else None
+
+    def save(self, account_id: int, month: str, statement_format: str, chunks: Iterable[bytes]) -> Iterator[bytes]:
+        """Pass chunks through while writing them; the file appears, atomically, only once complete"""
+        path = self.path(account_id, month, statement_format)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        handle, partial = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".part")
+        try:
+            with os.fdopen(handle, "wb") as file:
+                for chunk in chunks:
+                    file.write(chunk)
+                    yield chunk
+            os.replace(partial, path)
+        except BaseException:
+            # Includes GeneratorExit when the client disconnects mid-download
+            os.remove(partial)
+            raise
+
+statement_store = StatementStore(settings.STATEMENT_CACHE_DIR)
@@ -1,19 +1,25 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from datetime import datetime, timezone
+from typing import List, Literal, Optional
+from fastapi import APIRouter, Depends, HTTPException, Path, Request, Response, status
+from fastapi.responses import FileResponse, StreamingResponse
 from sqlalchemy.orm import Session
 from fastapi.security import OAuth2PasswordBearer
 
 from src.infrastructure.config.database import get_db
 from src.application.services.account_service import AccountService
+from src.application.services.ledger_service import LedgerService
+from src.application.services.statement_service import STATEMENT_MEDIA_TYPES, month_range, stream_statement
+from src.infrastructure.http_cache import account_etag, account_key, cached_not_modified, conditional
 from src.infrastructure.repositories.user_repository import UserRepository
-from src.infrastructure.security import check_admin_role, get_current_user
+from src.infrastructure.security import Principal, check_admin_role, get_current_principal
+from src.infrastructure.statement_store import statement_store
 from src.presentation.schemas.account_schemas import (
     AccountCreate,
     AccountResponse,
     AccountBalance,
 )
 from src.infrastructure.models.account import AccountStatus
-from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.user import UserRole
 
 router = APIRouter(tags=["accounts"])
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
@@ -21,7 +27,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 @router.post("/", response_model=AccountResponse, status_code=status.HTTP_201_CREATED)
 def create_account(
     account_data: AccountCreate,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     user_repo = UserRepository(db)
@@ -39,30 +45,44 @@ def create_account(
 @router.get("/{account_id}", response_model=AccountResponse)
 def get_account(
     account_id: int,
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
 
+    key = account_key(current_user.id, account_id)
+    cached = cached_not_modified(request, key)
+    if cached:
+        return cached
     account_service = AccountService(db)
-    return account_service.get_account(account_id, current_user.id)
+    account = account_service.get_account(account_id, current_user.id)
+    return conditional(request, response, key, account_etag(account)) or account
 
 @router.get("/", response_model=List[AccountResponse])
 def get_user_accounts(
-    current_user: User = Depends(get_current_user),
+    request: Request,
+    response: Response,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
+    key = account_key(current_user.id)
+    cached = cached_not_modified(request, key)
+    if cached:
+        return cached
     account_service = AccountService(db)
-    return account_service.get_user_accounts(current_user.id)
+    accounts = account_service.get_user_accounts(current_user.id)
+    return conditional(request, response, key, account_etag(*accounts)) or accounts
 
 @router.patch("/{account_id}/status", response_model=AccountResponse)
 def update_account_status(
     account_id: int,
     status: AccountStatus,
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     
@@ -70,24 +90,55 @@ def update_account_status(
         raise HTTPException(status_code=404, detail="User not found")
     check_admin_role(current_user)
     account_service = AccountService(db)
-    return account_service.update_account_status(account_id, current_user.id, status)
+    return account_service.update_account_status(account_id, status)
 
 @router.get("/{account_id}/balance", response_model=AccountBalance)
 def get_account_balance(
     account_id: int,
-    current_user: User = Depends(get_current_user),
+    at: Optional[datetime] = None,
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
+    """Current balance, or with `at` the balance from everything posted before that instant"""
     if not current_user:
         raise HTTPException(status_code=404, detail="User not found")
 
     account_service = AccountService(db)
     account = account_service.get_account(account_id, current_user.id)
-    return AccountBalance(balance=account.balance, currency=account.currency)
+    if at is None:
+        return AccountBalance(balance=account.balance, currency=account.currency)
+    if at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    return AccountBalance(balance=LedgerService(db).balance_at(account_id, at), currency=account.currency)
+
+@router.get("/{account_id}/statements/{month}")
+def get_account_statement(
+    account_id: int,
+    month: str = Path(..., pattern=r"^\d{4}-(0[1-9]|1[0-2])$"),
+    format: Literal["pdf", "csv"] = "pdf",
+    current_user: Principal = Depends(get_current_principal),
+    db: Session = Depends(get_db)
+):
+    """Monthly statement; closed months are served from the statement store once generated"""
+    account_service = AccountService(db)
+    account_service.get_account(account_id, current_user.id)
+    start, _ = month_range(month)
+    if start > datetime.utcnow():
+        raise HTTPException(status_code=404, detail="No statement for a future month")
+
+    headers = {"Content-Disposition": f'attachment; filename="account-{account_id}-{month}.{format}"'}
+    stored = statement_store.get(account_id, month, format)
+    if stored:
+        return FileResponse(stored, media_type=STATEMENT_MEDIA_TYPES[format], headers=headers)
+    return StreamingResponse(
+        stream_statement(account_id, month, format),
+        media_type=STATEMENT_MEDIA_TYPES[format],
+        headers=headers
+    )
 
 @router.get("/all", response_model=List[AccountResponse])
 def get_all_accounts(
-    current_user: User = Depends(get_current_user),
+    current_user: Principal = Depends(get_current_principal),
     db: Session = Depends(get_db)
 ):
     if not current_user:
@@ -1,10 +1,11 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
-from sqlalchemy.orm import Session
+from sqlalchemy.ext.asyncio import AsyncSession
 from src.infrastructure import security
-from src.infrastructure.config.database import get_db
-from src.infrastructure.repositories.user_repository import UserRepository
-from src.application.services.auth_service import AuthService
+from src.infrastructure.config.database import get_async_db
+from src.infrastructure.monitoring.metrics import LOGINS
+from src.infrastructure.repositories.user_repository import AsyncUserRepository
+from src.application.services.auth_service import AuthService, upgrade_password_hash
 from src.presentation.schemas.auth_schemas import Login, Token
 from src.presentation.schemas.user_schemas import User
 
@@ -13,12 +14,12 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    db: Session = Depends(get_db)
+    db: AsyncSession = Depends(get_async_db)
 ) -> User:
-    user_repository = UserRepository(db)
+    user_repository = AsyncUserRepository(db)
     auth_service = AuthService(user_repository)
     token_data = auth_service.verify_token(token)
-    user = user_repository.get_by_email(email=token_data.email)
+    user = await user_repository.get_by_email(email=token_data.email)
     if user is None:
         raise HTTPException(status_code=404, detail="User not found")
     return user
@@ -26,18 +27,24 @@ async def get_current_user(
 @router.post("/login", response_model=Token)
 async def login_for_access_token(
     login_data: Login,
-    db: Session = Depends(get_db)
+    background_tasks: BackgroundTasks,
+    db: AsyncSession = Depends(get_async_db)
 ):
-    user_repository = UserRepository(db)
+    user_repository = AsyncUserRepository(db)
     auth_service = AuthService(user_repository)
-    user = auth_service.authenticate_user(login_data.email, login_data.password)
+    user = await auth_service.authenticate_user(login_data.email, login_data.password)
     if not user:
+        LOGINS.labels("failed").inc()
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password",
             headers={"WWW-Authenticate": "Bearer"},
         )
-    tokens = security.create_tokens(user.id, user.role, user.email)
+    LOGINS.labels("succeeded").inc()
+    if auth_service.needs_password_upgrade(user):
+        # Runs after the response is sent, on its own session
+        background_tasks.add_task(upgrade_password_hash, user.id, login_data.password, user.hashed_password)
+    tokens = security.create_tokens(user.id, user.role, user.email, user.is_active)
     access_token = tokens["access_token"]
     refresh_token = tokens["refresh_token"]
     return {
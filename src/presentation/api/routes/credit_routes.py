@@ -1,15 +1,16 @@
 from typing import List
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Request, Response
 from fastapi.security import OAuth2PasswordBearer
 from sqlalchemy.orm import Session
 
 from src.application.services.auth_service import AuthService
 from src.infrastructure.config.database import get_db
 from src.application.services.credit_service import CreditService
+from src.infrastructure.http_cache import cached_not_modified, conditional, credit_etag, credit_key
 from src.infrastructure.models.credit import CreditStatus
-from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.user import UserRole
 from src.infrastructure.repositories.user_repository import UserRepository
-from src.infrastructure.security import check_admin_role, get_current_user
+from src.infrastructure.security import Principal, check_admin_role, get_current_principal
 from src.presentation.schemas.credit_schemas import CreditCreate, CreditResponse
 
 router = APIRouter(tags=["credits"])
@@ -19,7 +20,7 @@ oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 def create_credit(
     credit_data: CreditCreate,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     repo = UserRepository(db)
     check_admin_role(current_user)
@@ -37,26 +38,40 @@ def create_credit(
 @router.get("/{credit_id}", response_model=CreditResponse)
 def get_credit(
     credit_id: int,
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
+    key = credit_key(current_user.id, credit_id)
+    cached = cached_not_modified(request, key)
+    if cached:
+        return cached
     credit_service = CreditService(db)
-    return credit_service.get_credit(credit_id, current_user.id)
+    credit = credit_service.get_credit(credit_id, current_user.id)
+    return conditional(request, response, key, credit_etag(credit)) or credit
 
 @router.get("/", response_model=List[CreditResponse])
 def get_user_credits(
+    request: Request,
+    response: Response,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
+    key = credit_key(current_user.id)
+    cached = cached_not_modified(request, key)
+    if cached:
+        return cached
     credit_service = CreditService(db)
-    return credit_service.get_user_credits(current_user.id)
+    credits = credit_service.get_user_credits(current_user.id)
+    return conditional(request, response, key, credit_etag(*credits)) or credits
 
 @router.patch("/{credit_id}/status", response_model=CreditResponse)
 def update_credit_status(
     credit_id: int,
     status: CreditStatus,
     db: Session = Depends(get_db),
-    current_user: User = Depends(get_current_user)
+    current_user: Principal = Depends(get_current_principal)
 ):
     check_admin_role(current_user)
     credit_service = CreditService(db)
@@ -0,0 +1,24 @@
+import hmac
+from typing import Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Response, status
+
+from src.infrastructure.config.settings import settings
+from src.infrastructure.monitoring.metrics import PROMETHEUS_CONTENT_TYPE, render_metrics
+
+router = APIRouter(tags=["monitoring"])
+
+def check_scrape_token(authorization: Optional[str] = Header(None)) -> None:
+    """Business counters and volumes are not public: only a scraper holding METRICS_SCRAPE_TOKEN gets them"""
+    if not settings.METRICS_SCRAPE_TOKEN:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Metrics scraping is not configured")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not hmac.compare_digest(token.encode(), settings.METRICS_SCRAPE_TOKEN.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Invalid scrape token",
+            headers={"WWW-Authenticate": "Bearer"}
+        )
+
+@router.get("/metrics", include_in_schema=False, dependencies=[Depends(check_scrape_token)])
+def get_metrics():
+    return Response(render_metrics(), media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,44 @@
+from fastapi import APIRouter, Depends
+from sqlalchemy.orm import Session
+
+from src.application.jobs.scheduler import scheduler
+from src.application.services.email_delivery_service import email_worker
+from src.infrastructure.config.database import get_db
+from src.infrastructure.http_cache import resource_etags
+from src.infrastructure.repositories.job_lease_repository import JobLeaseRepository
+from src.infrastructure.monitoring.pool_metrics import POOL_METRICS
+from src.infrastructure.security import Principal, check_admin_role, get_current_principal, principal_cache
+
+router = APIRouter(tags=["monitoring"])
+
+@router.get("/pool")
+def get_pool_metrics(current_user: Principal = Depends(get_current_principal)):
+    check_admin_role(current_user)
+    return {name: metrics.snapshot() for name, metrics in POOL_METRICS.items()}
+
+
+@router.get("/cache")
+def get_cache_metrics(current_user: Principal = Depends(get_current_principal)):
+    check_admin_role(current_user)
+    return {cache.name: cache.stats() for cache in (principal_cache, resource_etags)}
+
+@router.get("/email")
+def get_email_metrics(current_user: Principal = Depends(get_current_principal)):
+    check_admin_role(current_user)
+    return email_worker.stats()
+
+@router.get("/jobs")
+def get_job_metrics(db: Session = Depends(get_db), current_user: Principal = Depends(get_current_principal)):
+    check_admin_role(current_user)
+    # Leases are shared by every replica; the counters only cover jobs this process ran
+    leases = {
+        lease.name: {
+            "owner": lease.owner,
+            "expires_at": lease.expires_at,
+            "last_run_at": lease.last_run_at,
+            "last_duration_seconds": lease.last_duration_seconds,
+            "last_rows": lease.last_rows,
+        }
+        for lease in JobLeaseRepository(db).get_all()
+    }
+    return {"leases": leases, **scheduler.stats()}
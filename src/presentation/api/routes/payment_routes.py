@@ -1,47 +1,40 @@
-from fastapi import APIRouter, Depends, HTTPException, status
+from decimal import Decimal
+from fastapi import APIRouter, Depends, Header, HTTPException, Request, status
 from sqlalchemy.orm import Session
-from typing import List
-from fastapi.security import OAuth2PasswordBearer
+from typing import List, Optional
 
+from src.application.services.idempotency_service import IdempotencyService, request_fingerprint
 from src.application.services.pyament_service import PaymentService
-from src.application.services.auth_service import AuthService
 from src.infrastructure.config.database import get_db
-from src.infrastructure.repositories.user_repository import UserRepository
+from src.infrastructure.security import Principal, get_current_principal
 from src.presentation.schemas.payment_schema import Payment, PaymentCreate, PaymentUpdate
-from src.infrastructure.models.user import User
 
 router = APIRouter(tags=["payments"])
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @router.post("/", response_model=Payment, status_code=status.HTTP_201_CREATED)
 def create_payment(
     payment: PaymentCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-    
     payment_service = PaymentService(db)
-    return payment_service.create_payment(payment)
+    return IdempotencyService(db).run(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint(request.method, request.url.path, payment),
+        lambda: payment_service.create_payment(payment.credit_id, Decimal(str(payment.amount)), payment.payment_date),
+        Payment,
+        status.HTTP_201_CREATED
+    )
 
 @router.get("/{payment_id}", response_model=Payment)
 def get_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     payment_service = PaymentService(db)
     payment = payment_service.get_payment(payment_id)
     if not payment:
@@ -55,15 +48,8 @@ def get_payment(
 def get_credit_payments(
     credit_id: int,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     payment_service = PaymentService(db)
     return payment_service.get_credit_payments(credit_id)
 
@@ -72,15 +58,8 @@ def update_payment(
     payment_id: int,
     payment_update: PaymentUpdate,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     payment_service = PaymentService(db)
     payment = payment_service.update_payment(payment_id, payment_update)
     if not payment:
@@ -94,15 +73,8 @@ def update_payment(
 def complete_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     payment_service = PaymentService(db)
     try:
         return payment_service.complete_payment(payment_id)
@@ -116,15 +88,8 @@ def complete_payment(
 def reverse_payment(
     payment_id: int,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    user = repo.get_by_email(email=token_data.email)
-    if not user:
-        raise HTTPException(status_code=404, detail="User not found")
-
     payment_service = PaymentService(db)
     try:
         return payment_service.reverse_payment(payment_id)
@@ -1,128 +1,235 @@
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Literal, Optional
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
+from starlette.background import BackgroundTask
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
-from fastapi.security import OAuth2PasswordBearer
 
+from src.application.services.idempotency_service import (
+    IdempotencyService,
+    request_fingerprint,
+    run_idempotent_async
+)
+from src.application.services.ledger_service import LedgerService
 from src.application.services.notification_service import NotificationService
-from src.infrastructure.config.database import get_db
-from src.application.services.transaction_service import TransactionService
+from src.infrastructure.config.database import get_async_db, get_db
+from src.application.services.transaction_service import (
+    EXPORT_MEDIA_TYPES,
+    TransactionService,
+    process_withdrawal_async,
+    spool_upload,
+    stream_batch_upload,
+    stream_transaction_export
+)
 from src.application.services.account_service import AccountService
-from src.application.services.auth_service import AuthService
 from src.infrastructure.models.notification import NotificationPriority, NotificationType
-from src.infrastructure.repositories.user_repository import UserRepository
+from src.infrastructure.security import Principal, get_current_principal
 from src.presentation.schemas.transaction_schemas import (
+    BatchCreate,
+    BatchResult,
     DepositCreate,
+    PostingPage,
     WithdrawalCreate, 
     TransferCreate,
+    TransactionPage,
     TransactionResponse
 )
 
 router = APIRouter()
-oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 @router.post("/{account_id}/deposit", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 def create_deposit(
     account_id: int,
     deposit_data: DepositCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    current_user = repo.get_by_email(email=token_data.email)
-    if not current_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    def deposit():
+        account_service = AccountService(db)
+        account = account_service.get_account(account_id, current_user.id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
 
-    account_service = AccountService(db)
-    account = account_service.get_account(account_id, current_user.id)
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    transaction_service = TransactionService(db)
-    return transaction_service.process_deposit(account_id, deposit_data)
+        transaction_service = TransactionService(db)
+        return transaction_service.process_deposit(account_id, deposit_data)
+
+    return IdempotencyService(db).run(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint(request.method, request.url.path, deposit_data),
+        deposit,
+        TransactionResponse,
+        status.HTTP_201_CREATED
+    )
 
 @router.post("/{account_id}/withdrawal", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 async def create_withdrawal(
     account_id: int,
     withdrawal_data: WithdrawalCreate,
-    db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    current_user = repo.get_by_email(email=token_data.email)
-    if not current_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    def check_owner(session: Session):
+        account_service = AccountService(session)
+        account = account_service.get_account(account_id, current_user.id)
+        if not account:
+            raise HTTPException(status_code=404, detail="Account not found")
 
-    account_service = AccountService(db)
-    account = account_service.get_account(account_id, current_user.id)
-    if not account:
-        raise HTTPException(status_code=404, detail="Account not found")
-    
-    transaction_service = TransactionService(db)
-    transaction = transaction_service.process_withdrawal(account_id, withdrawal_data)
-    notification_service = NotificationService(db)
-    await notification_service.create_and_send_notification(
-        user_id=current_user.id,
-        type=NotificationType.TRANSACTION,
-        title="Nueva transacción",
-        content=f"Se ha realizado un retiro de <strong>${withdrawal_data.amount:.2f}</strong> desde su cuenta.<br><br>Si no reconoce esta transacción, por favor contáctenos inmediatamente.",
-        priority=NotificationPriority.HIGH,
-        email=current_user.email
+    async def withdraw_and_notify():
+        # The sync services run inside the async session's greenlet, so their I/O goes through the async driver
+        await db.run_sync(check_owner)
+        transaction = await process_withdrawal_async(db, account_id, withdrawal_data)
+        notification_service = NotificationService(db)
+        await notification_service.create_and_send_notification(
+            user_id=current_user.id,
+            type=NotificationType.TRANSACTION,
+            title="Nueva transacción",
+            content=f"Se ha realizado un retiro de ${withdrawal_data.amount:.2f} desde su cuenta.",
+            priority=NotificationPriority.HIGH,
+            email=current_user.email
+        )
+        return transaction
+
+    return await run_idempotent_async(
+        db,
+        current_user.id,
+        idempotency_key,
+        request_fingerprint(request.method, request.url.path, withdrawal_data),
+        withdraw_and_notify,
+        TransactionResponse,
+        status.HTTP_201_CREATED
     )
-    return transaction
 
 @router.post("/{account_id}/transfer", response_model=TransactionResponse, status_code=status.HTTP_201_CREATED)
 def create_transfer(
     account_id: int,
     transfer_data: TransferCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    def transfer():
+        account_service = AccountService(db)
+        source_account = account_service.get_account(account_id, current_user.id)
+        if not source_account:
+            raise HTTPException(status_code=404, detail="Source account not found")
+
+        destination_account = account_service.get_account_by_number(transfer_data.destination_account_number)
+        if not destination_account:
+            raise HTTPException(status_code=404, detail="Destination account not found")
+
+        if source_account.currency != destination_account.currency:
+            raise HTTPException(
+                status_code=400,
+                detail="Cannot transfer between accounts with different currencies"
+            )
+
+        transaction_service = TransactionService(db)
+        return transaction_service.process_transfer(account_id, transfer_data)
+
+    return IdempotencyService(db).run(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint(request.method, request.url.path, transfer_data),
+        transfer,
+        TransactionResponse,
+        status.HTTP_201_CREATED
+    )
+
+@router.post("/{account_id}/batch", response_model=BatchResult)
+def create_batch(
+    account_id: int,
+    batch: BatchCreate,
+    request: Request,
+    idempotency_key: Optional[str] = Header(None, max_length=255),
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    current_user = repo.get_by_email(email=token_data.email)
-    if not current_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    def process():
+        account_service = AccountService(db)
+        account_service.get_account(account_id, current_user.id)
 
+        transaction_service = TransactionService(db)
+        return transaction_service.process_batch(account_id, batch)
+
+    return IdempotencyService(db).run(
+        current_user.id,
+        idempotency_key,
+        request_fingerprint(request.method, request.url.path, batch),
+        process,
+        BatchResult,
+        status.HTTP_200_OK
+    )
+
+@router.post("/{account_id}/batch/upload")
+async def upload_batch(
+    account_id: int,
+    request: Request,
+    format: Literal["ndjson", "csv"] = "csv",
+    db: AsyncSession = Depends(get_async_db),
+    current_user: Principal = Depends(get_current_principal)
+):
+    # Body: CSV with a transaction_type,amount,destination_account_number,description header, or NDJSON
+    await db.run_sync(lambda session: AccountService(session).get_account(account_id, current_user.id))
+    # Received in full before any row is applied: a client still sending its body may not read the
+    # response yet, so results written while it uploads could fill both sides' buffers
+    upload = await spool_upload(request.stream())
+    return StreamingResponse(
+        stream_batch_upload(account_id, upload.file, format),
+        media_type=EXPORT_MEDIA_TYPES["ndjson"],
+        background=BackgroundTask(upload.close)
+    )
+
+@router.get("/{account_id}/history", response_model=TransactionPage)
+def get_transaction_history(
+    account_id: int,
+    limit: int = Query(default=50, ge=1, le=500),
+    before: Optional[str] = None,
+    after: Optional[str] = None,
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
     account_service = AccountService(db)
-    source_account = account_service.get_account(account_id, current_user.id)
-    if not source_account:
-        raise HTTPException(status_code=404, detail="Source account not found")
-        
-    destination_account = account_service.get_account_by_number(transfer_data.destination_account_number)
-    if not destination_account:
-        raise HTTPException(status_code=404, detail="Destination account not found")
-        
-    if source_account.currency != destination_account.currency:
-        raise HTTPException(
-            status_code=400, 
-            detail="Cannot transfer between accounts with different currencies"
-        )
+    account = account_service.get_account(account_id, current_user.id)
+    if not account:
+        raise HTTPException(status_code=404, detail="Account not found")
     
     transaction_service = TransactionService(db)
-    return transaction_service.process_transfer(account_id, transfer_data)
+    return transaction_service.get_transaction_page(account_id, limit, before=before, after=after)
 
-@router.get("/{account_id}/history", response_model=List[TransactionResponse])
-def get_transaction_history(
+@router.get("/{account_id}/postings", response_model=PostingPage)
+def get_account_postings(
     account_id: int,
+    limit: int = Query(default=50, ge=1, le=500),
+    before: Optional[str] = None,
     db: Session = Depends(get_db),
-    token: str = Depends(oauth2_scheme)
+    current_user: Principal = Depends(get_current_principal)
 ):
-    repo = UserRepository(db)
-    auth_service = AuthService(repo)
-    token_data = auth_service.verify_token(token)
-    current_user = repo.get_by_email(email=token_data.email)
-    if not current_user:
-        raise HTTPException(status_code=404, detail="User not found")
+    account_service = AccountService(db)
+    account_service.get_account(account_id, current_user.id)
+
+    ledger_service = LedgerService(db)
+    return ledger_service.get_postings_page(account_id, limit, before=before)
 
+@router.get("/{account_id}/history/export")
+def export_transaction_history(
+    account_id: int,
+    format: Literal["ndjson", "csv"] = "ndjson",
+    db: Session = Depends(get_db),
+    current_user: Principal = Depends(get_current_principal)
+):
     account_service = AccountService(db)
     account = account_service.get_account(account_id, current_user.id)
     if not account:
         raise HTTPException(status_code=404, detail="Account not found")
-    
-    transaction_service = TransactionService(db)
-    return transaction_service.get_transaction_history(account_id)
\ No newline at end of file
+
+    return StreamingResponse(
+        stream_transaction_export(account_id, format),
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="account-{account_id}-transactions.{format}"'}
+    )
\ No newline at end of file
@@ -1,7 +1,7 @@
 from datetime import datetime
 from decimal import Decimal
-from typing import Optional
-from pydantic import BaseModel, Field
+from typing import List, Literal, Optional
+from pydantic import BaseModel, Field, model_validator
 from src.infrastructure.models.transaction import TransactionType, TransactionStatus
 
 class TransactionBase(BaseModel):
@@ -28,4 +28,50 @@ class TransactionResponse(TransactionBase):
     updated_at: datetime
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class BatchItem(TransactionBase):
+    transaction_type: Literal[TransactionType.DEPOSIT, TransactionType.TRANSFER]
+    # Transfers only: the account credited
+    destination_account_number: Optional[str] = Field(None, min_length=12, max_length=12)
+
+    @model_validator(mode="after")
+    def check_destination(self) -> "BatchItem":
+        if (self.transaction_type == TransactionType.TRANSFER) != (self.destination_account_number is not None):
+            raise ValueError("destination_account_number is required for transfers and only for transfers")
+        return self
+
+class BatchCreate(BaseModel):
+    items: List[BatchItem] = Field(..., min_length=1)
+
+class BatchItemResult(BaseModel):
+    index: int
+    status: TransactionStatus
+    transaction: Optional[TransactionResponse] = None
+    error: Optional[str] = None
+
+class BatchResult(BaseModel):
+    completed: int
+    failed: int
+    items: List[BatchItemResult]
+
+class TransactionPage(BaseModel):
+    items: List[TransactionResponse]
+    # Pass as ?before= for older transactions, ?after= for newer ones; None when there are none
+    next_cursor: Optional[str] = None
+    prev_cursor: Optional[str] = None
+
+class PostingResponse(BaseModel):
+    id: int
+    transaction_id: Optional[int]
+    # Negative when money left the account
+    amount: Decimal
+    posted_at: datetime
+
+    class Config:
+        from_attributes = True
+
+class PostingPage(BaseModel):
+    items: List[PostingResponse]
+    # Pass as ?before= for older postings; None when there are none
+    next_cursor: Optional[str] = None
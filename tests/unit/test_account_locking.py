@@ -0,0 +1,161 @@
+import asyncio
+import random
+import threading
+import time
+import pytest
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import event, func
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm.exc import StaleDataError
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountStatus, AccountType
+from src.infrastructure.models.transaction import Transaction, TransactionType
+from src.application.services.account_service import AccountService
+from src.application.services.transaction_service import TransactionService, process_withdrawal_async
+from src.presentation.schemas.transaction_schemas import DepositCreate, TransferCreate, WithdrawalCreate
+
+INITIAL_BALANCE = Decimal("1000.00")
+
+@pytest.fixture
+def engine(file_engine):
+    # Each thread needs its own connection for the row locks to contend
+    return file_engine
+
+@pytest.fixture
+def hot_accounts(session_factory):
+    with session_factory() as session:
+        user = User(email="hot@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        accounts = [
+            Account(user_id=user.id, account_number=f"{index:012d}", account_type=AccountType.DEBIT,
+                    status=AccountStatus.ACTIVE, balance=INITIAL_BALANCE, currency="MXN")
+            for index in range(1, 4)
+        ]
+        session.add_all(accounts)
+        session.commit()
+        return {account.id: account.account_number for account in accounts}
+
+def test_stale_copy_cannot_overwrite_balance(session_factory, hot_accounts):
+    account_id = next(iter(hot_accounts))
+    first, second = session_factory(), session_factory()
+    first_copy = first.get(Account, account_id)
+    second_copy = second.get(Account, account_id)
+
+    first_copy.balance += Decimal("10.00")
+    first.commit()
+    second_copy.balance += Decimal("20.00")
+    with pytest.raises(StaleDataError):
+        second.commit()
+    second.rollback()
+
+    assert second.get(Account, account_id).balance == INITIAL_BALANCE + Decimal("10.00")
+    first.close()
+    second.close()
+
+@pytest.mark.parametrize("mode", ["pessimistic", "optimistic"])
+def test_concurrent_updates_on_hot_accounts_lose_nothing(monkeypatch, session_factory, hot_accounts, mode):
+    monkeypatch.setattr(settings, "ACCOUNT_LOCKING_MODE", mode)
+    monkeypatch.setattr(settings, "ACCOUNT_LOCK_MAX_RETRIES", 50)
+    account_ids = list(hot_accounts)
+    errors = []
+
+    def worker(seed):
+        rng = random.Random(seed)
+        session = session_factory()
+        service = TransactionService(session)
+        try:
+            for _ in range(25):
+                source, destination = rng.sample(account_ids, 2)
+                amount = Decimal(rng.randint(1, 50))
+                operation = rng.choice(["transfer", "deposit", "withdrawal"])
+                try:
+                    if operation == "transfer":
+                        service.process_transfer(source, TransferCreate(
+                            amount=amount, destination_account_number=hot_accounts[destination]))
+                    elif operation == "deposit":
+                        service.process_deposit(source, DepositCreate(amount=amount))
+                    else:
+                        service.process_withdrawal(source, WithdrawalCreate(amount=amount))
+                except HTTPException as exc:
+                    if exc.status_code != 400:
+                        raise
+                    session.rollback()
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            session.close()
+
+    threads = [threading.Thread(target=worker, args=(seed,)) for seed in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert not errors
+    with session_factory() as session:
+        for account_id in account_ids:
+            credited = session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
+                ((Transaction.account_id == account_id) & (Transaction.transaction_type == TransactionType.DEPOSIT)) |
+                (Transaction.destination_account_id == account_id)
+            ).scalar()
+            debited = session.query(func.coalesce(func.sum(Transaction.amount), 0)).filter(
+                Transaction.account_id == account_id,
+                Transaction.transaction_type != TransactionType.DEPOSIT
+            ).scalar()
+            account = session.get(Account, account_id)
+            assert account.balance == INITIAL_BALANCE + Decimal(credited) - Decimal(debited)
+            assert account.balance >= 0
+
+def test_async_withdrawal_retries_without_blocking_the_event_loop(monkeypatch, engine, session_factory, hot_accounts):
+    account_id = next(iter(hot_accounts))
+    withdraw = TransactionService._withdraw
+    attempts = []
+
+    def lose_first_attempt(service, *args):
+        attempts.append(1)
+        if len(attempts) == 1:
+            raise StaleDataError("concurrent update")
+        return withdraw(service, *args)
+
+    def blocking_sleep(seconds):
+        raise AssertionError("time.sleep on the event loop")
+
+    monkeypatch.setattr(TransactionService, "_withdraw", lose_first_attempt)
+    monkeypatch.setattr(time, "sleep", blocking_sleep)
+
+    async def scenario():
+        async_engine = create_async_engine(engine.url.set(drivername="sqlite+aiosqlite"))
+        try:
+            async with async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)() as db:
+                transaction = await process_withdrawal_async(db, account_id, WithdrawalCreate(amount=Decimal("5.00")))
+                return transaction.amount
+        finally:
+            await async_engine.dispose()
+
+    assert asyncio.run(scenario()) == Decimal("5.00")
+    assert len(attempts) == 2
+    with session_factory() as session:
+        assert session.get(Account, account_id).balance == INITIAL_BALANCE - Decimal("5.00")
+
+@pytest.mark.parametrize("mode", ["pessimistic", "optimistic"])
+def test_status_change_racing_a_deposit_is_retried(monkeypatch, session_factory, hot_accounts, mode):
+    monkeypatch.setattr(settings, "ACCOUNT_LOCKING_MODE", mode)
+    account_id = next(iter(hot_accounts))
+    flushes = []
+
+    def deposit_before_first_flush(session, flush_context, instances):
+        # The deposit commits between the status change's read and its UPDATE
+        flushes.append(session)
+        if len(flushes) == 1:
+            with session_factory() as other:
+                TransactionService(other).process_deposit(account_id, DepositCreate(amount=Decimal("10.00")))
+
+    with session_factory() as session:
+        event.listen(session, "before_flush", deposit_before_first_flush)
+        account = AccountService(session).update_account_status(account_id, AccountStatus.BLOCKED)
+        assert account.status == AccountStatus.BLOCKED
+        assert account.balance == INITIAL_BALANCE + Decimal("10.00")
+    assert len(flushes) == 2
@@ -0,0 +1,38 @@
+from src.infrastructure.cache import Cache, InMemoryCacheBackend
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+def test_entries_expire_after_ttl():
+    clock = FakeClock()
+    cache = Cache("test", InMemoryCacheBackend(max_size=10, clock=clock), ttl=5)
+    cache.set(1, "one")
+
+    clock.now = 4.9
+    assert cache.get(1) == "one"
+    clock.now = 5.0
+    assert cache.get(1) is None
+    assert (cache.hits, cache.misses) == (1, 1)
+
+def test_least_recently_used_entry_is_evicted():
+    cache = Cache("test", InMemoryCacheBackend(max_size=2), ttl=60)
+    cache.set(1, "one")
+    cache.set(2, "two")
+    cache.get(1)
+    cache.set(3, "three")
+
+    assert cache.get(2) is None
+    assert cache.get(1) == "one"
+    assert cache.get(3) == "three"
+    assert cache.stats()["size"] == 2
+
+def test_invalidate_removes_entry():
+    cache = Cache("test", InMemoryCacheBackend(max_size=10), ttl=60)
+    cache.set(1, "one")
+    cache.invalidate(1)
+
+    assert cache.get(1) is None
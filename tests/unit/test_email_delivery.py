@@ -0,0 +1,147 @@
+import asyncio
+import time
+import pytest
+from fastapi_mail import ConnectionConfig, MessageSchema, MessageType
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker
+from src.infrastructure.config.email import PooledMailer
+from src.infrastructure.fake_smtp import FakeSMTPServer
+from src.infrastructure.models.user import User
+from src.infrastructure.models.notification import Notification, NotificationType
+from src.application.jobs import notification_retry
+from src.application.services import notification_service
+from src.application.services.email_delivery_service import EmailDeliveryWorker
+from src.application.services.notification_service import NotificationService
+
+def fake_mailer(port: int, **pool) -> PooledMailer:
+    return PooledMailer(ConnectionConfig(
+        MAIL_USERNAME="sink", MAIL_PASSWORD="sink", MAIL_FROM="bank@example.com", MAIL_PORT=port,
+        MAIL_SERVER="127.0.0.1", MAIL_FROM_NAME="Bank", MAIL_STARTTLS=False, MAIL_SSL_TLS=False,
+        USE_CREDENTIALS=False, TIMEOUT=5
+    ), **pool)
+
+@pytest.fixture
+def async_session_factory(async_session_factory):
+    async def add_user():
+        async with async_session_factory() as db:
+            db.add(User(email="mail@example.com", hashed_password="x"))
+            await db.commit()
+
+    asyncio.run(add_user())
+    return async_session_factory
+
+async def wait_for(predicate, timeout: float = 5.0) -> None:
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        assert time.monotonic() < deadline, "timed out"
+        await asyncio.sleep(0.01)
+
+def test_request_path_does_not_wait_for_smtp(async_session_factory, monkeypatch):
+    async def scenario():
+        async with FakeSMTPServer(delay=0.5) as sink:
+            worker = EmailDeliveryWorker(async_session_factory, fake_mailer(sink.port), concurrency=2)
+            monkeypatch.setattr(notification_service, "email_worker", worker)
+            worker.start()
+            try:
+                async with async_session_factory() as db:
+                    started = time.perf_counter()
+                    notification = await NotificationService(db).create_and_send_notification(
+                        user_id=1, type=NotificationType.TRANSACTION, title="Retiro", content="Hola",
+                        email="mail@example.com"
+                    )
+                    assert time.perf_counter() - started < 0.5
+                    assert not notification.email_sent
+
+                await wait_for(lambda: len(sink.messages) == 1)
+                await worker.drain()
+                async with async_session_factory() as db:
+                    stored = await db.get(Notification, notification.id)
+                    assert stored.email_sent and stored.sent_at and stored.email_attempts == 1
+                assert sink.messages[0]["Subject"] == "Retiro"
+            finally:
+                await worker.stop()
+
+    asyncio.run(scenario())
+
+def test_failed_delivery_is_retried_with_backoff_and_recovered_on_startup(async_session_factory):
+    async def scenario():
+        async with async_session_factory() as db:
+            db.add_all([
+                Notification(user_id=1, type=NotificationType.TRANSACTION, title=f"n{index}",
+                             content="c", email_to="mail@example.com")
+                for index in range(3)
+            ])
+            db.add(Notification(user_id=1, type=NotificationType.TRANSACTION, title="no email", content="c"))
+            await db.commit()
+
+        async with FakeSMTPServer(fail_first=2) as sink:
+            worker = EmailDeliveryWorker(
+                async_session_factory, fake_mailer(sink.port), concurrency=1, retry_base_seconds=0.01
+            )
+            worker.start()
+            try:
+                assert await worker.recover() == 3
+                await wait_for(lambda: len(sink.messages) == 3)
+                await worker.drain()
+            finally:
+                await worker.stop()
+
+        assert worker.stats()["failed_attempts"] == 2
+        async with async_session_factory() as db:
+            notifications = (await db.execute(Notification.__table__.select().order_by("id"))).all()
+            assert [row.email_sent for row in notifications] == [True, True, True, False]
+            assert sum(row.email_attempts for row in notifications) == 5
+
+    asyncio.run(scenario())
+
+def test_pooled_mailer_reuses_connections_and_reconnects_when_dropped():
+    async def scenario():
+        async with FakeSMTPServer(drop_after=15) as sink:
+            mailer = fake_mailer(sink.port, pool_size=2)
+            messages = [
+                MessageSchema(subject=f"m{index}", recipients=["mail@example.com"], body="b", subtype=MessageType.plain)
+                for index in range(20)
+            ]
+            # The sink hangs up after 15 messages: the batch reconnects and carries on
+            assert await mailer.send_batch(messages) == [None] * 20
+            for message in messages[:5]:
+                await mailer.send_message(message)
+            await mailer.close()
+
+        assert [message["Subject"] for message in sink.messages] == [f"m{index}" for index in range(20)] + [
+            f"m{index}" for index in range(5)
+        ]
+        assert sink.connections == 2
+        assert mailer.stats()["reconnects"] == 1
+
+    asyncio.run(scenario())
+
+def test_retry_job_hands_unsent_rows_to_the_worker_from_its_thread(file_engine):
+    session_factory = sessionmaker(bind=file_engine)
+    with session_factory() as db:
+        db.add(User(email="mail@example.com", hashed_password="x"))
+        db.add_all([
+            Notification(user_id=1, type=NotificationType.TRANSACTION, title=f"n{index}", content="c",
+                         email_to="mail@example.com")
+            for index in range(3)
+        ])
+        db.commit()
+
+    async def scenario():
+        async_engine = create_async_engine(file_engine.url.set(drivername="sqlite+aiosqlite"))
+        async with FakeSMTPServer() as sink:
+            worker = EmailDeliveryWorker(
+                async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False), fake_mailer(sink.port)
+            )
+            worker.start()
+            try:
+                assert await asyncio.to_thread(notification_retry.run, session_factory, worker) == 3
+                await wait_for(lambda: len(sink.messages) == 3)
+                await worker.drain()
+                # Nothing is owed any more, and a second scan does not mail twice
+                assert await asyncio.to_thread(notification_retry.run, session_factory, worker) == 0
+            finally:
+                await worker.stop()
+        await async_engine.dispose()
+
+    asyncio.run(scenario())
@@ -0,0 +1,34 @@
+import pytest
+from src.infrastructure.email_templates import EmailTemplates
+from src.infrastructure.models.notification import NotificationType
+
+@pytest.fixture(scope="module")
+def templates():
+    return EmailTemplates()
+
+def test_every_notification_type_has_a_template(templates):
+    assert {notification_type.value for notification_type in NotificationType} <= set(templates.types)
+
+@pytest.mark.parametrize("notification_type", list(NotificationType) + [None])
+def test_prerendered_layout_matches_full_render(templates, notification_type):
+    title, content = "Nueva transacción", "Se ha realizado un retiro de $10.00 desde su cuenta.\n\nGracias."
+    body = templates.render_body(notification_type, title, content)
+    expected = templates.environment.get_template("layout.html").render(title=title, body=body)
+
+    assert templates.render(notification_type, title, content) == expected
+
+def test_title_and_content_are_escaped(templates):
+    html = templates.render(NotificationType.SECURITY_ALERT, "<b>Alerta</b>", "Hola <script>alert(1)</script> & adiós")
+
+    assert "<script>" not in html and "<b>Alerta</b>" not in html
+    assert "&lt;script&gt;alert(1)&lt;/script&gt; &amp; adiós" in html
+    assert "<title>&lt;b&gt;Alerta&lt;/b&gt;</title>" in html
+    assert "cambie su contraseña" in html
+
+def test_notification_without_content_renders_its_title(templates):
+    html = templates.render(NotificationType.TRANSACTION, "Nueva transacción", None)
+
+    assert "<title>Nueva transacción</title>" in html
+    assert templates.render_body(NotificationType.TRANSACTION, "Nueva transacción", None) == templates.render_body(
+        NotificationType.TRANSACTION, "Nueva transacción", ""
+    )
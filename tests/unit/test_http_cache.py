@@ -0,0 +1,72 @@
+import pytest
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from main import app
+from src.infrastructure.config.database import get_db
+from src.infrastructure.http_cache import resource_etags
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.account import Account, AccountType
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.monitoring.query_counter import count_queries, install_query_counter
+from src.infrastructure.security import Principal, get_current_principal
+from src.application.services.credit_service import CreditService
+from src.application.services.transaction_service import TransactionService
+from src.presentation.schemas.transaction_schemas import DepositCreate
+
+@pytest.fixture
+def session_factory(engine, session_factory):
+    install_query_counter(engine)
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", hashed_password="x"))
+        db.add(Account(user_id=1, account_number="000000000001", account_type=AccountType.DEBIT, balance=100))
+        db.add(Credit(user_id=1, amount=Decimal("1000.00"), interest_rate=Decimal("10.00"), term_months=12,
+                      monthly_payment=Decimal("90.00"), purpose="test"))
+        db.commit()
+    resource_etags.backend.clear()
+    return session_factory
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(1, "owner@example.com", UserRole.USER)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+@pytest.mark.parametrize("path", ["/api/v1/accounts/1", "/api/v1/accounts/"])
+def test_unchanged_account_is_revalidated_without_a_query(client, session_factory, path):
+    first = client.get(path)
+    etag = first.headers["ETag"]
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+
+    with count_queries() as queries:
+        response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 304 and response.headers["ETag"] == etag and not response.content
+    assert queries.statements == 0
+
+    with session_factory() as db:
+        TransactionService(db).process_deposit(1, DepositCreate(amount=Decimal("5.00"), description="d"))
+    response = client.get(path, headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.headers["ETag"] != etag
+
+def test_credit_etag_follows_its_content(client, session_factory):
+    etag = client.get("/api/v1/credits/1").headers["ETag"]
+
+    # Without the version cache the ETag is recomputed from the row and still matches
+    resource_etags.backend.clear()
+    assert client.get("/api/v1/credits/1", headers={"If-None-Match": f'"x", {etag}'}).status_code == 304
+
+    with session_factory() as db:
+        CreditService(db).update_credit_status(1, CreditStatus.APPROVED)
+    response = client.get("/api/v1/credits/1", headers={"If-None-Match": etag})
+    assert response.status_code == 200 and response.json()["status"] == "APPROVED"
+
+def test_etag_cache_is_per_user(client):
+    etag = client.get("/api/v1/accounts/1").headers["ETag"]
+    app.dependency_overrides[get_current_principal] = lambda: Principal(2, "other@example.com", UserRole.USER)
+    assert client.get("/api/v1/accounts/1", headers={"If-None-Match": etag}).status_code == 403
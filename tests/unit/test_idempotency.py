@@ -0,0 +1,211 @@
+import threading
+import time
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from fastapi import HTTPException, Response
+from fastapi.testclient import TestClient
+from pydantic import BaseModel
+from sqlalchemy import func, select, update
+from main import app
+from src.infrastructure.config.database import get_db
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.account import Account, AccountType
+from src.infrastructure.models.transaction import Transaction
+from src.infrastructure.models.idempotency_key import IdempotencyKey
+from src.infrastructure.security import Principal, get_current_principal
+from src.application.jobs import idempotency_purge
+from src.application.services.idempotency_service import IdempotencyService
+from src.application.services.transaction_service import TransactionService
+from src.presentation.schemas.transaction_schemas import DepositCreate, TransactionResponse
+
+class Deposit(BaseModel):
+    id: int
+    amount: Decimal
+
+@pytest.fixture
+def engine(file_engine):
+    # Concurrent requests run on threads, each with its own connection
+    return file_engine
+
+@pytest.fixture
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", hashed_password="x"))
+        db.add(Account(user_id=1, account_number="000000000001", account_type=AccountType.DEBIT, balance=100))
+        db.commit()
+    return session_factory
+
+@pytest.fixture
+def client(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(1, "owner@example.com", UserRole.USER)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def count_transactions(session_factory) -> int:
+    with session_factory() as db:
+        return db.scalar(select(func.count(Transaction.id)))
+
+def test_concurrent_duplicates_run_once(session_factory):
+    calls = []
+    results = []
+
+    def operation():
+        calls.append(1)
+        time.sleep(0.2)
+        return {"id": len(calls), "amount": Decimal("5.00")}
+
+    def request():
+        with session_factory() as db:
+            results.append(IdempotencyService(db).run(
+                1, "same-key", "hash", operation, Deposit, 201
+            ))
+
+    threads = [threading.Thread(target=request) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    replays = [result for result in results if isinstance(result, Response)]
+    assert len(replays) == 1 and replays[0].status_code == 201
+    assert replays[0].headers["Idempotent-Replayed"] == "true" and replays[0].body == b'{"id": 1, "amount": "5.00"}'
+
+def test_retried_deposit_is_replayed(client, session_factory):
+    headers = {"Idempotency-Key": "deposit-1"}
+    body = {"amount": "5.00", "description": "d"}
+    first = client.post("/api/v1/transactions/1/deposit", json=body, headers=headers)
+    retry = client.post("/api/v1/transactions/1/deposit", json=body, headers=headers)
+
+    assert first.status_code == retry.status_code == 201
+    assert retry.headers["Idempotent-Replayed"] == "true" and "Idempotent-Replayed" not in first.headers
+    assert retry.json() == first.json()
+    assert count_transactions(session_factory) == 1
+
+    mismatch = client.post("/api/v1/transactions/1/deposit", json={**body, "amount": "6.00"}, headers=headers)
+    assert mismatch.status_code == 422
+    assert count_transactions(session_factory) == 1
+
+def test_errors_are_stored_unless_retryable(session_factory):
+    def not_found():
+        raise HTTPException(status_code=404, detail="Account not found")
+
+    def conflict():
+        raise HTTPException(status_code=409, detail="Concurrent update")
+
+    with session_factory() as db:
+        service = IdempotencyService(db)
+        with pytest.raises(HTTPException):
+            service.run(1, "missing", "hash", not_found, TransactionResponse, 201)
+        replay = service.run(1, "missing", "hash", not_found, TransactionResponse, 201)
+        assert replay.status_code == 404 and b"Account not found" in replay.body
+
+        with pytest.raises(HTTPException):
+            service.run(1, "busy", "hash", conflict, TransactionResponse, 201)
+        assert service.repository.get(1, "busy") is None
+
+def test_purge_job_deletes_expired_keys(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        db.add_all([
+            IdempotencyKey(user_id=1, key=f"old-{index}", request_hash="h", status_code=201, response_body="{}",
+                           created_at=now, locked_until=now, expires_at=now - timedelta(seconds=1))
+            for index in range(5)
+        ])
+        db.add(IdempotencyKey(user_id=1, key="fresh", request_hash="h", created_at=now, locked_until=now,
+                              expires_at=now + timedelta(hours=1)))
+        db.commit()
+
+    assert idempotency_purge.run(session_factory, chunk_size=2) == 5
+    with session_factory() as db:
+        assert db.scalars(select(IdempotencyKey.key)).all() == ["fresh"]
+
+def deposit(db):
+    return TransactionService(db).process_deposit(1, DepositCreate(amount=Decimal("5.00")))
+
+def test_committed_request_is_never_run_again(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        service = IdempotencyService(db, clock=lambda: now)
+        claim = service.begin(1, "crash", "hash")
+        with service.committing_with(db, claim, 201):
+            deposit(db)
+        # The worker dies here, before finish() stores the response
+
+    later = now + timedelta(seconds=61)
+    with session_factory() as db:
+        with pytest.raises(HTTPException) as error:
+            IdempotencyService(db, clock=lambda: later).run(
+                1, "crash", "hash", lambda: deposit(db), TransactionResponse, 201
+            )
+    assert error.value.status_code == 409
+    assert count_transactions(session_factory) == 1
+
+def test_request_whose_claim_was_taken_over_cannot_commit(session_factory):
+    now = datetime.utcnow()
+    later = now + timedelta(seconds=61)
+    with session_factory() as slow_db, session_factory() as retry_db:
+        slow = IdempotencyService(slow_db, clock=lambda: now)
+        claim = slow.begin(1, "slow", "hash")
+        # The slow request outlives its lock and a retry takes the key over
+        retried_id = IdempotencyService(retry_db, clock=lambda: later).run(
+            1, "slow", "hash", lambda: deposit(retry_db), TransactionResponse, 201
+        ).id
+        with pytest.raises(HTTPException) as error:
+            with slow.committing_with(slow_db, claim, 201):
+                deposit(slow_db)
+        slow.fail(claim, error.value)
+
+    assert error.value.status_code == 409
+    assert count_transactions(session_factory) == 1
+    with session_factory() as db:
+        record = IdempotencyService(db).repository.get(1, "slow")
+        assert record.status_code == 201 and f'"id": {retried_id}' in record.response_body
+        assert db.get(Account, 1).balance == Decimal("105.00")
+
+def test_commit_that_loses_a_version_check_leaves_the_key_retryable(session_factory, monkeypatch):
+    commit = TransactionService._commit
+    stale_commits = []
+
+    def lose_version_check(service, *args):
+        # A concurrent writer bumps the account's version before this commit's flush
+        if len(stale_commits) < 2:
+            stale_commits.append(args)
+            service.db.execute(
+                update(Account).where(Account.id == 1).values(version=Account.version + 1),
+                execution_options={"synchronize_session": False}
+            )
+        return commit(service, *args)
+
+    monkeypatch.setattr(settings, "ACCOUNT_LOCKING_MODE", "optimistic")
+    monkeypatch.setattr(TransactionService, "_commit", lose_version_check)
+
+    monkeypatch.setattr(settings, "ACCOUNT_LOCK_MAX_RETRIES", 0)
+    with session_factory() as db:
+        with pytest.raises(HTTPException) as error:
+            IdempotencyService(db).run(1, "stale", "hash", lambda: deposit(db), TransactionResponse, 201)
+    assert error.value.status_code == 409
+    with session_factory() as db:
+        assert IdempotencyService(db).repository.get(1, "stale") is None
+
+    monkeypatch.setattr(settings, "ACCOUNT_LOCK_MAX_RETRIES", 1)
+    now = datetime.utcnow()
+    with session_factory() as db:
+        service = IdempotencyService(db, clock=lambda: now)
+        claim = service.begin(1, "stale", "hash")
+        with service.committing_with(db, claim, 201):
+            deposit(db)
+        # The retried commit carried the status_code, so a lapsed claim is not run again
+        assert claim.committed and service.repository.get(1, "stale").status_code == 201
+
+    assert len(stale_commits) == 2
+    assert count_transactions(session_factory) == 1
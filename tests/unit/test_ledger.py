@@ -0,0 +1,131 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import func, select
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountType
+from src.infrastructure.models.transaction import Transaction, TransactionType
+from src.infrastructure.models.ledger_posting import LedgerPosting
+from src.infrastructure.models.balance_snapshot import BalanceSnapshot
+from src.infrastructure.monitoring.metrics import LEDGER_MISMATCHES
+from src.application.jobs import balance_snapshots, ledger_verification
+from src.application.services.ledger_service import LedgerService
+from src.application.services.transaction_service import TransactionService
+from src.presentation.schemas.transaction_schemas import (
+    BatchCreate,
+    BatchItem,
+    DepositCreate,
+    TransferCreate,
+    WithdrawalCreate
+)
+
+@pytest.fixture
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", hashed_password="x"))
+        db.add_all([
+            Account(user_id=1, account_number=f"{index:012d}", account_type=AccountType.DEBIT, balance=0)
+            for index in (1, 2)
+        ])
+        db.commit()
+    return session_factory
+
+def move_money(db):
+    service = TransactionService(db)
+    service.process_deposit(1, DepositCreate(amount=Decimal("100.00")))
+    service.process_withdrawal(1, WithdrawalCreate(amount=Decimal("10.00")))
+    service.process_transfer(1, TransferCreate(amount=Decimal("25.00"), destination_account_number="000000000002"))
+    service.process_batch(1, BatchCreate(items=[
+        BatchItem(transaction_type=TransactionType.DEPOSIT, amount=Decimal("5.00")),
+        BatchItem(transaction_type=TransactionType.TRANSFER, amount=Decimal("7.50"),
+                  destination_account_number="000000000002"),
+    ]))
+
+def test_every_movement_is_posted_on_both_sides(session_factory):
+    with session_factory() as db:
+        move_money(db)
+
+        per_transaction = db.execute(
+            select(LedgerPosting.transaction_id, func.count(), func.sum(LedgerPosting.amount))
+            .group_by(LedgerPosting.transaction_id)
+        ).all()
+        assert len(per_transaction) == db.scalar(select(func.count(Transaction.id))) == 5
+        assert all(count == 2 and total == 0 for _, count, total in per_transaction)
+        assert [account.balance for account in db.scalars(select(Account).order_by(Account.id))] == [
+            Decimal("62.50"), Decimal("32.50")
+        ]
+        assert LedgerService(db).verify_balances() == []
+
+def test_verification_reports_drifted_balances(session_factory):
+    with session_factory() as db:
+        move_money(db)
+        db.get(Account, 2).balance += 1
+        db.commit()
+
+    assert ledger_verification.run(session_factory, chunk_size=1) == 1
+    assert LEDGER_MISMATCHES._value.get() == 1
+    with session_factory() as db:
+        mismatch, = LedgerService(db).verify_balances()
+    assert (mismatch.account_id, mismatch.balance, mismatch.posted) == (2, Decimal("33.50"), Decimal("32.50"))
+
+def test_postings_are_paged_newest_first(session_factory):
+    with session_factory() as db:
+        move_money(db)
+        service = LedgerService(db)
+        first = service.get_postings_page(1, 3)
+        second = service.get_postings_page(1, 3, before=first.next_cursor)
+
+    amounts = [posting.amount for posting in first.items + second.items]
+    assert amounts == [Decimal("-7.50"), Decimal("5.00"), Decimal("-25.00"), Decimal("-10.00"), Decimal("100.00")]
+    assert second.next_cursor is None
+
+def post_history(db, start: datetime, days: int):
+    """Deposits into both accounts at 06:00 and 18:00, and a transfer from 1 to 2 at noon, every day"""
+    repository = LedgerService(db).repository
+    for offset in range(days):
+        day = start + timedelta(days=offset)
+        for account_id in (1, 2):
+            for hour in (6, 18):
+                repository.add_many([
+                    {"transaction_id": None, "account_id": account_id, "amount": signed,
+                     "posted_at": day.replace(hour=hour)}
+                    for account_id, signed in ((None, Decimal("-10.00")), (account_id, Decimal("10.00")))
+                ])
+        repository.add_many([
+            {"transaction_id": None, "account_id": 1, "amount": Decimal("-3.00"), "posted_at": day.replace(hour=12)},
+            {"transaction_id": None, "account_id": 2, "amount": Decimal("3.00"), "posted_at": day.replace(hour=12)},
+        ])
+    db.commit()
+
+def test_snapshots_are_taken_once_per_closed_day(session_factory):
+    start = datetime(2024, 3, 1)
+    with session_factory() as db:
+        post_history(db, start, 5)
+        # Only the first three days are closed an hour past midnight of the fourth
+        assert LedgerService(db).take_snapshots(now=datetime(2024, 3, 4, 1), chunk_size=1) == 6
+        assert LedgerService(db).take_snapshots(now=datetime(2024, 3, 4, 1)) == 0
+
+    assert balance_snapshots.run(session_factory, chunk_size=1) == 4
+    with session_factory() as db:
+        snapshots = db.execute(
+            select(BalanceSnapshot.account_id, BalanceSnapshot.day, BalanceSnapshot.balance)
+            .order_by(BalanceSnapshot.day, BalanceSnapshot.account_id)
+        ).all()
+    assert len(snapshots) == 10
+    assert [balance for account_id, _, balance in snapshots if account_id == 1] == [
+        Decimal(17 * day) for day in range(1, 6)
+    ]
+
+def test_balance_at_matches_a_full_replay(session_factory):
+    start = datetime(2024, 3, 1)
+    with session_factory() as db:
+        post_history(db, start, 5)
+        service = LedgerService(db)
+        service.take_snapshots(now=datetime(2024, 3, 5, 1))
+
+        for moment in (start, start.replace(hour=12), datetime(2024, 3, 3), datetime(2024, 3, 4, 12, 30),
+                       datetime(2024, 3, 5, 18), datetime(2024, 3, 9)):
+            for account_id in (1, 2):
+                replayed = service.repository.sum_account_postings(account_id, None, moment)
+                assert service.balance_at(account_id, moment) == replayed
+        assert service.balance_at(2, datetime(2024, 3, 4, 12, 30)) == Decimal("23.00") * 3 + Decimal("13.00")
@@ -0,0 +1,56 @@
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from sqlalchemy import event
+from src.infrastructure.models.user import User
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.notification import Notification, NotificationType
+from src.infrastructure.models.payment import Payment, PaymentStatus
+from src.application.jobs.overdue_payments import run
+
+@pytest.fixture
+def session_factory(session_factory):
+    now = datetime.utcnow()
+    with session_factory() as db:
+        users = [User(email=f"owner{index}@example.com", hashed_password="x") for index in range(2)]
+        db.add_all(users)
+        db.flush()
+        credits = [
+            Credit(user_id=user.id, amount=Decimal("1000.00"), interest_rate=Decimal("10.00"), term_months=12,
+                   monthly_payment=Decimal("90.00"), status=CreditStatus.ACTIVE, purpose="test")
+            for user in users
+        ]
+        db.add_all(credits)
+        db.flush()
+        for index in range(5):
+            for credit in credits:
+                db.add(Payment(credit_id=credit.id, amount=Decimal("90.50"), payment_date=now - timedelta(days=index + 1)))
+        db.add(Payment(credit_id=credits[0].id, amount=Decimal("90.50"), payment_date=now + timedelta(days=1)))
+        db.add(Payment(credit_id=credits[0].id, amount=Decimal("90.50"), payment_date=now - timedelta(days=1),
+                       status=PaymentStatus.COMPLETED))
+        db.commit()
+    return session_factory
+
+def test_overdue_payments_are_flipped_and_notified_in_chunks(session_factory):
+    statements = []
+    engine = session_factory.kw["bind"]
+    listener = lambda conn, cursor, statement, *args: statements.append(statement)
+    event.listen(engine, "before_cursor_execute", listener)
+    try:
+        assert run(session_factory, chunk_size=4) == 10
+    finally:
+        event.remove(engine, "before_cursor_execute", listener)
+
+    # Three chunks of UPDATE ... RETURNING, owner lookup and one executemany INSERT, then an empty UPDATE
+    assert len(statements) == 3 * 3 + 1
+    with session_factory() as db:
+        statuses = [payment.status for payment in db.query(Payment).order_by(Payment.id)]
+        assert statuses == [PaymentStatus.OVERDUE] * 10 + [PaymentStatus.PENDING, PaymentStatus.COMPLETED]
+
+        notifications = db.query(Notification).all()
+        assert len(notifications) == 10
+        assert {(n.user_id, n.email_to) for n in notifications} == {(1, "owner0@example.com"), (2, "owner1@example.com")}
+        assert all(n.type == NotificationType.CREDIT_PAYMENT and not n.email_sent for n in notifications)
+        assert notifications[0].content == "Your credit payment of $90.50 is overdue."
+
+    assert run(session_factory) == 0
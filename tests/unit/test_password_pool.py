@@ -0,0 +1,40 @@
+import asyncio
+import threading
+import pytest
+from fastapi import HTTPException
+from src.infrastructure.config.settings import settings
+from src.infrastructure.security import (
+    get_password_hash,
+    submit_password_task,
+    verify_password_async,
+)
+
+def test_verify_password_async_runs_off_the_event_loop():
+    hashed = get_password_hash("s3cret-password")
+    loop_thread = threading.get_ident()
+    worker_threads = []
+
+    def record_thread():
+        worker_threads.append(threading.get_ident())
+
+    async def verify():
+        await asyncio.wrap_future(submit_password_task(record_thread))
+        return await verify_password_async("s3cret-password", hashed)
+
+    assert asyncio.run(verify())
+    assert worker_threads and worker_threads[0] != loop_thread
+
+def test_saturated_pool_rejects_with_429(monkeypatch):
+    monkeypatch.setattr(settings, "PASSWORD_HASH_QUEUE_SIZE", 0)
+    release = threading.Event()
+    futures = [submit_password_task(release.wait) for _ in range(settings.PASSWORD_HASH_WORKERS)]
+    try:
+        with pytest.raises(HTTPException) as exc_info:
+            submit_password_task(release.wait)
+        assert exc_info.value.status_code == 429
+    finally:
+        release.set()
+        for future in futures:
+            future.result()
+
+    assert submit_password_task(lambda: "ok").result() == "ok"
@@ -0,0 +1,32 @@
+import asyncio
+from src.infrastructure import security
+from src.infrastructure.models.user import User
+from src.infrastructure.repositories.user_repository import AsyncUserRepository
+from src.application.services.auth_service import AuthService, upgrade_password_hash
+
+PASSWORD = "correct-horse"
+
+def test_login_upgrades_hash_to_configured_cost(async_session_factory, monkeypatch):
+    old_hash = security.build_password_context(["bcrypt"], 4).hash(PASSWORD)
+    monkeypatch.setattr(security, "pwd_context", security.build_password_context(["bcrypt"], 5))
+
+    async def scenario():
+        async with async_session_factory() as db:
+            db.add(User(email="upgrade@example.com", hashed_password=old_hash))
+            await db.commit()
+            auth_service = AuthService(AsyncUserRepository(db))
+            user = await auth_service.authenticate_user("upgrade@example.com", PASSWORD)
+            assert auth_service.needs_password_upgrade(user)
+
+        assert await upgrade_password_hash(user.id, PASSWORD, old_hash, async_session_factory)
+        # A second upgrade against the stale hash must not overwrite the new one
+        assert not await upgrade_password_hash(user.id, PASSWORD, old_hash, async_session_factory)
+
+        async with async_session_factory() as db:
+            user = await AsyncUserRepository(db).get_by_email("upgrade@example.com")
+            auth_service = AuthService(AsyncUserRepository(db))
+            assert user.hashed_password.startswith("$2b$05$")
+            assert not auth_service.needs_password_upgrade(user)
+            assert await auth_service.authenticate_user("upgrade@example.com", PASSWORD)
+
+    asyncio.run(scenario())
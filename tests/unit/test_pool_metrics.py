@@ -0,0 +1,29 @@
+import pytest
+from sqlalchemy import create_engine, exc
+from sqlalchemy.pool import QueuePool
+from src.infrastructure.monitoring.pool_metrics import POOL_METRICS, instrumented_pool_class
+
+def test_pool_records_checkouts_and_timeouts(tmp_path):
+    engine = create_engine(
+        f"sqlite:///{tmp_path / 'pool.db'}",
+        poolclass=instrumented_pool_class(QueuePool, "test"),
+        pool_size=1,
+        max_overflow=0,
+        pool_timeout=0.05
+    )
+    metrics = POOL_METRICS["test"]
+
+    held = engine.connect()
+    assert metrics.snapshot()["checked_out"] == 1
+    with pytest.raises(exc.TimeoutError):
+        engine.connect()
+    held.close()
+    with engine.connect():
+        pass
+
+    snapshot = metrics.snapshot()
+    assert snapshot["checkouts"] == 2
+    assert snapshot["checkout_timeouts"] == 1
+    assert snapshot["checked_out"] == 0
+    assert snapshot["wait_seconds_buckets"]["+Inf"] == 2
+    engine.dispose()
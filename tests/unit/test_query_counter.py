@@ -0,0 +1,84 @@
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from sqlalchemy.exc import InvalidRequestError
+from main import app
+from src.infrastructure.config.database import get_db
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.account import Account, AccountType
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.transaction import TransactionStatus
+from src.infrastructure.models.notification import Notification
+from src.infrastructure.models.payment import Payment, PaymentStatus
+from src.infrastructure.monitoring.query_counter import assert_max_selects, install_query_counter
+from src.infrastructure.security import Principal, get_current_principal
+from src.application.services.pyament_service import PaymentService
+
+@pytest.fixture
+def session_factory(engine, session_factory):
+    install_query_counter(engine)
+    with session_factory() as db:
+        user = User(email="owner@example.com", hashed_password="x")
+        db.add(user)
+        db.flush()
+        account = Account(user_id=user.id, account_number="0001", account_type=AccountType.DEBIT, balance=1000)
+        credit = Credit(user_id=user.id, amount=Decimal("1000.00"), interest_rate=Decimal("10.00"), term_months=12,
+                        monthly_payment=Decimal("90.00"), status=CreditStatus.ACTIVE, purpose="test")
+        db.add_all([account, credit])
+        db.flush()
+        db.add_all([
+            Payment(credit_id=credit.id, amount=Decimal("90.00"), payment_date=datetime.utcnow())
+            for _ in range(2)
+        ])
+        db.commit()
+    return session_factory
+
+def test_payment_paths_load_their_relations_up_front(session_factory):
+    with session_factory() as db:
+        service = PaymentService(db)
+        with assert_max_selects(1):
+            payment = service.get_payment(1)
+        # The commit expires the payment, so refresh() reloads it: one SELECT each way
+        with assert_max_selects(2):
+            payment = service.process_payment(1, account_id=1)
+        assert payment.status == PaymentStatus.COMPLETED and payment.transaction_id is not None
+        with assert_max_selects(2):
+            payment = service.reverse_payment(1)
+        assert payment.transaction.status == TransactionStatus.REVERSED
+        with assert_max_selects(2):
+            service.mark_payment_as_failed(2, "insufficient funds")
+
+        notifications = db.query(Notification).order_by(Notification.id).all()
+        assert [notification.user_id for notification in notifications] == [1, 1, 1]
+
+def test_assert_max_selects_lists_the_offending_queries(session_factory):
+    with session_factory() as db:
+        with pytest.raises(AssertionError, match="2 SELECTs issued, at most 1 expected"):
+            with assert_max_selects(1):
+                for payment in db.query(Payment).all():
+                    payment.credit
+
+def test_user_collections_must_be_loaded_explicitly(session_factory):
+    with session_factory() as db:
+        user = db.get(User, 1)
+        with pytest.raises(InvalidRequestError):
+            user.accounts
+
+def test_payment_endpoint_select_budget(session_factory):
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(1, "owner@example.com", UserRole.USER)
+    try:
+        # Not as a context manager: the lifespan would start the scheduler and the email worker
+        # against the configured DATABASE_URL instead of this test's database
+        client = TestClient(app)
+        with assert_max_selects(1) as counter:
+            response = client.get("/api/v1/payments/1")
+    finally:
+        app.dependency_overrides.clear()
+    assert response.status_code == 200 and response.json()["credit_id"] == 1
+    assert counter.selects == 1
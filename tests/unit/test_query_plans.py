@@ -0,0 +1,90 @@
+import pytest
+from datetime import date, datetime
+from sqlalchemy import event, text
+from src.infrastructure.models.user import User
+from src.infrastructure.models.notification import Notification, NotificationType
+from src.infrastructure.repositories.account_repository import AccountRepository
+from src.infrastructure.repositories.credit_repository import CreditRepository
+from src.infrastructure.repositories.ledger_repository import LedgerRepository
+from src.infrastructure.repositories.notification_repository import NotificationRepository
+from src.infrastructure.repositories.payment_repository import PaymentRepository
+from src.infrastructure.repositories.transaction_repository import TransactionRepository
+
+HOT_TABLES = ("transactions", "ledger_postings", "balance_snapshots", "notifications", "payments", "credits", "accounts")
+
+@pytest.fixture
+def db(session_factory):
+    session = session_factory()
+    # Mostly read notifications: with statistics the planner sees how small the unread slice is
+    session.add(User(email="plans@example.com", hashed_password="x"))
+    session.flush()
+    session.add_all([
+        Notification(user_id=1, type=NotificationType.TRANSACTION, title="t", content="c", read=index >= 5)
+        for index in range(200)
+    ])
+    session.commit()
+    session.execute(text("ANALYZE"))
+    yield session
+    session.close()
+
+def query_plans(db, run):
+    """EXPLAIN QUERY PLAN of every SELECT issued by run()"""
+    statements = []
+
+    def capture(conn, cursor, statement, parameters, context, executemany):
+        if statement.lstrip().upper().startswith("SELECT"):
+            statements.append((statement, parameters))
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", capture)
+    try:
+        run()
+    finally:
+        event.remove(engine, "before_cursor_execute", capture)
+    connection = db.connection().connection.dbapi_connection
+    return [
+        [row[3] for row in connection.execute(f"EXPLAIN QUERY PLAN {statement}", parameters).fetchall()]
+        for statement, parameters in statements
+    ]
+
+@pytest.mark.parametrize("run, indexes", [
+    (lambda db: TransactionRepository(db).get_account_transactions_page(1, 50, before=(datetime(2024, 1, 1), 10)),
+     {"ix_transactions_account_created", "ix_transactions_destination_created"}),
+    (lambda db: TransactionRepository(db).get_account_transactions(1),
+     {"ix_transactions_account_created", "ix_transactions_destination_created"}),
+    (lambda db: list(TransactionRepository(db).iter_account_transactions(1)),
+     {"ix_transactions_account_created", "ix_transactions_destination_created"}),
+    (lambda db: LedgerRepository(db).get_account_postings_page(1, 50, before=(datetime(2024, 1, 1), 10)),
+     {"ix_ledger_postings_account_posted"}),
+    (lambda db: LedgerRepository(db).get_balances_after(0, 1000), {"ix_ledger_postings_account_posted"}),
+    (lambda db: list(LedgerRepository(db).iter_account_postings(1, datetime(2024, 1, 1), datetime(2024, 2, 1))),
+     {"ix_ledger_postings_account_posted"}),
+    (lambda db: LedgerRepository(db).get_snapshot_before(1, date(2024, 1, 2)), set()),
+    (lambda db: LedgerRepository(db).sum_account_postings(1, datetime(2024, 1, 1), datetime(2024, 1, 1, 12)),
+     {"ix_ledger_postings_account_posted"}),
+    (lambda db: LedgerRepository(db).get_snapshot_balances_before(range(1, 1000), date(2024, 1, 2)), set()),
+    (lambda db: LedgerRepository(db).get_first_posting_time(), {"ix_ledger_postings_posted_at"}),
+    (lambda db: LedgerRepository(db).get_unsnapshotted_day_totals(
+        date(2024, 1, 1), datetime(2024, 1, 1), datetime(2024, 1, 2), 0, 1000
+    ), {"ix_ledger_postings_posted_at"}),
+    (lambda db: NotificationRepository(db).get_user_notifications(1), {"ix_notifications_user_created"}),
+    (lambda db: NotificationRepository(db).get_user_notifications(1, unread_only=True), {"ix_notifications_user_unread"}),
+    (lambda db: NotificationRepository(db).get_user_notifications(1, notification_type=NotificationType.TRANSACTION),
+     {"ix_notifications_user_type_created"}),
+    (lambda db: PaymentRepository(db).get_overdue_payments(), {"ix_payments_status_payment_date"}),
+    (lambda db: PaymentRepository(db).get_by_credit_id(1), {"ix_payments_credit_id"}),
+    (lambda db: CreditRepository(db).get_by_user_id(1), {"ix_credits_user_id"}),
+    (lambda db: AccountRepository(db).get_by_user_id(1), {"ix_accounts_user_id"}),
+])
+def test_hot_query_uses_index(db, run, indexes):
+    plans = query_plans(db, lambda: run(db))
+
+    assert plans
+    details = [detail for plan in plans for detail in plan]
+    full_scans = [
+        detail for detail in details
+        if detail.startswith("SCAN ") and detail.split()[1] in HOT_TABLES and "INDEX" not in detail
+    ]
+    assert not full_scans, details
+    for index in indexes:
+        assert any(index in detail for detail in details), details
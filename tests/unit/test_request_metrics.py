@@ -0,0 +1,89 @@
+import os
+import subprocess
+import sys
+import pytest
+from datetime import datetime
+from decimal import Decimal
+from fastapi.testclient import TestClient
+from prometheus_client import REGISTRY, CollectorRegistry
+from prometheus_client.multiprocess import MultiProcessCollector
+from main import app
+from src.infrastructure.config.database import get_db
+from src.infrastructure.config.settings import settings
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.payment import Payment
+from src.infrastructure.monitoring.query_counter import count_queries, install_query_counter
+from src.infrastructure.security import Principal, get_current_principal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+@pytest.fixture
+def client(engine, session_factory):
+    install_query_counter(engine)
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", hashed_password="x"))
+        db.add(Credit(user_id=1, amount=Decimal("1000.00"), interest_rate=Decimal("10.00"), term_months=12,
+                      monthly_payment=Decimal("90.00"), status=CreditStatus.ACTIVE, purpose="test"))
+        db.add(Payment(credit_id=1, amount=Decimal("90.00"), payment_date=datetime.utcnow()))
+        db.commit()
+
+    def override_get_db():
+        with session_factory() as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    app.dependency_overrides[get_current_principal] = lambda: Principal(1, "owner@example.com", UserRole.USER)
+    try:
+        yield TestClient(app)
+    finally:
+        app.dependency_overrides.clear()
+
+def test_statement_timings_are_collected(client):
+    with count_queries() as queries:
+        client.get("/api/v1/payments/1")
+    assert queries.statements == 1 and queries.db_seconds > 0
+    assert queries.slowest_seconds <= queries.db_seconds and "FROM payments" in queries.slowest_statement
+
+def test_metrics_require_the_scrape_token(client, monkeypatch):
+    assert client.get("/metrics").status_code == 403
+    monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer wrong"}).status_code == 401
+    assert client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"}).status_code == 200
+
+def test_responses_carry_server_timing_and_routes_are_aggregated(client, monkeypatch):
+    monkeypatch.setattr(settings, "METRICS_SCRAPE_TOKEN", "scrape-secret")
+    labels = {"method": "GET", "route": "/api/v1/payments/{payment_id}"}
+    before = REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) or 0
+
+    for _ in range(3):
+        response = client.get("/api/v1/payments/1")
+    timing = response.headers["Server-Timing"]
+    assert timing.startswith("db;dur=") and 'desc="1 statements"' in timing and "app;dur=" in timing
+    client.get("/api/v1/payments/999")
+
+    response = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert response.status_code == 200 and response.headers["content-type"].startswith("text/plain")
+    assert REGISTRY.get_sample_value("http_request_duration_seconds_count", labels) == before + 4
+    assert REGISTRY.get_sample_value("http_request_db_statements_bucket", {**labels, "le": "1.0"}) >= 4
+    assert REGISTRY.get_sample_value("http_requests_total", {**labels, "status": "404"}) >= 1
+    assert 'http_request_duration_seconds_count{method="GET",route="/api/v1/payments/{payment_id}"}' in response.text
+    # Paths are labelled by route template, not by the concrete id
+    assert '/api/v1/payments/1"' not in response.text
+
+def test_worker_counters_are_summed_across_processes(tmp_path):
+    script = (
+        "from src.infrastructure.monitoring.metrics import LOGINS, record_transaction\n"
+        "LOGINS.labels('succeeded').inc(2)\n"
+        "record_transaction('DEPOSIT', 10.5, 'MXN')\n"
+    )
+    env = {**os.environ, "PROMETHEUS_MULTIPROC_DIR": str(tmp_path)}
+    for _ in range(2):
+        subprocess.run([sys.executable, "-c", script], env=env, check=True, cwd=ROOT)
+
+    registry = CollectorRegistry()
+    MultiProcessCollector(registry, path=str(tmp_path))
+    assert registry.get_sample_value("auth_logins_total", {"result": "succeeded"}) == 4
+    assert registry.get_sample_value("banking_transactions_total", {"type": "DEPOSIT"}) == 2
+    assert registry.get_sample_value("banking_transaction_volume_total", {"type": "DEPOSIT", "currency": "MXN"}) == 21
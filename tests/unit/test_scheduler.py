@@ -0,0 +1,128 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.infrastructure.models.user import User
+from src.infrastructure.models.credit import Credit, CreditStatus
+from src.infrastructure.models.payment import Payment, PaymentStatus
+from src.infrastructure.repositories.job_lease_repository import JobLeaseRepository
+from src.application.jobs.scheduler import JobScheduler
+from src.application.services.credit_service import CreditService, add_months
+from src.application.services.pyament_service import PaymentService
+
+class Clock:
+    def __init__(self):
+        self.now = datetime(2025, 1, 1, 12, 0)
+
+    def __call__(self):
+        return self.now
+
+def test_only_one_replica_runs_a_job_per_interval(session_factory):
+    clock, runs = Clock(), []
+    replicas = [JobScheduler(session_factory, owner=owner, clock=clock) for owner in ("a", "b")]
+    for replica in replicas:
+        replica.register("count", 60, lambda factory, owner=replica.owner: runs.append(owner) or 7)
+
+    assert replicas[0].run_pending() == 1
+    assert replicas[1].run_pending() == 0
+    clock.now += timedelta(seconds=90)
+    assert replicas[1].run_pending() == 1
+    assert replicas[0].run_pending() == 0
+
+    assert runs == ["a", "b"]
+    metrics = replicas[1].stats()["jobs"]["count"]
+    assert metrics["runs"] == 1 and metrics["last_rows"] == 7 and metrics["last_lag_seconds"] == 30
+    with session_factory() as db:
+        lease = JobLeaseRepository(db).get("count")
+        assert lease.owner is None and lease.last_run_at == clock.now and lease.last_rows == 7
+
+def test_lease_of_a_crashed_replica_expires(session_factory):
+    clock = Clock()
+    scheduler = JobScheduler(session_factory, owner="b", clock=clock, lease_seconds=300)
+    scheduler.register("count", 60, lambda factory: 1)
+    with session_factory() as db:
+        leases = JobLeaseRepository(db)
+        leases.ensure("count")
+        assert leases.acquire("count", "a", clock.now, 60, 300)
+
+    assert scheduler.run_pending() == 0
+    clock.now += timedelta(seconds=301)
+    assert scheduler.run_pending() == 1
+
+def test_failing_job_is_recorded_and_releases_its_lease(session_factory):
+    scheduler = JobScheduler(session_factory, owner="a", clock=Clock())
+    scheduler.register("broken", 60, lambda factory: 1 / 0)
+
+    assert scheduler.run_pending() == 1
+    metrics = scheduler.stats()["jobs"]["broken"]
+    assert metrics["failures"] == 1 and "ZeroDivisionError" in metrics["last_error"]
+    with session_factory() as db:
+        assert JobLeaseRepository(db).get("broken").owner is None
+
+def test_jobs_run_on_worker_threads(session_factory):
+    threads = []
+
+    async def scenario():
+        scheduler = JobScheduler(session_factory, owner="a", tick_seconds=0.01)
+        scheduler.register("probe", 3600, lambda factory: threads.append(threading.current_thread()) or 0)
+        scheduler.start()
+        while not threads or scheduler.stats()["jobs"]["probe"]["runs"] == 0:
+            await asyncio.sleep(0.01)
+        await scheduler.stop()
+
+    asyncio.run(scenario())
+    assert threads and threads[0] is not threading.main_thread()
+
+def add_credit(db, next_payment_date, status=CreditStatus.ACTIVE, term_months=12):
+    if not db.get(User, 1):
+        db.add(User(email="credit@example.com", hashed_password="x"))
+        db.flush()
+    db.add(Credit(user_id=1, amount=Decimal("1200.00"), interest_rate=Decimal("12.00"), term_months=term_months,
+                  monthly_payment=Decimal("106.62"), status=status, purpose="test",
+                  remaining_amount=Decimal("1200.00"), next_payment_date=next_payment_date))
+    db.commit()
+
+def test_credit_rollover_creates_missed_installments(session_factory):
+    with session_factory() as db:
+        add_credit(db, datetime(2024, 11, 30))
+        add_credit(db, datetime(2025, 2, 1))
+        add_credit(db, datetime(2024, 12, 1), CreditStatus.COMPLETED)
+        add_credit(db, datetime(2025, 3, 1))
+
+        # Installments due up to CREDIT_INSTALLMENT_LEAD_DAYS (10) ahead are created now
+        assert CreditService(db).roll_over_payment_dates(now=datetime(2025, 1, 31), chunk_size=1) == 2
+        assert [payment.payment_date for payment in db.query(Payment).order_by(Payment.payment_date)] == [
+            datetime(2024, 11, 30), datetime(2024, 12, 30), datetime(2025, 1, 30), datetime(2025, 2, 1)
+        ]
+        assert all(payment.status == PaymentStatus.PENDING for payment in db.query(Payment))
+        assert [credit.next_payment_date for credit in db.query(Credit).order_by(Credit.id)] == [
+            datetime(2025, 2, 28), datetime(2025, 3, 1), datetime(2024, 12, 1), datetime(2025, 3, 1)
+        ]
+
+def test_new_installment_is_not_overdue_yet(session_factory):
+    now = datetime(2025, 1, 31)
+    with session_factory() as db:
+        add_credit(db, datetime(2025, 2, 5))
+        assert CreditService(db).roll_over_payment_dates(now=now) == 1
+        assert PaymentService(db).mark_payments_as_overdue(now=now) == 0
+        payment, = db.query(Payment)
+        assert (payment.payment_date, payment.status) == (datetime(2025, 2, 5), PaymentStatus.PENDING)
+
+def test_rollover_stops_after_the_term(session_factory):
+    with session_factory() as db:
+        add_credit(db, datetime(2024, 11, 30), term_months=2)
+        service = CreditService(db)
+        assert service.roll_over_payment_dates(now=datetime(2025, 3, 31)) == 1
+        assert service.roll_over_payment_dates(now=datetime(2025, 6, 30)) == 0
+        assert db.query(Payment).count() == 2
+        assert db.get(Credit, 1).next_payment_date is None
+
+        add_credit(db, datetime(2025, 1, 15))
+        db.get(Credit, 2).remaining_amount = 0
+        db.commit()
+        assert service.roll_over_payment_dates(now=datetime(2025, 3, 31)) == 1
+        assert db.query(Payment).count() == 2 and db.get(Credit, 2).next_payment_date is None
+
+def test_add_months_clamps_to_month_end():
+    assert add_months(datetime(2024, 1, 31), 1) == datetime(2024, 2, 29)
+    assert add_months(datetime(2024, 11, 15), 3) == datetime(2025, 2, 15)
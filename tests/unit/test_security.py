@@ -0,0 +1,79 @@
+import pytest
+from fastapi import HTTPException
+from sqlalchemy import event
+from src.infrastructure.models.user import User, UserRole
+from src.infrastructure.config.settings import settings
+from src.infrastructure.repositories.user_repository import UserRepository
+from src.infrastructure.security import (
+    TokenType,
+    check_admin_role,
+    create_token,
+    create_tokens,
+    get_current_principal,
+    principal_cache,
+)
+from src.presentation.schemas.user_schemas import UserUpdate
+
+@pytest.fixture
+def db(engine, session_factory):
+    statements = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+    session = session_factory()
+    session.statements = statements
+    principal_cache.backend.clear()
+    yield session
+    session.close()
+    principal_cache.backend.clear()
+
+@pytest.fixture
+def claims_only(monkeypatch):
+    monkeypatch.setattr(settings, "AUTH_VERIFY_USER_STATE", False)
+
+def test_principal_comes_from_claims_without_a_query(db, claims_only):
+    token = create_tokens(7, UserRole.ADMIN, "admin@example.com")["access_token"]
+
+    principal = get_current_principal(token, db)
+
+    assert (principal.id, principal.email, principal.role) == (7, "admin@example.com", UserRole.ADMIN)
+    assert check_admin_role(principal) is principal
+    assert db.statements == []
+
+def test_inactive_principal_is_rejected(db, claims_only):
+    token = create_tokens(7, UserRole.USER, "user@example.com", is_active=False)["access_token"]
+
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_principal(token, db)
+    assert exc_info.value.status_code == 401
+
+def test_token_without_principal_claims_falls_back_to_the_database(db):
+    user = User(email="legacy@example.com", hashed_password="x", role=UserRole.USER)
+    db.add(user)
+    db.commit()
+    token = create_token(
+        {"sub": str(user.id), "role": user.role, "email": user.email},
+        TokenType.ACCESS
+    )
+    user_id = user.id
+    db.statements.clear()
+
+    principal = get_current_principal(token, db)
+
+    assert (principal.id, principal.email) == (user_id, "legacy@example.com")
+    assert len(db.statements) == 1
+
+def test_user_state_check_is_cached_until_the_user_changes(db):
+    user = User(email="cached@example.com", hashed_password="x", role=UserRole.USER)
+    db.add(user)
+    db.commit()
+    user_id = user.id
+    token = create_tokens(user_id, UserRole.USER, "cached@example.com")["access_token"]
+    db.statements.clear()
+
+    assert get_current_principal(token, db).is_active
+    assert get_current_principal(token, db).is_active
+    assert len(db.statements) == 1
+
+    UserRepository(db).update(user_id, UserUpdate(email="cached@example.com", is_active=False))
+    with pytest.raises(HTTPException) as exc_info:
+        get_current_principal(token, db)
+    assert exc_info.value.status_code == 401
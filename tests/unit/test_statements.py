@@ -0,0 +1,89 @@
+import csv
+import io
+import re
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountType
+from src.infrastructure.pdf import LINES_PER_PAGE
+from src.infrastructure.repositories.ledger_repository import LedgerRepository
+from src.infrastructure.statement_store import StatementStore
+from src.application.jobs import monthly_statements
+from src.application.services.ledger_service import LedgerService
+from src.application.services.statement_service import stream_statement
+
+@pytest.fixture
+def engine(file_engine):
+    # The job's worker processes must see the same database
+    return file_engine
+
+@pytest.fixture
+def session_factory(session_factory):
+    with session_factory() as db:
+        db.add(User(email="owner@example.com", hashed_password="x"))
+        db.add_all([
+            Account(user_id=1, account_number=f"{index:012d}", account_type=AccountType.DEBIT, balance=0,
+                    created_at=datetime(2024, 1, 1))
+            for index in (1, 2, 3)
+        ])
+        db.commit()
+        # A deposit into account 1 every 8 hours from February to April
+        LedgerRepository(db).add_many([
+            {"transaction_id": None, "account_id": account_id, "amount": signed,
+             "posted_at": datetime(2024, 2, 1) + timedelta(hours=8 * index)}
+            for index in range(3 * 89)
+            for account_id, signed in ((None, Decimal("-1.00")), (1, Decimal("1.00")))
+        ])
+        db.commit()
+        LedgerService(db).take_snapshots(now=datetime(2024, 5, 1))
+    return session_factory
+
+@pytest.fixture
+def store(tmp_path):
+    return StatementStore(str(tmp_path / "statements"))
+
+def test_csv_statement_has_opening_postings_and_closing(session_factory, store):
+    body = b"".join(stream_statement(1, "2024-03", "csv", session_factory, store)).decode()
+    rows = list(csv.DictReader(io.StringIO(body)))
+
+    assert rows[0]["description"] == "Opening balance" and rows[0]["balance"] == "87.00"
+    assert len(rows) == 2 + 3 * 31
+    assert rows[1]["date"] == "2024-03-01 00:00:00" and rows[-2]["date"] == "2024-03-31 16:00:00"
+    assert rows[-1]["description"] == "Closing balance" and rows[-1]["balance"] == "180.00"
+    # March is long closed: the rendered bytes were kept
+    with open(store.get(1, "2024-03", "csv"), "rb") as stored:
+        assert stored.read().decode() == body
+
+def test_pdf_statement_is_paginated_with_valid_offsets(session_factory, store):
+    pdf = b"".join(stream_statement(1, "2024-03", "pdf", session_factory, store))
+
+    assert pdf.startswith(b"%PDF-1.4") and pdf.endswith(b"%%EOF\n")
+    startxref = int(re.search(rb"startxref\n(\d+)\n", pdf).group(1))
+    assert pdf[startxref:].startswith(b"xref\n")
+    offsets = re.findall(rb"(\d{10}) 00000 n ", pdf[startxref:])
+    for number, offset in enumerate(offsets, 1):
+        assert pdf[int(offset):].startswith(b"%d 0 obj" % number)
+    pages = int(re.search(rb"/Count (\d+)", pdf).group(1))
+    assert pages == -(-(3 * 31) // (LINES_PER_PAGE - 4)) > 1
+    assert b"Closing balance 180.00" in pdf
+
+def test_open_month_is_not_stored(session_factory, store):
+    month = datetime.utcnow().strftime("%Y-%m")
+    b"".join(stream_statement(1, month, "csv", session_factory, store))
+
+    assert store.get(1, month, "csv") is None
+
+def test_batch_job_generates_every_statement_once(session_factory, store):
+    def run(month, **options):
+        return monthly_statements.run(month, ["csv", "pdf"], session_factory=session_factory, store=store, **options)
+
+    assert run("2024-03", workers=1, chunk_size=2) == 6
+    assert run("2024-03", workers=1) == 0
+    with pytest.raises(ValueError):
+        run(datetime.utcnow().strftime("%Y-%m"))
+
+def test_batch_job_runs_in_a_process_pool(session_factory, store):
+    assert monthly_statements.run("2024-04", ["pdf"], workers=2, chunk_size=1,
+                                  session_factory=session_factory, store=store) == 3
+    assert all(store.get(account_id, "2024-04", "pdf") for account_id in (1, 2, 3))
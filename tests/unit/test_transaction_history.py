@@ -0,0 +1,60 @@
+import csv
+import io
+import json
+import pytest
+from datetime import datetime, timedelta
+from decimal import Decimal
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountStatus, AccountType
+from src.infrastructure.models.transaction import Transaction, TransactionStatus, TransactionType
+from src.application.services.transaction_service import TransactionService, stream_transaction_export
+
+TRANSACTIONS = 25
+
+@pytest.fixture
+def account_id(session_factory):
+    with session_factory() as session:
+        user = User(email="history@example.com", hashed_password="x")
+        session.add(user)
+        session.flush()
+        account = Account(user_id=user.id, account_number="000000000001", account_type=AccountType.DEBIT,
+                          status=AccountStatus.ACTIVE, balance=Decimal("0.00"), currency="MXN")
+        session.add(account)
+        session.flush()
+        start = datetime(2024, 1, 1)
+        # Pairs share a timestamp, so the id tie-breaker decides their order
+        session.add_all([
+            Transaction(account_id=account.id, transaction_type=TransactionType.DEPOSIT,
+                        status=TransactionStatus.COMPLETED, amount=Decimal(index + 1),
+                        reference_number=f"TRX-{index:05d}", created_at=start + timedelta(minutes=index // 2))
+            for index in range(TRANSACTIONS)
+        ])
+        session.commit()
+        return account.id
+
+def test_keyset_pages_cover_history_once_in_both_directions(session_factory, account_id):
+    with session_factory() as session:
+        service = TransactionService(session)
+        pages = [service.get_transaction_page(account_id, 10)]
+        while pages[-1].next_cursor:
+            pages.append(service.get_transaction_page(account_id, 10, before=pages[-1].next_cursor))
+
+        ids = [item.id for page in pages for item in page.items]
+        assert [len(page.items) for page in pages] == [10, 10, 5]
+        assert ids == sorted(ids, reverse=True) and len(set(ids)) == TRANSACTIONS
+        assert pages[0].prev_cursor is None
+
+        back = service.get_transaction_page(account_id, 10, after=pages[2].prev_cursor)
+        assert [item.id for item in back.items] == [item.id for item in pages[1].items]
+        assert back.next_cursor and back.prev_cursor
+
+def test_export_streams_every_row(session_factory, account_id):
+    ndjson = "".join(stream_transaction_export(account_id, "ndjson", session_factory, batch_size=7))
+    rows = [json.loads(line) for line in ndjson.splitlines()]
+    assert len(rows) == TRANSACTIONS
+    assert rows[0]["reference_number"] == f"TRX-{TRANSACTIONS - 1:05d}"
+
+    chunks = list(stream_transaction_export(account_id, "csv", session_factory, batch_size=7))
+    assert len(chunks) == 4
+    records = list(csv.DictReader(io.StringIO("".join(chunks))))
+    assert len(records) == TRANSACTIONS and records[-1]["amount"] == "1.00"
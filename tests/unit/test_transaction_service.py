@@ -0,0 +1,176 @@
+import asyncio
+import io
+import json
+import pytest
+from decimal import Decimal
+from fastapi import HTTPException
+from sqlalchemy import event
+from src.infrastructure.models.user import User
+from src.infrastructure.models.account import Account, AccountStatus, AccountType
+from src.infrastructure.models.transaction import Transaction, TransactionStatus, TransactionType
+from src.application.services.transaction_service import TransactionService, spool_upload, stream_batch_upload
+from src.infrastructure.config.settings import settings
+from src.presentation.schemas.transaction_schemas import BatchCreate, BatchItem, TransferCreate
+
+@pytest.fixture
+def db_session(session_factory):
+    session = session_factory()
+    try:
+        yield session
+    finally:
+        session.close()
+
+@pytest.fixture
+def accounts(db_session):
+    user = User(email="owner@example.com", hashed_password="x")
+    db_session.add(user)
+    db_session.flush()
+    source = Account(user_id=user.id, account_number="000000000001", account_type=AccountType.DEBIT,
+                     status=AccountStatus.ACTIVE, balance=Decimal("100.00"), currency="MXN")
+    destination = Account(user_id=user.id, account_number="000000000002", account_type=AccountType.DEBIT,
+                          status=AccountStatus.ACTIVE, balance=Decimal("0.00"), currency="MXN")
+    db_session.add_all([source, destination])
+    db_session.commit()
+    return source, destination
+
+def test_transfer_commits_once(engine, db_session, accounts):
+    source, destination = accounts
+    commits = []
+
+    def on_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        transaction = TransactionService(db_session).process_transfer(
+            source.id,
+            TransferCreate(amount=Decimal("40.00"), destination_account_number=destination.account_number)
+        )
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert len(commits) == 1
+    assert transaction.status == TransactionStatus.COMPLETED
+    assert transaction.destination_account_id == destination.id
+    db_session.refresh(source)
+    db_session.refresh(destination)
+    assert source.balance == Decimal("60.00")
+    assert destination.balance == Decimal("40.00")
+
+def test_failed_transfer_leaves_no_partial_state(db_session, accounts):
+    source, destination = accounts
+    with pytest.raises(HTTPException) as exc:
+        TransactionService(db_session).process_transfer(
+            source.id,
+            TransferCreate(amount=Decimal("500.00"), destination_account_number=destination.account_number)
+        )
+
+    assert exc.value.status_code == 400
+    assert db_session.query(Transaction).count() == 0
+    db_session.refresh(source)
+    assert source.balance == Decimal("100.00")
+
+def test_batch_applies_valid_items_in_one_unit_of_work(engine, db_session, accounts):
+    source, destination = accounts
+    source_id = source.id
+    transfer = lambda amount, number=destination.account_number: BatchItem(
+        transaction_type=TransactionType.TRANSFER, amount=Decimal(amount), destination_account_number=number
+    )
+    batch = BatchCreate(items=[
+        transfer("80.00"),
+        transfer("30.00"),  # 20.00 left
+        BatchItem(transaction_type=TransactionType.DEPOSIT, amount=Decimal("50.00")),
+        transfer("30.00"),
+        transfer("1.00", "999999999999"),
+    ])
+    statements, commits = [], []
+
+    def on_execute(connection, cursor, statement, *args):
+        statements.append(statement.split()[0])
+
+    def on_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, "before_cursor_execute", on_execute)
+    event.listen(engine, "commit", on_commit)
+    try:
+        result = TransactionService(db_session).process_batch(source_id, batch)
+    finally:
+        event.remove(engine, "before_cursor_execute", on_execute)
+        event.remove(engine, "commit", on_commit)
+
+    assert (result.completed, result.failed) == (3, 2)
+    assert [item.error for item in result.items] == [
+        None, "Insufficient funds", None, None, "Destination account not found"
+    ]
+    assert [item.transaction.amount for item in result.items if item.transaction] == [
+        Decimal("80.00"), Decimal("50.00"), Decimal("30.00")
+    ]
+    # One SELECT for every account, one INSERT for all transactions and one for all their postings,
+    # one UPDATE per account
+    assert statements == ["SELECT", "INSERT", "INSERT", "UPDATE", "UPDATE"] and len(commits) == 1
+    db_session.refresh(source)
+    db_session.refresh(destination)
+    assert source.balance == Decimal("40.00")
+    assert destination.balance == Decimal("110.00")
+    assert db_session.query(Transaction).count() == 3
+
+def test_batch_is_limited(db_session, accounts, monkeypatch):
+    monkeypatch.setattr(settings, "TRANSACTION_BATCH_MAX_ITEMS", 1)
+    deposit = BatchItem(transaction_type=TransactionType.DEPOSIT, amount=Decimal("1.00"))
+    with pytest.raises(HTTPException) as exc:
+        TransactionService(db_session).process_batch(accounts[0].id, BatchCreate(items=[deposit, deposit]))
+    assert exc.value.status_code == 400
+    with pytest.raises(ValueError):
+        BatchItem(transaction_type=TransactionType.DEPOSIT, amount=Decimal("1.00"),
+                  destination_account_number=accounts[1].account_number)
+
+def test_upload_is_applied_in_chunks(engine, session_factory, db_session, accounts):
+    source_id = accounts[0].id
+    upload = io.BytesIO(
+        b"transaction_type,amount,destination_account_number,description\n"
+        b"TRANSFER,60.00,000000000002,salary\n"
+        b"TRANSFER,0,000000000002,\n"
+        b"DEPOSIT,10.00,,refund\n"
+        b"TRANSFER,60.00,000000000002,salary\n"
+        b"TRANSFER,50.00,000000000002,\n"
+    )
+    commits = []
+
+    def on_commit(connection):
+        commits.append(connection)
+
+    event.listen(engine, "commit", on_commit)
+    try:
+        lines = [json.loads(line) for chunk in stream_batch_upload(source_id, upload, "csv", session_factory, 2)
+                 for line in chunk.splitlines()]
+    finally:
+        event.remove(engine, "commit", on_commit)
+
+    assert [(line["index"], line["status"]) for line in lines[:-1]] == [
+        (0, "COMPLETED"), (1, "FAILED"), (2, "COMPLETED"), (3, "FAILED"), (4, "COMPLETED")
+    ]
+    assert lines[1]["error"].startswith("amount:") and lines[3]["error"] == "Insufficient funds"
+    assert lines[-1] == {"completed": 3, "failed": 2}
+    assert len(commits) == 3
+    db_session.refresh(accounts[0])
+    assert accounts[0].balance == Decimal("0.00")
+
+def test_ndjson_upload_reports_unreadable_lines(session_factory, db_session, accounts):
+    upload = io.BytesIO(b'{"transaction_type": "DEPOSIT", "amount": "5.00"}\n\nnot json\n[1]\n')
+    lines = "".join(stream_batch_upload(accounts[0].id, upload, "ndjson", session_factory)).splitlines()
+    assert [json.loads(line).get("error") for line in lines] == [
+        None, "Invalid JSON", "Expected a JSON object", None
+    ]
+    assert json.loads(lines[-1]) == {"completed": 1, "failed": 2}
+
+def test_oversized_upload_is_refused(monkeypatch):
+    monkeypatch.setattr(settings, "TRANSACTION_UPLOAD_MAX_BYTES", 10)
+
+    async def body():
+        yield b"0123456789"
+        yield b"0"
+
+    with pytest.raises(HTTPException) as exc:
+        asyncio.run(spool_upload(body()))
+    assert exc.value.status_code == 413